@@ -1,19 +1,222 @@
 #!/usr/bin/env python3
-"""Add Apple-style // MARK: comments to each file section in the monolithic file."""
+"""Add Apple-style // MARK: comments to each file section in the monolithic file.
+
+Besides one category header per section (Imports, State Management, Event
+Handlers, ...), an outline pass records every component, hook, handler,
+fetch helper, function and effect with its line range. Each one gets its own
+Xcode-style MARK, and the outline is saved as a sidecar file so editors and
+the Swift port can jump to a function without rescanning the monolith.
+"""
+import argparse
+import json
+import os
 import re
 
+from compressed_io import open_text
+from memory_profile import MemoryProfile
+
 INPUT = "/Users/markflynn/Local Sites/yesallofus/swift-reference/monolithic_swift_ready.txt"
 OUTPUT = "/Users/markflynn/Local Sites/yesallofus/swift-reference/monolithic_with_marks.txt"
+OUTLINE = "/Users/markflynn/Local Sites/yesallofus/swift-reference/monolithic_outline.json"
+
+OUTLINE_VERSION = 1
+
+
+# ── Outline ──────────────────────────────────────────────────────────────────
+
+FUNCTION_RE = re.compile(r'^(?:export\s+)?(?:default\s+)?(?:async\s+)?function\s*\*?\s*(?P<name>[A-Za-z_$][\w$]*)\s*[(<]')
+ASSIGN_RE = re.compile(r'^(?:export\s+)?(?:const|let|var)\s+(?P<name>[A-Za-z_$][\w$]*)\s*(?::[^=]*)?=\s*(?P<rhs>.*)$')
+ARROW_RHS_RE = re.compile(r'^(?:async\s*)?(?:\([^)]*\)|[A-Za-z_$][\w$]*)\s*(?::[^=]*)?=>|^(?:async\s*)?\($|^(?:async\s+)?function\b|^(?:React\.)?use(?:Callback|Memo)\(\s*(?:async\s*)?\(')
+EFFECT_RE = re.compile(r'^(?:React\.)?(?P<name>use(?:Layout)?Effect)\s*\(')
+EFFECT_DEPS_RE = re.compile(r'\[([^\]]*)\]\s*\)\s*;?\s*$')
+HANDLER_NAME_RE = re.compile(r'^(?:handle|on)[A-Z]')
+API_NAME_RE = re.compile(r'^(?:fetch|load|get|post|create|update|delete|save|submit)(?:[A-Z_]\w*)?$')
+HOOK_NAME_RE = re.compile(r'^use[A-Z]')
+BRACKET_TOKEN_RE = re.compile(r'//|/\*|\*/|\\.|[(){}\[\]\'"`/]')
+# A '/' after one of these starts a regex literal rather than dividing
+REGEX_PRECEDERS = frozenset('(,=:[!&|?{;+-*%~^>')
+REGEX_KEYWORD_RE = re.compile(r'\b(?:return|typeof|case|in|of|void|yield|await)$')
+# A declaration line ending in one of these carries on onto the next line
+CONTINUATIONS = ('=>', '=', '(', ',', '&&', '||', '?', ':')
+# Items nested deeper than this (helpers inside handlers) are outlined but get no MARK
+MARK_DEPTH = 1
+
+
+class OutlineItem:
+    """One function-like declaration; start/end are line indexes."""
+    __slots__ = ('kind', 'name', 'start', 'end', 'depth', 'detail')
+
+    def __init__(self, kind, name, start, depth, detail=None):
+        self.kind = kind
+        self.name = name
+        self.start = start
+        self.end = start
+        self.depth = depth      # outline items enclosing this one
+        self.detail = detail    # effect dependency list
+
+    def mark(self):
+        if self.kind == 'effect':
+            return f"// MARK: {self.name} [{self.detail}]" if self.detail is not None else f"// MARK: {self.name}"
+        if self.kind == 'component':
+            return f"// MARK: {self.name}"
+        return f"// MARK: {self.name}()"
+
+    def as_dict(self, base=0):
+        d = {'kind': self.kind, 'name': self.name, 'start': base + self.start, 'end': base + self.end,
+             'depth': self.depth}
+        if self.detail is not None:
+            d['deps'] = self.detail
+        return d
+
+
+def classify_declaration(s):
+    """(kind, name) for a line that starts a function-like item, else None."""
+    m = EFFECT_RE.match(s)
+    if m:
+        return 'effect', m.group('name')
+    m = FUNCTION_RE.match(s)
+    if m:
+        name = m.group('name')
+    else:
+        m = ASSIGN_RE.match(s)
+        if not m or not ARROW_RHS_RE.match(m.group('rhs')):
+            return None
+        name = m.group('name')
+    if name[0].isupper():
+        return 'component', name
+    if HANDLER_NAME_RE.match(name):
+        return 'handler', name
+    if HOOK_NAME_RE.match(name):
+        return 'hook', name
+    if API_NAME_RE.match(name):
+        return 'api', name
+    return 'function', name
+
+
+def _regex_end(line, i):
+    """End of a regex literal opening with the '/' at i, or None if that
+    '/' divides: it must follow an operator, and close on the same line."""
+    before = line[:i].rstrip()
+    if before and before[-1] not in REGEX_PRECEDERS and not REGEX_KEYWORD_RE.search(before):
+        return None
+    in_class = False
+    j = i + 1
+    while j < len(line):
+        ch = line[j]
+        if ch == '\\':
+            j += 1
+        elif ch == '[':
+            in_class = True
+        elif ch == ']':
+            in_class = False
+        elif ch == '/' and not in_class:
+            return j + 1 if j > i + 1 else None
+        j += 1
+    return None
+
+
+def _bracket_scan(line, state, ignored):
+    delta = 0
+    opened_at = None
+    skip_to = 0
+    for m in BRACKET_TOKEN_RE.finditer(line):
+        tok = m.group(0)
+        if m.start() < skip_to:
+            continue
+        if state == '*/':
+            if tok == '*/':
+                state = None
+        elif state:
+            if tok == state:
+                state = None
+        elif tok == '//':
+            break
+        elif tok == '/*':
+            state = '*/'
+        elif tok == '/':
+            skip_to = _regex_end(line, m.start()) or 0
+        elif tok in '\'"`':
+            if m.start() not in ignored:
+                state = tok
+                opened_at = m.start()
+        elif tok in '({[':
+            delta += 1
+        elif tok in ')}]':
+            delta -= 1
+    return delta, state, opened_at
+
 
-def process_file_section(lines):
+def bracket_delta(line, state):
+    """Net ( { [ depth change over a line, skipping strings, regex literals
+    and comments.
+
+    state carries an open block comment ('*/') or template literal ('`')
+    from the previous line; returns (delta, state for the next line).
+    Quotes other than backticks never span lines, so a quote still open at
+    the end of the line (a JSX apostrophe) is taken as text and the line
+    scanned again without it.
+    """
+    ignored = set()
+    while True:
+        delta, end, opened_at = _bracket_scan(line, state, ignored)
+        if end not in ('\'', '"'):
+            return delta, end
+        ignored.add(opened_at)
+
+
+def build_outline(lines):
+    """Every function-like item in a section, in one pass over its lines."""
+    items = []
+    stack = []      # [item, depth before its line, body opened]
+    depth = 0
+    state = None
+    for i, line in enumerate(lines):
+        s = line.strip()
+        if state is None and s and not s.startswith(('//', '/*', '*')):
+            found = classify_declaration(s)
+            if found:
+                item = OutlineItem(found[0], found[1], i, len(stack))
+                items.append(item)
+                stack.append([item, depth, False])
+        delta, state = bracket_delta(line, state)
+        depth += delta
+        for entry in stack:
+            if depth > entry[1]:
+                entry[2] = True
+        # Close the outermost item that has ended, and anything still open inside it
+        for k, (item, start_depth, opened) in enumerate(stack):
+            if depth <= start_depth and (opened or not s.endswith(CONTINUATIONS)):
+                for inner, _, _ in stack[k:]:
+                    inner.end = i
+                    if inner.kind == 'effect':
+                        m = EFFECT_DEPS_RE.search(s)
+                        if m and inner is item:
+                            inner.detail = ', '.join(d.strip() for d in m.group(1).split(',') if d.strip())
+                del stack[k:]
+                break
+    for item, _, _ in stack:
+        item.end = len(lines) - 1
+    return items
+
+
+def process_file_section(lines, outline=None):
+    """lines with MARK comments added. If outline is a list, the section's
+    OutlineItems are appended to it with line numbers relative to the
+    result's first line (category headers are two-line entries)."""
     result = []
     seen = set()
+    items = build_outline(lines)
+    starts = {}
+    for item in items:
+        starts.setdefault(item.start, []).append(item)
+    positions = []
     
-    for line in lines:
+    for idx, line in enumerate(lines):
         s = line.strip()
         
         # Skip blanks/comments for classification
         if not s or s.startswith('//') or s.startswith('/*') or s.startswith('*'):
+            positions.append(len(result))
             result.append(line)
             continue
         
@@ -81,59 +284,121 @@ def process_file_section(lines):
                 seen.add('exports')
                 result.append('\n// MARK: - Exports\n')
         
+        # One MARK per function-like item, at the line's own indent
+        for item in starts.get(idx, ()):
+            if item.depth <= MARK_DEPTH:
+                result.append(line[:len(line) - len(line.lstrip())] + item.mark() + '\n')
+        
+        positions.append(len(result))
         result.append(line)
     
+    if outline is not None:
+        line_of = []
+        n = 0
+        for entry in result:
+            line_of.append(n)
+            n += entry.count('\n')
+        for item in items:
+            item.start = line_of[positions[item.start]]
+            item.end = line_of[positions[item.end]]
+        outline.extend(items)
     return result
 
-def main():
-    with open(INPUT, 'r', encoding='utf-8', errors='replace') as f:
-        all_lines = f.readlines()
+
+def write_outline(path, source, sections):
+    """Sidecar outline: one JSON object per section, with 1-based line numbers
+    in the marked monolith, one section per line so it diffs and greps well."""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('{"version": %d, "source": %s, "sections": [\n' % (OUTLINE_VERSION, json.dumps(os.path.basename(source))))
+        f.write(',\n'.join(json.dumps(sec, separators=(',', ':')) for sec in sections))
+        f.write('\n]}\n')
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--input', default=INPUT, metavar='PATH',
+                        help='monolith to mark (plain, .gz, .xz or .zst)')
+    parser.add_argument('--output', default=OUTPUT, metavar='PATH',
+                        help='where the marked monolith is written; .gz, .xz or .zst compresses it')
+    parser.add_argument('--profile-memory', action='store_true',
+                        help='report peak memory and top allocation sites per stage')
+    parser.add_argument('--outline', default=OUTLINE, metavar='PATH',
+                        help='where the sidecar outline is written')
+    args = parser.parse_args(argv)
+    profile = MemoryProfile(args.profile_memory)
+
+    with profile.stage('read'):
+        with open_text(args.input, errors='replace') as f:
+            all_lines = f.readlines()
     
     output = []
     section = []
     file_count = 0
     separator_lines = []
+    filepath = None
+    file_line = None
+    outlines = []
+    item_count = 0
+    line_count = 0
+
+    def flush(section):
+        nonlocal item_count, line_count
+        items = []
+        base = line_count + 1
+        processed = process_file_section(section, items)
+        output.extend(processed)
+        line_count += sum(entry.count('\n') for entry in processed)
+        if filepath is not None:
+            outlines.append({'path': filepath, 'line': file_line,
+                             'items': [item.as_dict(base) for item in items]})
+            item_count += len(items)
+        profile.section(filepath)
     
-    for line in all_lines:
-        # Detect file separator: "// FILE:" line
-        if line.strip().startswith('// FILE:'):
-            # Flush previous section
-            if section:
-                processed = process_file_section(section)
-                output.extend(processed)
-                section = []
-                file_count += 1
-            # Also flush any accumulated separator lines
-            output.extend(separator_lines)
-            separator_lines = []
-            output.append(line)
-            continue
+    with profile.stage('mark'):
+        for line in all_lines:
+            # Detect file separator: "// FILE:" line
+            if line.strip().startswith('// FILE:'):
+                # Flush previous section
+                if section:
+                    flush(section)
+                    section = []
+                    file_count += 1
+                filepath = line.strip().replace('// FILE:', '').strip()
+                # Also flush any accumulated separator lines
+                output.extend(separator_lines)
+                output.append(line)
+                line_count += len(separator_lines) + 1
+                file_line = line_count
+                separator_lines = []
+                continue
         
-        # Detect the === separator lines
-        if line.strip().startswith('// ===='):
-            separator_lines.append(line)
-            continue
+            # Detect the === separator lines
+            if line.strip().startswith('// ===='):
+                separator_lines.append(line)
+                continue
         
-        # Flush separators into section if not followed by FILE:
-        if separator_lines:
-            section.extend(separator_lines)
-            separator_lines = []
+            # Flush separators into section if not followed by FILE:
+            if separator_lines:
+                section.extend(separator_lines)
+                separator_lines = []
         
-        section.append(line)
+            section.append(line)
     
-    # Last section
-    if separator_lines:
-        section.extend(separator_lines)
-    if section:
-        processed = process_file_section(section)
-        output.extend(processed)
-        file_count += 1
+        # Last section
+        if separator_lines:
+            section.extend(separator_lines)
+        if section:
+            flush(section)
+            file_count += 1
     
-    with open(OUTPUT, 'w', encoding='utf-8') as f:
-        f.writelines(output)
+    with profile.stage('write'):
+        with open_text(args.output, 'w') as f:
+            f.writelines(output)
+        write_outline(args.outline, args.output, outlines)
     
     print(f"Processed {file_count} file sections")
     print(f"Output: {len(output)} lines")
+    print(f"Outline: {item_count} items in {len(outlines)} sections -> {args.outline}")
+    profile.print_report()
 
 if __name__ == '__main__':
     main()
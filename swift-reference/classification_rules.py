@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""Data-driven classification rules compiled into a path/keyword decision index.
+
+Rules live in classification_rules.json. Each table is an ordered list of
+rules; the first rule whose conditions all hold gives the result:
+
+    {"result": "Service", "when": [[{"path_contains": "/lib/"}, {"path_contains": "/services/"}],
+                                   [{"path_contains": "wallet"}, {"path_contains": "auth"}]]}
+
+"when" is a list of groups that must all match; a group matches if any of its
+atoms does (a lone atom may be given instead of a one-item list). Path atoms
+(path_prefix, path_suffix, path_contains, path_equals, basename_prefix,
+basename_contains) are compiled into tries and an Aho-Corasick automaton, so a
+lookup walks the path once whatever the number of rules. Code atoms
+(code_contains, code_word, code_regex) take optional "window" (only the first
+N characters are searched) and "lower" (search lowercased code) keys and are
+evaluated lazily, only for rules whose path conditions already hold.
+
+Code atoms without a window are searched in growing prefix windows
+(SCAN_WINDOWS, then the whole file): markers like 'use client' sit near the top,
+so most decisions never look past the first few KB. Each table counts how
+often the first window decided in scan_stats.
+"""
+import json
+import os
+import re
+from collections import Counter
+
+from keyword_matcher import KeywordMatcher, is_whole_word
+
+PATH_KINDS = ('path_prefix', 'path_suffix', 'path_contains', 'path_equals',
+              'basename_prefix', 'basename_contains')
+CODE_KINDS = ('code_contains', 'code_word', 'code_regex')
+
+# Prefix windows tried, in order, before an unbounded code atom scans the whole file
+SCAN_WINDOWS = (4096, 32768)
+
+
+class Atom:
+    """A single compiled condition."""
+    __slots__ = ('id', 'kind', 'pattern', 'window', 'lower', 'regex')
+
+    def __init__(self, atom_id, spec):
+        kinds = [k for k in spec if k in PATH_KINDS or k in CODE_KINDS]
+        if len(kinds) != 1:
+            raise ValueError(f'Rule atom needs exactly one condition kind: {spec!r}')
+        self.id = atom_id
+        self.kind = kinds[0]
+        self.pattern = spec[self.kind]
+        self.window = spec.get('window')
+        self.lower = spec.get('lower', self.kind == 'code_word')
+        self.regex = re.compile(self.pattern) if self.kind == 'code_regex' else None
+
+    @property
+    def is_path(self):
+        return self.kind in PATH_KINDS
+
+
+class Rule:
+    __slots__ = ('priority', 'result', 'groups', 'path_groups')
+
+    def __init__(self, priority, result, groups):
+        self.priority = priority
+        self.result = result
+        self.groups = groups
+        # Groups made only of path atoms; these decide candidacy up front
+        self.path_groups = sum(1 for g in groups if all(a.is_path for a in g))
+
+
+def _trie_insert(trie, key, atom_id):
+    node = trie
+    for ch in key:
+        node = node.setdefault(ch, {})
+    node.setdefault(None, []).append(atom_id)
+
+
+def _trie_walk(trie, text, hits):
+    node = trie
+    if None in node:
+        hits.update(node[None])
+    for ch in text:
+        node = node.get(ch)
+        if node is None:
+            return
+        if None in node:
+            hits.update(node[None])
+
+
+class RuleTable:
+    """One ordered rule list compiled into a decision index."""
+
+    def __init__(self, rules):
+        self.atoms = []
+        self.rules = []
+        self.scan_stats = Counter()
+        atom_ids = {}
+        for priority, spec in enumerate(rules):
+            groups = []
+            for group in spec.get('when', []):
+                if isinstance(group, dict):
+                    group = [group]
+                atoms = []
+                for atom_spec in group:
+                    key = json.dumps(atom_spec, sort_keys=True)
+                    if key not in atom_ids:
+                        atom_ids[key] = len(self.atoms)
+                        self.atoms.append(Atom(len(self.atoms), atom_spec))
+                    atoms.append(self.atoms[atom_ids[key]])
+                groups.append(tuple(atoms))
+            self.rules.append(Rule(priority, spec['result'], tuple(groups)))
+
+        # Path index
+        self._prefix = {}
+        self._suffix = {}
+        self._basename_prefix = {}
+        self._equals = {}
+        contains = {}
+        basename_contains = {}
+        for a in self.atoms:
+            if a.kind == 'path_prefix':
+                _trie_insert(self._prefix, a.pattern, a.id)
+            elif a.kind == 'path_suffix':
+                _trie_insert(self._suffix, a.pattern[::-1], a.id)
+            elif a.kind == 'basename_prefix':
+                _trie_insert(self._basename_prefix, a.pattern, a.id)
+            elif a.kind == 'path_equals':
+                self._equals.setdefault(a.pattern, []).append(a.id)
+            elif a.kind == 'path_contains':
+                contains.setdefault(a.pattern, []).append(a.id)
+            elif a.kind == 'basename_contains':
+                basename_contains.setdefault(a.pattern, []).append(a.id)
+        self._contains = contains
+        self._contains_matcher = KeywordMatcher(contains) if contains else None
+        self._basename_contains = basename_contains
+        self._basename_matcher = KeywordMatcher(basename_contains) if basename_contains else None
+
+        # Keyword index for whole-word code atoms, scanned together once
+        self._words = {}
+        for a in self.atoms:
+            if a.kind == 'code_word':
+                self._words.setdefault(a.pattern, []).append(a)
+        self._word_matcher = KeywordMatcher(self._words) if self._words else None
+        windows = [a.window for ws in self._words.values() for a in ws]
+        self._word_window = None if None in windows or not windows else max(windows)
+
+        # Path-group satisfaction is counted through atom -> rules
+        self._rules_by_atom = {}
+        for rule in self.rules:
+            for i, group in enumerate(rule.groups):
+                if all(a.is_path for a in group):
+                    for a in group:
+                        self._rules_by_atom.setdefault(a.id, []).append((rule, i))
+        self._unconditional = [r for r in self.rules if r.path_groups == 0]
+
+    def path_hits(self, path):
+        """Ids of every path atom that holds for path."""
+        hits = set()
+        _trie_walk(self._prefix, path, hits)
+        _trie_walk(self._suffix, path[::-1], hits)
+        hits.update(self._equals.get(path, ()))
+        if self._contains_matcher:
+            for _, kw in self._contains_matcher.iter_matches(path):
+                hits.update(self._contains[kw])
+        basename = os.path.basename(path)
+        _trie_walk(self._basename_prefix, basename, hits)
+        if self._basename_matcher:
+            for _, kw in self._basename_matcher.iter_matches(basename):
+                hits.update(self._basename_contains[kw])
+        return hits
+
+    def candidates(self, hits):
+        """Rules whose path-only groups all hold, in priority order."""
+        satisfied = {}
+        for atom_id in hits:
+            for rule, i in self._rules_by_atom.get(atom_id, ()):
+                satisfied.setdefault(rule.priority, set()).add(i)
+        ready = [self.rules[p] for p, groups in satisfied.items()
+                 if len(groups) == self.rules[p].path_groups]
+        return sorted(ready + self._unconditional, key=lambda r: r.priority)
+
+    def _scan_words(self, code):
+        text = code if self._word_window is None else code[:self._word_window]
+        text = text.lower()
+        found = set()
+        for start, kw in self._word_matcher.iter_matches(text):
+            end = start + len(kw)
+            for a in self._words[kw]:
+                if a.id in found:
+                    continue
+                if (a.window is None or end <= a.window) and is_whole_word(text, start, end, a.window):
+                    found.add(a.id)
+        return found
+
+    def _code_atom(self, atom, code, state):
+        if atom.kind == 'code_word':
+            if 'words' not in state:
+                state['words'] = self._scan_words(code)
+            return atom.id in state['words']
+        if atom.window is not None:
+            return self._search(atom, code, atom.window)
+
+        # Unbounded: a hit in a prefix, confirmed against the whole file, is a
+        # hit in the file; a miss is only final once the window covers it all
+        n = len(code)
+        for i, window in enumerate(SCAN_WINDOWS + (n,)):
+            found = self._search(atom, code, window, confirm=window < n)
+            if found or window >= n:
+                self.scan_stats['prefix' if i == 0 else 'widened'] += 1
+                return found
+
+    @staticmethod
+    def _search(atom, code, window, confirm=False):
+        """Whether atom matches in code's first window characters. With
+        confirm, a regex match must also hold in the whole code: the window
+        edge looks like the end of the text to \\b, $ and lookaheads."""
+        if atom.lower:
+            text = code[:window].lower()
+            window = len(text)
+        else:
+            text = code
+        if atom.kind == 'code_contains':
+            return text.find(atom.pattern, 0, window) != -1
+        if not confirm:
+            return atom.regex.search(text, 0, window) is not None
+        full = None
+        for m in atom.regex.finditer(text, 0, window):
+            if full is None:
+                full = code.lower() if atom.lower else code
+            if atom.regex.match(full, m.start()):
+                return True
+        return False
+
+    def lookup(self, path, code=''):
+        """Result of the first matching rule, or None."""
+        hits = self.path_hits(path)
+        state = {}
+        cache = {}
+        for rule in self.candidates(hits):
+            ok = True
+            for group in rule.groups:
+                matched = False
+                for a in group:
+                    if a.is_path:
+                        matched = a.id in hits
+                    else:
+                        if a.id not in cache:
+                            cache[a.id] = self._code_atom(a, code, state)
+                        matched = cache[a.id]
+                    if matched:
+                        break
+                if not matched:
+                    ok = False
+                    break
+            if ok:
+                return rule.result
+        return None
+
+
+def load_rules(path):
+    """Load classification_rules.json and compile every table in it."""
+    with open(path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    return {name: RuleTable(rules) for name, rules in config.items()
+            if isinstance(rules, list)}
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""Transparent gzip / xz / zstd text files for the pipeline.
+
+Writers pick the compression from the extension (.gz, .xz, .zst); readers
+detect it from the magic bytes, so a renamed archive still opens. Plain
+paths behave like open().
+
+Compressed output is cut into independent frames (gzip members, xz streams,
+zstd frames) at the first line end after every FRAME_SIZE bytes. Standard
+tools read the concatenation as one stream, and iter_lines()/open_at() let
+an index record where a line is and later start decoding at its frame
+instead of from the top of the file.
+
+zstd needs the optional zstandard package; gzip and xz are stdlib.
+"""
+import gzip
+import io
+import lzma
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+FRAME_SIZE = 1 << 20
+READ_SIZE = 1 << 16
+
+MAGIC = (
+    (b'\x1f\x8b', 'gzip'),
+    (b'\xfd7zXZ\x00', 'xz'),
+    (b'\x28\xb5\x2f\xfd', 'zstd'),
+)
+EXTENSIONS = {'.gz': 'gzip', '.gzip': 'gzip', '.xz': 'xz', '.zst': 'zstd', '.zstd': 'zstd'}
+
+
+# ── Codecs ──────────────────────────────────────────────────────────────────
+
+def codec_for_path(path):
+    """Codec named by path's extension, or None for plain text."""
+    for ext, codec in EXTENSIONS.items():
+        if str(path).lower().endswith(ext):
+            return codec
+    return None
+
+
+def detect_codec(path):
+    """Codec of an existing file from its magic bytes, or None for plain text."""
+    with open(path, 'rb') as f:
+        head = f.read(6)
+    for magic, codec in MAGIC:
+        if head.startswith(magic):
+            return codec
+    return None
+
+
+def _need_zstd():
+    if zstandard is None:
+        raise ImportError("zstd files need the zstandard package (pip install zstandard)")
+
+
+def _compressor(codec):
+    if codec == 'gzip':
+        return zlib.compressobj(6, zlib.DEFLATED, 31)
+    if codec == 'xz':
+        return lzma.LZMACompressor(lzma.FORMAT_XZ)
+    _need_zstd()
+    return zstandard.ZstdCompressor().compressobj()
+
+
+def _decompressor(codec):
+    if codec == 'gzip':
+        return zlib.decompressobj(31)
+    if codec == 'xz':
+        return lzma.LZMADecompressor(lzma.FORMAT_XZ)
+    _need_zstd()
+    return zstandard.ZstdDecompressor().decompressobj()
+
+
+def _decode_frames(codec, raw, start=0):
+    """(frame offset, decompressed bytes) pieces from raw's current position,
+    which is file offset start."""
+    fed = 0     # compressed bytes the current frame has consumed
+    d = _decompressor(codec)
+    while True:
+        data = raw.read(READ_SIZE)
+        if not data:
+            return
+        while data:
+            if fed == 0 and codec == 'xz':
+                # Stream padding between xz streams is zero bytes
+                stripped = data.lstrip(b'\x00')
+                start += len(data) - len(stripped)
+                data = stripped
+                if not data:
+                    break
+            out = d.decompress(data)
+            if out:
+                yield start, out
+            if not d.eof:
+                fed += len(data)
+                break
+            rest = d.unused_data
+            start += fed + len(data) - len(rest)
+            fed = 0
+            d = _decompressor(codec)
+            data = rest
+
+
+def _stream_reader(codec, raw):
+    """Binary reader decoding every frame from raw's current position on."""
+    if codec == 'gzip':
+        return gzip.GzipFile(fileobj=raw, mode='rb')
+    if codec == 'xz':
+        # lzma.LZMAFile stops at stream padding, which xz itself accepts
+        return io.BufferedReader(PieceReader(out for _, out in _decode_frames(codec, raw)), READ_SIZE)
+    _need_zstd()
+    return zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=False)
+
+
+# ── Streams ─────────────────────────────────────────────────────────────────
+
+class FramedWriter(io.BufferedIOBase):
+    """Compresses into raw, starting a new frame at a line end every frame_size bytes."""
+
+    def __init__(self, raw, codec, frame_size=FRAME_SIZE):
+        if codec == 'zstd':
+            _need_zstd()
+        self.raw = raw
+        self.codec = codec
+        self.frame_size = frame_size
+        self._c = None
+        self._size = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        n = len(data)
+        while data and self._size + len(data) >= self.frame_size:
+            nl = data.find(b'\n', max(0, self.frame_size - self._size - 1))
+            if nl == -1:
+                break
+            self._compress(data[:nl + 1])
+            self._end_frame()
+            data = data[nl + 1:]
+        if data:
+            self._compress(data)
+        return n
+
+    def _compress(self, data):
+        if self._c is None:
+            self._c = _compressor(self.codec)
+        self.raw.write(self._c.compress(data))
+        self._size += len(data)
+
+    def _end_frame(self):
+        if self._c is not None:
+            self.raw.write(self._c.flush())
+        self._c = None
+        self._size = 0
+
+    def close(self):
+        if not self.closed:
+            self._end_frame()
+            self.raw.close()
+        super().close()
+
+
+class PieceReader(io.RawIOBase):
+    """Raw reader over an iterator of bytes pieces."""
+
+    def __init__(self, pieces):
+        self._pieces = pieces
+        self._piece = memoryview(b'')
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self._piece:
+            piece = next(self._pieces, b'')
+            if not piece:
+                return 0
+            self._piece = memoryview(piece)
+        n = min(len(b), len(self._piece))
+        b[:n] = self._piece[:n]
+        self._piece = self._piece[n:]
+        return n
+
+
+class DecompressingReader(io.BufferedIOBase):
+    """A codec's reader that also owns (and closes) the underlying file."""
+
+    def __init__(self, codec, raw):
+        self.raw = raw
+        self._stream = _stream_reader(codec, raw)
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        return self._stream.read(size)
+
+    def read1(self, size=-1):
+        return self._stream.read(size if size is not None and size >= 0 else READ_SIZE)
+
+    def close(self):
+        if not self.closed:
+            self._stream.close()
+            self.raw.close()
+        super().close()
+
+
+def open_text(path, mode='r', errors=None, newline=None):
+    """open() for text that compresses or decompresses as the path requires."""
+    if 'r' in mode:
+        codec = detect_codec(path)
+        if codec is None:
+            return open(path, mode, encoding='utf-8', errors=errors, newline=newline)
+        return io.TextIOWrapper(DecompressingReader(codec, open(path, 'rb')),
+                                encoding='utf-8', errors=errors, newline=newline)
+    codec = codec_for_path(path)
+    if codec is None:
+        return open(path, mode, encoding='utf-8', errors=errors, newline=newline)
+    if codec == 'zstd':
+        _need_zstd()
+    return io.TextIOWrapper(FramedWriter(open(path, mode.replace('t', '') + 'b'), codec),
+                            encoding='utf-8', errors=errors, newline=newline)
+
+
+def open_writer(path):
+    """Binary file for writing that compresses as path's extension says."""
+    codec = codec_for_path(path)
+    return FramedWriter(open(path, 'wb'), codec) if codec else open(path, 'wb')
+
+
+def compress_copy(src, path):
+    """Copy the binary file object src into path, compressing as its extension says."""
+    with open_writer(path) as out:
+        while True:
+            chunk = src.read(READ_SIZE)
+            if not chunk:
+                break
+            out.write(chunk)
+
+
+# ── Seeking ─────────────────────────────────────────────────────────────────
+
+def iter_frames(path):
+    """(frame offset, decompressed bytes) pieces in file order.
+
+    The frame offset is where the piece's frame starts in the file; plain
+    files are one frame at offset 0.
+    """
+    codec = detect_codec(path)
+    with open(path, 'rb') as raw:
+        if codec is None:
+            while True:
+                chunk = raw.read(READ_SIZE)
+                if not chunk:
+                    return
+                yield 0, chunk
+        yield from _decode_frames(codec, raw)
+
+
+def iter_lines(path, errors='replace'):
+    """(frame, offset, line) for every line of a plain or compressed file.
+
+    offset is the line's byte offset within its frame's decompressed data,
+    so open_at(path, frame, offset) resumes reading at that line.
+    """
+    frame = None
+    pos = 0
+    buf = b''
+    buf_frame = buf_offset = 0
+    for start, piece in iter_frames(path):
+        if start != frame:
+            frame, pos = start, 0
+        if not buf:
+            buf_frame, buf_offset = frame, pos
+        i = 0
+        while True:
+            nl = piece.find(b'\n', i)
+            if nl == -1:
+                break
+            yield buf_frame, buf_offset, (buf + piece[i:nl + 1]).decode('utf-8', errors)
+            buf = b''
+            i = nl + 1
+            buf_frame, buf_offset = frame, pos + i
+        buf += piece[i:]
+        pos += len(piece)
+    if buf:
+        yield buf_frame, buf_offset, buf.decode('utf-8', errors)
+
+
+def open_at(path, frame, offset, errors='replace'):
+    """Text stream positioned at a location reported by iter_lines()."""
+    codec = detect_codec(path)
+    raw = open(path, 'rb')
+    if codec is None:
+        raw.seek(frame + offset)
+        return io.TextIOWrapper(raw, encoding='utf-8', errors=errors)
+    raw.seek(frame)
+    stream = DecompressingReader(codec, raw)
+    while offset > 0:
+        skipped = stream.read(min(offset, READ_SIZE))
+        if not skipped:
+            break
+        offset -= len(skipped)
+    return io.TextIOWrapper(stream, encoding='utf-8', errors=errors)
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""Endpoint catalog: joins API callers to the Next.js route files that serve them.
+
+Every endpoint in the enhancer's META APIs lines is normalised into a route
+trie ({param} and [id] folders become dynamic segments, [...slug] a
+catch-all of one or more segments, [[...slug]] an optional one that also
+serves its parent path). app/api/**/route.ts files are mapped to their routes and their
+HANDLER methods, and callers are matched against the handlers in one pass.
+The catalog is saved to disk and rebuilt only when the enhanced file changes.
+
+    python3 endpoint_catalog.py who-calls /api/exchanges
+    python3 endpoint_catalog.py dead-routes
+    python3 endpoint_catalog.py unresolved
+    python3 endpoint_catalog.py routes
+"""
+import argparse
+import re
+import sys
+
+from compressed_io import open_text
+from stamp_cache import load_derived
+from validate_enhanced import split_meta_list
+
+INPUT = "/Users/markflynn/Local Sites/yesallofus/swift-reference/monolithic_enhanced.txt"
+CATALOG = "/Users/markflynn/Local Sites/yesallofus/swift-reference/endpoint_catalog.json"
+
+CATALOG_VERSION = 2
+ROUTE_FILE_RE = re.compile(r'^(?:src/)?(?:app/(?P<app>(?:.*/)?)route|pages/(?P<pages>api(?:/.*?)??)(?:/index)?)\.(?:ts|js|tsx|jsx)$')
+PARAM = '{param}'
+CATCH_ALL = '{*}'
+OPTIONAL_CATCH_ALL = '{*?}'
+
+
+# ── Routes ──────────────────────────────────────────────────────────────────
+
+def route_for_file(filepath):
+    """URL pattern served by a route file, or None if it is not one."""
+    m = ROUTE_FILE_RE.match(filepath)
+    if not m:
+        return None
+    path = m.group('app') if m.group('app') is not None else m.group('pages')
+    segments = []
+    for seg in path.split('/'):
+        if not seg or seg.startswith('(') or seg.startswith('@'):
+            continue  # route groups and parallel-route slots are not in the URL
+        if seg.startswith('[[...'):
+            segments.append(OPTIONAL_CATCH_ALL)
+        elif seg.startswith('[...'):
+            segments.append(CATCH_ALL)
+        elif seg.startswith('['):
+            segments.append(PARAM)
+        else:
+            segments.append(seg)
+    return '/' + '/'.join(segments)
+
+
+def normalise(endpoint):
+    """Caller endpoint -> route pattern: no query string, no trailing slash,
+    every interpolated segment a {param}. EXTERNAL: endpoints keep their domain."""
+    path = endpoint[len('EXTERNAL:'):] if endpoint.startswith('EXTERNAL:') else endpoint
+    path = path.split('?', 1)[0].split('#', 1)[0]
+    segments = []
+    for seg in path.split('/'):
+        if not seg:
+            continue
+        segments.append(PARAM if '{' in seg or '$' in seg else seg)
+    route = '/'.join(segments)
+    return route if endpoint.startswith('EXTERNAL:') else '/' + route
+
+
+class RouteNode:
+    __slots__ = ('children', 'pattern')
+
+    def __init__(self):
+        self.children = {}
+        self.pattern = None
+
+
+class RouteTrie:
+    """Route patterns by segment; literal segments win over dynamic ones."""
+
+    def __init__(self, patterns=()):
+        self.root = RouteNode()
+        for p in patterns:
+            self.insert(p)
+
+    def insert(self, pattern):
+        node = self.root
+        for seg in pattern.strip('/').split('/'):
+            if seg:
+                node = node.children.setdefault(seg, RouteNode())
+        node.pattern = pattern
+
+    def match(self, path):
+        """Handler pattern serving path, or None."""
+        return self._match(self.root, [s for s in path.strip('/').split('/') if s], 0)
+
+    def _match(self, node, segments, i):
+        if i == len(segments):
+            if node.pattern is not None:
+                return node.pattern
+            # Only an optional catch-all matches zero segments
+            tail = node.children.get(OPTIONAL_CATCH_ALL)
+            return tail.pattern if tail is not None else None
+        seg = segments[i]
+        if seg != PARAM and seg in node.children:
+            found = self._match(node.children[seg], segments, i + 1)
+            if found:
+                return found
+        if PARAM in node.children:
+            found = self._match(node.children[PARAM], segments, i + 1)
+            if found:
+                return found
+        tail = node.children.get(CATCH_ALL) or node.children.get(OPTIONAL_CATCH_ALL)
+        return tail.pattern if tail is not None else None
+
+
+# ── Build ───────────────────────────────────────────────────────────────────
+
+def read_apis(path):
+    """Stream the enhanced file into [(filepath, [endpoint, ...])] from the
+    first META APIs line of each section."""
+    sections = []
+    with open_text(path, errors='replace') as f:
+        for line in f:
+            s = line.strip()
+            if s.startswith('// FILE:'):
+                sections.append((s.replace('// FILE:', '').strip(), None))
+            elif sections and sections[-1][1] is None and s.startswith('// META: APIs:'):
+                sections[-1] = (sections[-1][0], split_meta_list(s[len('// META: APIs:'):].strip()))
+    return [(fp, apis or []) for fp, apis in sections]
+
+
+def build_catalog(path):
+    """One pass over the sections, then every caller matched against the trie."""
+    routes = {}
+    calls = []
+    external = {}
+    for filepath, apis in read_apis(path):
+        pattern = route_for_file(filepath)
+        if pattern is not None:
+            methods = [ep.split(':', 1)[1] for ep in apis if ep.startswith('HANDLER:')]
+            route = routes.setdefault(pattern, {'handlers': [], 'callers': []})
+            route['handlers'].append([filepath, methods])
+        for ep in apis:
+            if ep.startswith('HANDLER:'):
+                continue
+            if ep.startswith('EXTERNAL:'):
+                external.setdefault(normalise(ep), []).append(filepath)
+            else:
+                calls.append((normalise(ep), ep, filepath))
+
+    trie = RouteTrie(routes)
+    unresolved = {}
+    for norm, raw, filepath in calls:
+        pattern = trie.match(norm)
+        if pattern is not None:
+            routes[pattern]['callers'].append([filepath, raw])
+        else:
+            unresolved.setdefault(norm, []).append(filepath)
+
+    return {
+        'routes': routes,
+        'unresolved': unresolved,
+        'external': external,
+    }
+
+
+def load_catalog(path, catalog_path, rebuild=False):
+    """Load the saved catalog, rebuilding it when missing, stale or corrupt."""
+    return load_derived(path, catalog_path, CATALOG_VERSION, build_catalog, rebuild)
+
+
+# ── Query ───────────────────────────────────────────────────────────────────
+
+def who_calls(catalog, route):
+    """(handler pattern, callers) for a route or concrete path."""
+    norm = normalise(route)
+    pattern = RouteTrie(catalog['routes']).match(norm)
+    if pattern is not None:
+        return pattern, catalog['routes'][pattern]['callers']
+    return None, [[fp, norm] for fp in catalog['unresolved'].get(norm, [])]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('query', choices=('who-calls', 'dead-routes', 'unresolved', 'routes'))
+    parser.add_argument('route', nargs='?', help='route or path for who-calls, e.g. /api/items/42')
+    parser.add_argument('--input', default=INPUT, help='enhanced monolith to catalog')
+    parser.add_argument('--catalog-file', default=CATALOG, help='where the catalog is saved')
+    parser.add_argument('--rebuild', action='store_true', help='rebuild the catalog even if it is current')
+    args = parser.parse_args(argv)
+
+    catalog = load_catalog(args.input, args.catalog_file, args.rebuild)
+    routes = catalog['routes']
+
+    if args.query == 'who-calls':
+        if not args.route:
+            parser.error('who-calls needs a route')
+        pattern, callers = who_calls(catalog, args.route)
+        if pattern is not None:
+            handlers = ', '.join(f"{fp} [{','.join(m) or '?'}]" for fp, m in routes[pattern]['handlers'])
+            print(f"{pattern} -> {handlers}")
+        else:
+            print(f"{normalise(args.route)} (no handler in this project)")
+        for fp, raw in callers:
+            print(f"  {fp}  {raw}")
+        print(f"\n{len(callers)} caller(s)")
+        return 0 if callers else 1
+
+    if args.query == 'dead-routes':
+        dead = sorted(p for p, r in routes.items() if not r['callers'])
+        for p in dead:
+            print(f"{p}  {', '.join(fp for fp, _ in routes[p]['handlers'])}")
+        print(f"\n{len(dead)} route(s) with no callers")
+        return 0
+
+    if args.query == 'unresolved':
+        local = {p: fps for p, fps in catalog['unresolved'].items() if p.startswith('/api/')}
+        for p, fps in sorted(local.items()):
+            print(f"{p}  ({len(fps)}) {', '.join(sorted(set(fps)))}")
+        print(f"\n{len(local)} /api/ endpoint(s) called without a handler here; "
+              f"{len(catalog['unresolved']) - len(local)} other backend endpoint(s)")
+        return 0
+
+    for p, r in sorted(routes.items()):
+        methods = sorted({m for _, ms in r['handlers'] for m in ms})
+        print(f"{p}  [{','.join(methods) or '?'}]  {len(r['callers'])} caller(s)")
+    print(f"\n{len(routes)} route(s), {sum(len(v) for v in catalog['unresolved'].values())} unresolved call(s), "
+          f"{len(catalog['external'])} external endpoint(s)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
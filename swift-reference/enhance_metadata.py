@@ -1,120 +1,297 @@
 #!/usr/bin/env python3
 """Enhance monolithic_with_marks.txt with comprehensive metadata for Swift conversion."""
+import argparse
+import io
 import re
 import os
+import signal
+import sys
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import cached_property
+
+from add_marks import build_outline
+from classification_rules import SCAN_WINDOWS, load_rules
+from compressed_io import open_text
+from memory_profile import MemoryProfile, format_bytes, peak_rss
+from run_metrics import Progress, RunMetrics
+from shared_sections import SharedText, attach, default_jobs, iter_ordered, shared_text, use_pool
+from type_table import (balanced_span, build_type_table, format_decl, parse_type_fields,
+                        split_top_level, type_names)
 
 INPUT = "/Users/markflynn/Local Sites/yesallofus/swift-reference/monolithic_with_marks.txt"
 OUTPUT = "/Users/markflynn/Local Sites/yesallofus/swift-reference/monolithic_enhanced.txt"
+RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'classification_rules.json')
+
+# File type, flow and framework rules, compiled once at startup
+RULES = load_rules(RULES_PATH)
+
+
+# ── Records ──────────────────────────────────────────────────────────────────
+
+class Section:
+    """A file section: path, separator header lines and body lines."""
+    __slots__ = ('filepath', 'header', 'body')
+
+    def __init__(self, filepath, header, body):
+        self.filepath = filepath
+        self.header = header
+        self.body = body
+
+
+class StateVar:
+    """A useState/useReducer declaration."""
+    __slots__ = ('name', 'setter', 'type', 'initial', 'kind')
+
+    def __init__(self, name, setter, type, initial, kind):
+        self.name = name
+        self.setter = setter
+        self.type = sys.intern(type)
+        self.initial = initial
+        self.kind = kind
+
+
+# ── Guardrails ───────────────────────────────────────────────────────────────
+
+# Size classes by section length in characters; anything larger is 'huge'
+SIZE_CLASSES = ((256 * 1024, 'small'), (1024 * 1024, 'large'))
+# Longer lines are inline SVG/JSON or minified code, not worth scanning
+LONG_LINE = 2000
+# Seconds an extractor may run on one section before its linear fallback is used
+EXTRACTOR_BUDGET = 2.0
+
+
+class BudgetExceeded(Exception):
+    pass
+
+
+def _budget_alarm(signum, frame):
+    raise BudgetExceeded()
+
+
+@contextmanager
+def time_budget(seconds):
+    """Raise BudgetExceeded if the block runs longer than seconds.
+
+    Uses SIGALRM, which the regex engine checks while it backtracks; where
+    that is unavailable (Windows, non-main threads) the block is unbounded.
+    """
+    if (not seconds or not hasattr(signal, 'setitimer')
+            or threading.current_thread() is not threading.main_thread()):
+        yield
+        return
+    previous = signal.signal(signal.SIGALRM, _budget_alarm)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def size_class(code):
+    """small / large / huge by length, or minified when long lines dominate."""
+    long_chars = sum(len(line) for line in code.split('\n') if len(line) > LONG_LINE)
+    if long_chars * 2 > len(code):
+        return 'minified'
+    for limit, name in SIZE_CLASSES:
+        if len(code) <= limit:
+            return name
+    return 'huge'
+
+
+def without_long_lines(code):
+    """code with over-long lines blanked; line structure is kept."""
+    return '\n'.join('' if len(line) > LONG_LINE else line for line in code.split('\n'))
+
+
+def per_line(extract, code):
+    """Run a list extractor on each line separately, merging in first-seen order.
+
+    Every regex then sees at most LONG_LINE characters, so the cost is linear
+    in the section size; constructs spanning lines are missed.
+    """
+    merged = []
+    for line in code.split('\n'):
+        if line.strip():
+            for item in extract(line):
+                if item not in merged:
+                    merged.append(item)
+    return merged
+
+
+PROPS_OPEN_RE = re.compile(r'function\s+\w+\s*\(\s*\{')
+
+
+def extract_props_linear(code):
+    """extract_props reduced to the first destructured function parameter."""
+    m = PROPS_OPEN_RE.search(code)
+    if not m:
+        return []
+    end = code.find('}', m.end())
+    props = []
+    for p in code[m.end():end if end != -1 else m.end()].split(','):
+        name = re.split(r'\s*[=:]\s*', p.strip())[0].strip()
+        if name and not name.startswith('//'):
+            props.append(name)
+    return props
+
+
+def imported_names_linear(code):
+    names = {}
+    for line in code.split('\n'):
+        if 'import' in line:
+            names.update(extract_imported_names(line))
+    return names
+
+
+class SectionAnalysis:
+    """Per-section metadata, each extractor run only when its field is first read.
+
+    type_table, the project-wide TypeTable, lets state types and the Types
+    field resolve declarations made in other sections.
+
+    Code-scanning extractors run under a time budget. If one overruns, or
+    the section is huge or minified, a cheaper linear fallback gives the
+    value instead and the extractor is recorded in limits. overran is set
+    when a budget ran out, as that depends on the machine's load rather than
+    on the section.
+    """
+
+    def __init__(self, section, type_table=None, budget=EXTRACTOR_BUDGET):
+        self.section = section
+        self.filepath = section.filepath
+        self.type_table = type_table
+        self.budget = budget
+        self.limits = []
+        self.overran = False
+
+    @cached_property
+    def code(self):
+        return ''.join(self.section.body)
+
+    @cached_property
+    def size_class(self):
+        return size_class(self.code)
+
+    @cached_property
+    def scan_code(self):
+        """What extractors read: the code, minus over-long lines unless small."""
+        return self.code if self.size_class == 'small' else without_long_lines(self.code)
+
+    def _guarded(self, name, extract, fallback):
+        if self.size_class in ('huge', 'minified'):
+            self.limits.append(name)
+            return fallback()
+        try:
+            with time_budget(self.budget):
+                return extract()
+        except BudgetExceeded:
+            self.limits.append(name)
+            self.overran = True
+            return fallback()
+
+    @cached_property
+    def file_type(self):
+        return sys.intern(self._guarded(
+            'type', lambda: classify_file_type(self.filepath, self.scan_code),
+            lambda: classify_file_type(self.filepath, '')))
+
+    @cached_property
+    def flow(self):
+        return sys.intern(self._guarded(
+            'flow', lambda: classify_flow(self.filepath, self.scan_code),
+            lambda: classify_flow(self.filepath, '')))
+
+    @cached_property
+    def framework(self):
+        return sys.intern(self._guarded(
+            'framework', lambda: classify_framework(self.filepath, self.scan_code),
+            lambda: classify_framework(self.filepath, '')))
+
+    @cached_property
+    def states(self):
+        return self._guarded(
+            'state', lambda: extract_state_variables(self.scan_code, TypeInference(self.scan_code, self.type_table)),
+            lambda: per_line(extract_state_variables, self.scan_code))
+
+    @cached_property
+    def props(self):
+        return self._guarded('props', lambda: extract_props(self.scan_code),
+                             lambda: extract_props_linear(self.scan_code))
+
+    @cached_property
+    def contexts(self):
+        return self._guarded('context', lambda: extract_contexts(self.scan_code),
+                             lambda: per_line(extract_contexts, self.scan_code))
+
+    @cached_property
+    def apis(self):
+        return self._guarded('apis', lambda: extract_api_endpoints(self.scan_code),
+                             lambda: per_line(extract_api_endpoints, self.scan_code))
+
+    @cached_property
+    def imports(self):
+        return self._guarded('dependencies', lambda: extract_imports(self.scan_code),
+                             lambda: per_line(extract_imports, self.scan_code))
+
+    @cached_property
+    def types(self):
+        return referenced_types(self.filepath, self.states, self.type_table)
+
+    @cached_property
+    def calls(self):
+        setters = [s.setter for s in self.states]
+        return self._guarded('calls', lambda: build_call_map(self.scan_code.split('\n'), setters),
+                             lambda: [])
+
+    @cached_property
+    def tree(self):
+        return self._guarded(
+            'tree', lambda: build_dependency_tree(self.filepath, self.scan_code, extract_imported_names(self.scan_code)),
+            lambda: build_dependency_tree(self.filepath, self.scan_code, imported_names_linear(self.scan_code)))
+
+
+# Selectable output fields, in the order they are written
+FIELDS = ('type', 'flow', 'framework', 'state', 'props', 'context', 'apis', 'calls', 'dependencies', 'types', 'tree')
+
+
+def parse_fields(value):
+    """Parse a --fields value like 'apis,state' into a tuple of field names."""
+    if not value or value == 'all':
+        return FIELDS
+    fields = [f.strip().lower() for f in value.split(',') if f.strip()]
+    unknown = [f for f in fields if f not in FIELDS]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown field(s): {', '.join(unknown)} (choose from {', '.join(FIELDS)})")
+    return tuple(f for f in FIELDS if f in fields)
+
 
 # ── Helpers ──────────────────────────────────────────────────────────────────
 
 def classify_file_type(filepath, code):
     """Determine: Page Component, UI Component, API Route, Utility, Hook, Service, Config, Middleware."""
-    fp = filepath.lower()
-
-    if '/api/' in fp:
-        return 'API Route'
-    if fp.endswith('middleware.ts') or fp.endswith('middleware.tsx'):
-        return 'Middleware'
-    if '/hooks/' in fp or os.path.basename(fp).startswith('use'):
-        return 'Hook'
-    if '/services/' in fp or '/lib/' in fp:
-        if 'xrpl' in fp or 'auth' in fp or 'wallet' in fp or 'sound' in fp:
-            return 'Service'
-        return 'Utility'
-    if '/utils/' in fp or '/helpers/' in fp:
-        return 'Utility'
-    if '/config/' in fp or fp.endswith('config.ts') or fp.endswith('config.tsx'):
-        return 'Config'
-    if 'page.tsx' in fp or 'page.ts' in fp:
-        return 'Page Component'
-    if '/components/' in fp:
-        return 'UI Component'
-    if 'layout.tsx' in fp or 'layout.ts' in fp:
-        return 'Layout Component'
-    if '/context/' in fp or '/providers/' in fp:
-        return 'Context Provider'
-    if '/types/' in fp or fp.endswith('.d.ts'):
-        return 'Type Definition'
-    # Fallback: check for JSX/component patterns
-    if re.search(r'export\s+(default\s+)?function\s+\w+', code) and ('<' in code):
-        return 'UI Component'
-    if re.search(r'(GET|POST|PUT|DELETE|PATCH)\s*\(', code):
-        return 'API Route'
-    return 'Module'
+    return RULES['file_type'].lookup(filepath.lower(), code) or 'Module'
 
 
 def classify_flow(filepath, code):
     """Determine: Affiliate, Vendor, Shared."""
-    fp = filepath.lower()
-    code_lower = code.lower()
-
-    is_affiliate = (
-        '/affiliate' in fp or
-        'affiliate' in os.path.basename(fp).lower() or
-        re.search(r'\baffiliate\b', code_lower[:2000]) is not None
-    )
-    is_vendor = (
-        '/vendor' in fp or '/pos' in fp or '/inventory' in fp or '/staff' in fp or
-        'vendor' in os.path.basename(fp).lower() or
-        re.search(r'\bvendor\b', code_lower[:2000]) is not None
-    )
-    # Check for member-specific
-    is_member = '/member' in fp or 'member' in os.path.basename(fp).lower()
-
-    if is_affiliate and is_vendor:
-        return 'SHARED'
-    if is_affiliate:
-        return 'AFFILIATE ONLY'
-    if is_vendor:
-        return 'VENDOR ONLY'
-    if is_member:
-        return 'MEMBER ONLY'
-
-    # Shared indicators
-    shared_indicators = [
-        '/components/', '/lib/', '/services/', '/hooks/', '/utils/',
-        '/context/', '/providers/', '/config/', 'layout.tsx',
-        '/api/', '/types/', 'middleware'
-    ]
-    for ind in shared_indicators:
-        if ind in fp:
-            return 'SHARED'
-
-    # Check route groups
-    if '/(main)/' in fp:
-        # Analyze page content
-        if re.search(r'\b(affiliate|referral|commission|share.*link)\b', code_lower[:3000]):
-            return 'AFFILIATE ONLY'
-        if re.search(r'\b(vendor|pos|inventory|staff|barcode)\b', code_lower[:3000]):
-            return 'VENDOR ONLY'
-
-    return 'SHARED'
+    return RULES['flow'].lookup(filepath.lower(), code) or 'SHARED'
 
 
 def classify_framework(filepath, code):
     """Determine: React, Next.js, Node.js, TypeScript."""
-    fp = filepath.lower()
-    if '/api/' in fp:
-        if 'NextRequest' in code or 'NextResponse' in code:
-            return 'Next.js API Route'
-        return 'Node.js'
-    if "'use client'" in code or '"use client"' in code:
-        return 'React (Client Component)'
-    if 'use server' in code:
-        return 'Next.js (Server Action)'
-    if re.search(r'(getServerSideProps|getStaticProps|generateMetadata|generateStaticParams)', code):
-        return 'Next.js (Server Component)'
-    if fp.endswith('.tsx') or fp.endswith('.jsx'):
-        if '<' in code and ('return' in code or 'render' in code):
-            return 'Next.js (Server Component)'
-    if fp.endswith('.ts'):
-        return 'TypeScript'
-    return 'Next.js'
-
-
-def extract_state_variables(code):
-    """Extract useState and useReducer declarations with types."""
+    return RULES['framework'].lookup(filepath.lower(), code) or 'Next.js'
+
+
+def extract_state_variables(code, inference=None):
+    """Extract useState and useReducer declarations with types.
+
+    With a TypeInference, types the initial value leaves vague are refined
+    from how the state is used in the section.
+    """
     states = []
 
     # useState: const [x, setX] = useState<Type>(initial) or useState(initial)
@@ -134,26 +311,17 @@ def extract_state_variables(code):
         else:
             typ = infer_type_from_initial(initial)
 
-        states.append({
-            'name': name,
-            'setter': setter,
-            'type': typ,
-            'initial': initial,
-            'kind': 'useState'
-        })
+        state = StateVar(name, setter, typ, initial, 'useState')
+        if inference is not None and not explicit_type and (typ in VAGUE_TYPES or typ == initial):
+            state.type = sys.intern(inference.refine(state))
+        states.append(state)
 
     # useReducer
     for m in re.finditer(
         r'const\s+\[(\w+),\s*(\w+)\]\s*=\s*useReducer\s*\((\w+)',
         code
     ):
-        states.append({
-            'name': m.group(1),
-            'setter': m.group(2),
-            'type': 'Reducer',
-            'initial': m.group(3),
-            'kind': 'useReducer'
-        })
+        states.append(StateVar(m.group(1), m.group(2), 'Reducer', m.group(3), 'useReducer'))
 
     return states
 
@@ -187,6 +355,249 @@ def infer_type_from_initial(initial):
     return initial  # could be a variable reference
 
 
+# ── Type inference ───────────────────────────────────────────────────────────
+
+# Types infer_type_from_initial gives when the initial value says too little
+VAGUE_TYPES = frozenset(('unknown', 'nullable', 'Array', 'Object'))
+
+USAGE_RE = re.compile(
+    r'\b(?P<setter>set[A-Z]\w*)\s*\('
+    r'|\b(?P<coll>\w+)\??\.(?:map|filter|forEach|find|findIndex|some|every|flatMap)\(\s*\(?\s*\w+\s*:\s*'
+    r'(?P<elem>[\w.]+(?:<[^<>()]*>)?(?:\[\])*)'
+    r'|\b(?:interface\s+(?P<iface>\w+)[^{;=]*|type\s+(?P<alias>\w+)\s*=\s*)\{'
+)
+AS_TYPE_RE = re.compile(r'\bas\s+([\w.]+(?:<[^<>()]*>)?(?:\[\])*(?:\s*\|\s*null)?)$')
+PROP_DEFAULT_RE = re.compile(r'^(\w+)\s*=\s*(.+)$', re.DOTALL)
+ARROW_RE = re.compile(r'^(?:\(\s*\w*\s*\)|\w+)\s*=>')
+MEMBER_TYPES = {'message': 'string', 'length': 'number'}
+
+
+def singular_candidates(name):
+    """Type names a collection called name would hold: vendors -> Vendor."""
+    base = name[0].upper() + name[1:]
+    out = []
+    if base.endswith('ies'):
+        out.append(base[:-3] + 'y')
+    if base.endswith('es'):
+        out.append(base[:-2])
+    if base.endswith('s'):
+        out.append(base[:-1])
+    for suffix in ('List', 'Items', 'Data'):
+        if base.endswith(suffix) and len(base) > len(suffix):
+            out.append(base[:-len(suffix)])
+    return out
+
+
+class TypeInference:
+    """Usage-based types for state whose initial value leaves the type vague.
+
+    The section is scanned once, on first use, for setter calls, typed
+    collection callbacks (.map((v: T) => ...)) and interface/type
+    declarations; the type inferred for each identifier is memoised.
+    Collection names that match no local declaration are looked up in the
+    project-wide table, if given.
+    """
+    __slots__ = ('code', 'table', '_setter_args', '_elements', '_declared', '_props', '_memo')
+
+    def __init__(self, code, table=None):
+        self.code = code
+        self.table = table
+        self._setter_args = None
+        self._elements = {}
+        self._declared = {}
+        self._props = {}
+        self._memo = {}
+
+    def _scan(self):
+        code = self.code
+        self._setter_args = {}
+        for m in USAGE_RE.finditer(code):
+            if m.group('setter'):
+                args = balanced_span(code, m.end() - 1, limit=400)
+                if args is not None:
+                    self._setter_args.setdefault(m.group('setter'), []).append(args.strip())
+            elif m.group('coll'):
+                self._elements.setdefault(m.group('coll'), m.group('elem'))
+            else:
+                name = m.group('iface') or m.group('alias')
+                body = balanced_span(code, m.end() - 1)
+                if body is not None and name not in self._declared:
+                    self._declared[name] = parse_type_fields(body)
+        for name, fields in self._declared.items():
+            if 'Props' in name:
+                for field, (typ, _) in fields.items():
+                    self._props.setdefault(field, typ)
+        # Destructuring defaults type props the Props interface does not
+        m = re.search(r'function\s+\w+\s*\(\s*\{([^}]+)\}', code)
+        if m:
+            for item in split_top_level(m.group(1)):
+                d = PROP_DEFAULT_RE.match(item)
+                if d and d.group(1) not in self._props:
+                    typ = self.value_type(d.group(2))
+                    if typ:
+                        self._props[d.group(1)] = typ
+
+    def refine(self, state):
+        """A more specific type for a vague StateVar, or its current type."""
+        if self._setter_args is None:
+            self._scan()
+        key = (state.name, state.initial)
+        if key not in self._memo:
+            self._memo[key] = self._infer(state) or state.type
+        return self._memo[key]
+
+    def _infer(self, state):
+        typ = state.type
+        if typ == 'Array':
+            elem = self._array_element(state)
+            return f'{elem}[]' if elem else None
+        if typ == 'Object':
+            return self._object_type(state)
+        assigned = self._setter_type(state.setter)
+        if typ == 'nullable':
+            return f'{assigned} | null' if assigned and not assigned.endswith('| null') else assigned
+        # unknown, or a raw expression such as a prop name or lazy initialiser
+        return self.value_type(state.initial) or assigned
+
+    def value_type(self, expr):
+        """Type of a simple expression, or None if it can't be told."""
+        expr = expr.strip().rstrip(';')
+        if not expr or expr in ('null', 'undefined'):
+            return None
+        m = AS_TYPE_RE.search(expr)
+        if m:
+            return m.group(1)
+        if expr.startswith('!'):
+            return 'boolean'
+        if expr.startswith('['):
+            elem = self._common_type(split_top_level(expr[1:-1]) if expr.endswith(']') else [])
+            return f'{elem}[]' if elem else None
+        if expr.startswith('{'):
+            return self._literal_type(expr)
+        literal = infer_type_from_initial(expr)
+        if literal not in VAGUE_TYPES and literal != expr:
+            return literal
+        if expr in self._props:
+            return self._props[expr].replace(' | undefined', '')
+        for op in ('??', '||'):
+            if op in expr:
+                # x || '' is typed by its fallback
+                return self.value_type(expr.rsplit(op, 1)[1])
+        member = expr.rsplit('.', 1)[-1] if '.' in expr else None
+        if member in MEMBER_TYPES and re.match(r'^[\w.?]+$', expr):
+            return MEMBER_TYPES[member]
+        return None
+
+    def _common_type(self, exprs):
+        types = {self.value_type(e) for e in exprs}
+        if len(types) == 1 and None not in types:
+            return types.pop()
+        return None
+
+    def _setter_type(self, setter):
+        """The one type every typed setter call agrees on."""
+        types = set()
+        for arg in self._setter_args.get(setter, ()):
+            if ARROW_RE.match(arg) or arg in ('null', 'undefined'):
+                continue
+            typ = self.value_type(arg)
+            if typ:
+                types.add(typ)
+        return types.pop() if len(types) == 1 else None
+
+    def _declared_match(self, keys):
+        """Smallest declared type whose fields cover keys."""
+        best = None
+        for name, fields in self._declared.items():
+            if keys and keys <= fields.keys() and (best is None or len(fields) < len(self._declared[best])):
+                best = name
+        return best
+
+    def _array_element(self, state):
+        name = state.name
+        if name in self._elements:
+            return self._elements[name]
+        initial = state.initial.strip()
+        if initial.startswith('[') and initial.endswith(']') and initial != '[]':
+            elem = self._common_type(split_top_level(initial[1:-1]))
+            if elem:
+                return elem
+        assigned = self._setter_type(state.setter)
+        if assigned and assigned.endswith('[]'):
+            return assigned[:-2]
+        candidates = singular_candidates(name)
+        declared = {n.lower(): n for n in self._declared}
+        for cand in candidates:
+            if cand.lower() in declared:
+                return declared[cand.lower()]
+        if self.table is not None:
+            for cand in candidates:
+                if cand in self.table:
+                    return cand
+        return None
+
+    def _object_type(self, state):
+        initial = state.initial.strip()
+        if initial.startswith('{') and initial != '{}':
+            literal = self._literal_type(initial)
+            if literal:
+                return literal
+        assigned = self._setter_type(state.setter)
+        return assigned if assigned and assigned != 'Object' else None
+
+    def _literal_type(self, expr):
+        """Declared type matching an object literal's keys, else an inline type."""
+        body = expr.strip()
+        if not (body.startswith('{') and body.endswith('}')):
+            return None
+        pairs = []
+        for item in split_top_level(body[1:-1]):
+            key, sep, value = item.partition(':')
+            if not sep or not re.match(r'^[\'"]?\w+[\'"]?$', key.strip()):
+                return None
+            pairs.append((key.strip().strip('\'"'), value))
+        if not pairs:
+            return None
+        declared = self._declared_match({k for k, _ in pairs})
+        if declared:
+            return declared
+        fields = []
+        for key, value in pairs:
+            typ = self.value_type(value)
+            if not typ:
+                return None
+            fields.append(f'{key}: {typ}')
+        return '{ ' + '; '.join(fields) + ' }'
+
+
+# Cap on declarations listed per section once nested field types are followed
+MAX_TYPES = 12
+
+
+def referenced_types(filepath, states, table):
+    """Declarations the section's state types and its own Props types refer
+    to, formatted with their fields; field types are followed transitively."""
+    if table is None:
+        return []
+    queue = []
+    for s in states:
+        queue.extend(type_names(s.type))
+    queue.extend(n for n in table.names() if 'Props' in n and table.get(n, filepath).filepath == filepath)
+    seen = []
+    for name in queue:
+        if len(seen) >= MAX_TYPES:
+            break
+        if name in seen or name not in table:
+            continue
+        seen.append(name)
+        decl = table.get(name, filepath)
+        for _, typ, _ in table.fields(name, filepath):
+            queue.extend(type_names(typ))
+        if decl.alias:
+            queue.extend(type_names(decl.alias))
+    return [format_decl(table.get(n, filepath), table.fields(n, filepath)) for n in seen]
+
+
 def extract_props(code):
     """Extract component props."""
     props = []
@@ -457,33 +868,153 @@ def build_dependency_tree(filepath, code, imported_names):
     return tree_lines
 
 
-def add_type_annotations(lines, states):
-    """Insert TYPE annotations above useState/useReducer declarations."""
+def type_annotations(lines, states):
+    """(line index, TYPE comment) for each useState/useReducer declaration."""
     if not states:
-        return lines
+        return []
 
-    result = []
+    annotations = []
     state_map = {}
     for s in states:
         # Build a search pattern for this state declaration
-        key = f'[{s["name"]}, {s["setter"]}]'
+        key = f'[{s.name}, {s.setter}]'
         state_map[key] = s
 
-    for line in lines:
+    for i, line in enumerate(lines):
         stripped = line.strip()
         # Check if this line has a useState/useReducer
         for key, s in state_map.items():
-            pattern = re.escape(s['name']) + r',\s*' + re.escape(s['setter'])
+            pattern = re.escape(s.name) + r',\s*' + re.escape(s.setter)
             if re.search(pattern, stripped) and ('useState' in stripped or 'useReducer' in stripped):
                 indent = len(line) - len(line.lstrip())
                 spaces = ' ' * indent
-                result.append(f'{spaces}// TYPE: {s["type"]}\n')
+                annotations.append((i, f'{spaces}// TYPE: {s.type}\n'))
                 break
-        result.append(line)
 
+    return annotations
+
+
+def apply_annotations(lines, annotations):
+    """lines with each (index, text) annotation inserted above its line."""
+    if not annotations:
+        return lines
+    result = []
+    prev = 0
+    for i, text in annotations:
+        result.extend(lines[prev:i])
+        result.append(text)
+        prev = i
+    result.extend(lines[prev:])
     return result
 
 
+def add_type_annotations(lines, states):
+    """Insert TYPE annotations above useState/useReducer declarations."""
+    return apply_annotations(lines, type_annotations(lines, states))
+
+
+# ── Call map ─────────────────────────────────────────────────────────────────
+
+# Outline kinds that are call targets; components and effects are not called by name
+CALLABLE_KINDS = ('handler', 'hook', 'api', 'function')
+
+
+class HandlerCalls:
+    """What one handler reaches: helpers it calls (directly or through other
+    helpers), endpoints those calls hit and state setters they invoke."""
+    __slots__ = ('name', 'helpers', 'apis', 'setters')
+
+    def __init__(self, name, helpers, apis, setters):
+        self.name = name
+        self.helpers = helpers
+        self.apis = apis
+        self.setters = setters
+
+    def __str__(self):
+        parts = []
+        if self.helpers:
+            parts.append('helpers: ' + ' '.join(self.helpers))
+        if self.apis:
+            parts.append('apis: ' + ' '.join(self.apis))
+        if self.setters:
+            parts.append('sets: ' + ' '.join(self.setters))
+        return f"{self.name}({'; '.join(parts)})"
+
+
+def build_call_map(lines, setters):
+    """HandlerCalls for every handler in a section, from the MARK outline.
+
+    Each line is scanned once, for calls to the other items and to setters
+    and for endpoints, as part of the innermost item containing it; an item
+    also gets what its nested items found, and a handler then collects
+    everything reachable through the helpers it calls.
+    """
+    items = [item for item in build_outline(lines) if item.kind in CALLABLE_KINDS]
+    if not items:
+        return []
+    names = {item.name for item in items}
+    call_re = re.compile(r'(?<![\w$.])(' + '|'.join(map(re.escape, sorted(names | set(setters)))) + r')\s*\(')
+
+    # Outline items come in start order, so nested items overwrite their parents' lines
+    owner = [None] * len(lines)
+    parents = []
+    open_items = []
+    for k, item in enumerate(items):
+        while open_items and items[open_items[-1]].end < item.start:
+            open_items.pop()
+        parents.append(open_items[-1] if open_items else None)
+        open_items.append(k)
+        owner[item.start:item.end + 1] = [k] * (item.end + 1 - item.start)
+    own_lines = [[] for _ in items]
+    for line, k in zip(lines, owner):
+        if k is not None:
+            own_lines[k].append(line)
+
+    found = []
+    for item, item_lines in zip(items, own_lines):
+        text = '\n'.join(item_lines)
+        called = []
+        for m in call_re.finditer(text):
+            if m.group(1) not in called:
+                called.append(m.group(1))
+        apis = [ep for ep in extract_api_endpoints(text) if not ep.startswith('HANDLER:')]
+        found.append((called, apis))
+    # Innermost first, so a parent receives its children's findings complete
+    for k in range(len(items) - 1, -1, -1):
+        if parents[k] is not None:
+            p_called, p_apis = found[parents[k]]
+            p_called.extend(c for c in found[k][0] if c not in p_called)
+            p_apis.extend(a for a in found[k][1] if a not in p_apis)
+
+    direct = {}
+    for item, (called, apis) in zip(items, found):
+        called = [c for c in called if c != item.name]
+        # Items can share a name (a helper redeclared in two handlers); merge them
+        prev_called, prev_apis = direct.get(item.name, ([], []))
+        direct[item.name] = (prev_called + [c for c in called if c not in prev_called],
+                             prev_apis + [a for a in apis if a not in prev_apis])
+
+    calls = []
+    for item in items:
+        if item.kind != 'handler' or any(c.name == item.name for c in calls):
+            continue
+        helpers, apis, sets = [], [], []
+        pending, seen = [item.name], {item.name}
+        while pending:
+            called, endpoints = direct[pending.pop(0)]
+            apis.extend(ep for ep in endpoints if ep not in apis)
+            for name in called:
+                if name in names:
+                    if name not in seen:
+                        seen.add(name)
+                        helpers.append(name)
+                        pending.append(name)
+                elif name not in sets:
+                    sets.append(name)
+        calls.append(HandlerCalls(item.name, helpers, apis, sets))
+    return calls
+
+
 # ── Main Processing ──────────────────────────────────────────────────────────
 
 def parse_sections(all_lines):
@@ -501,11 +1032,7 @@ def parse_sections(all_lines):
         if stripped.startswith('// FILE:'):
             # Save previous section
             if current_filepath is not None:
-                sections.append({
-                    'filepath': current_filepath,
-                    'header': current_header,
-                    'body': current_body
-                })
+                sections.append(Section(current_filepath, current_header, current_body))
 
             # Start new section
             current_filepath = stripped.replace('// FILE:', '').strip()
@@ -544,32 +1071,18 @@ def parse_sections(all_lines):
 
     # Save last section
     if current_filepath is not None:
-        sections.append({
-            'filepath': current_filepath,
-            'header': current_header,
-            'body': current_body
-        })
+        sections.append(Section(current_filepath, current_header, current_body))
 
     return sections
 
 
-def process_section(section):
-    """Process a single file section and add metadata."""
-    filepath = section['filepath']
-    header_lines = section['header']
-    body_lines = section['body']
-    code = ''.join(body_lines)
-
-    # Analyze
-    file_type = classify_file_type(filepath, code)
-    flow = classify_flow(filepath, code)
-    framework = classify_framework(filepath, code)
-    states = extract_state_variables(code)
-    props = extract_props(code)
-    contexts = extract_contexts(code)
-    api_endpoints = extract_api_endpoints(code)
-    all_imports = extract_imports(code)
-    imported_names = extract_imported_names(code)
+def meta_list(values):
+    return f'[{", ".join(values)}]' if values else '[none]'
+
+
+def section_metadata(section, fields, analysis):
+    """Separator, FLOW, META and DEPENDENCY TREE lines written above the body."""
+    filepath = section.filepath
 
     # Build output
     result = []
@@ -581,67 +1094,191 @@ def process_section(section):
     result.append('// =================================================\n')
 
     # FLOW label
-    result.append(f'// FLOW: {flow}\n')
-    result.append('\n')
+    if 'flow' in fields:
+        result.append(f'// FLOW: {analysis.flow}\n')
+        result.append('\n')
 
     # META headers
-    result.append(f'// META: Type: {file_type}\n')
-    result.append(f'// META: Flow: {flow}\n')
-    result.append(f'// META: Framework: {framework}\n')
+    if 'type' in fields:
+        result.append(f'// META: Type: {analysis.file_type}\n')
+    if 'flow' in fields:
+        result.append(f'// META: Flow: {analysis.flow}\n')
+    if 'framework' in fields:
+        result.append(f'// META: Framework: {analysis.framework}\n')
+    if 'state' in fields:
+        result.append(f'// META: State: {meta_list([f"{s.name}:{s.type}" for s in analysis.states])}\n')
+    if 'props' in fields:
+        result.append(f'// META: Props: {meta_list(analysis.props)}\n')
+    if 'context' in fields:
+        result.append(f'// META: Context: {meta_list(analysis.contexts)}\n')
+    if 'apis' in fields:
+        result.append(f'// META: APIs: {meta_list(analysis.apis)}\n')
+    if 'calls' in fields:
+        result.append(f'// META: Calls: {meta_list([str(c) for c in analysis.calls])}\n')
+    if 'dependencies' in fields:
+        result.append(f'// META: Dependencies: {meta_list(analysis.imports)}\n')
+    if 'types' in fields:
+        result.append(f'// META: Types: {meta_list(analysis.types)}\n')
+    tree = analysis.tree if 'tree' in fields else ()
+    if analysis.limits:
+        # Fallback values are approximate; say which ones they are
+        result.append(f'// META: Limits: {meta_list([analysis.size_class] + analysis.limits)}\n')
 
-    if states:
-        state_strs = [f'{s["name"]}:{s["type"]}' for s in states]
-        result.append(f'// META: State: [{", ".join(state_strs)}]\n')
-    else:
-        result.append('// META: State: [none]\n')
-
-    if props:
-        result.append(f'// META: Props: [{", ".join(props)}]\n')
-    else:
-        result.append('// META: Props: [none]\n')
+    result.append('\n')
 
-    if contexts:
-        result.append(f'// META: Context: [{", ".join(contexts)}]\n')
-    else:
-        result.append('// META: Context: [none]\n')
+    # DEPENDENCY TREE
+    if 'tree' in fields:
+        result.append('// DEPENDENCY TREE:\n')
+        for tl in tree:
+            result.append(tl + '\n')
+        result.append('\n')
 
-    if api_endpoints:
-        result.append(f'// META: APIs: [{", ".join(api_endpoints)}]\n')
-    else:
-        result.append('// META: APIs: [none]\n')
+    return result
 
-    if all_imports:
-        result.append(f'// META: Dependencies: [{", ".join(all_imports)}]\n')
-    else:
-        result.append('// META: Dependencies: [none]\n')
 
-    result.append('\n')
-
-    # DEPENDENCY TREE
-    tree = build_dependency_tree(filepath, code, imported_names)
-    result.append('// DEPENDENCY TREE:\n')
-    for tl in tree:
-        result.append(tl + '\n')
-    result.append('\n')
+def process_section(section, fields=FIELDS, analysis=None):
+    """Process a single file section and add the selected metadata fields."""
+    if analysis is None:
+        analysis = SectionAnalysis(section)
+    result = section_metadata(section, fields, analysis)
 
     # Body with TYPE annotations added
-    annotated_body = add_type_annotations(body_lines, states)
-    result.extend(annotated_body)
+    if 'state' in fields:
+        result.extend(add_type_annotations(section.body, analysis.states))
+    else:
+        result.extend(section.body)
 
     return result
 
 
-def main():
+# ── Parallel analysis ────────────────────────────────────────────────────────
+
+class SectionRecord:
+    """What main needs from one analysed section: the metadata lines, TYPE
+    insertions into the body and the values the summary counts. Pickles as
+    a bare tuple, so workers never send a section body back."""
+    __slots__ = ('index', 'metadata', 'annotations', 'file_type', 'flow', 'framework',
+                 'counts', 'size_class', 'limits')
+
+    def __init__(self, index, metadata, annotations, file_type, flow, framework,
+                 counts, size_class, limits):
+        self.index = index
+        self.metadata = metadata
+        self.annotations = annotations
+        self.file_type = file_type
+        self.flow = flow
+        self.framework = framework
+        self.counts = counts    # (states, props, apis, contexts, types, handler call maps)
+        self.size_class = size_class
+        self.limits = limits
+
+    def __reduce__(self):
+        return (SectionRecord, tuple(getattr(self, name) for name in self.__slots__))
+
+
+def analyse_section(index, section, fields, type_table=None, budget=EXTRACTOR_BUDGET):
+    analysis = SectionAnalysis(section, type_table, budget)
+    metadata = section_metadata(section, fields, analysis)
+    annotations = type_annotations(section.body, analysis.states) if 'state' in fields else []
+    counts = tuple(len(getattr(analysis, attr)) if field in fields else 0
+                   for field, attr in (('state', 'states'), ('props', 'props'), ('apis', 'apis'),
+                                       ('context', 'contexts'), ('types', 'types'), ('calls', 'calls')))
+    return SectionRecord(
+        index, metadata, annotations,
+        analysis.file_type if 'type' in fields else None,
+        analysis.flow if 'flow' in fields else None,
+        analysis.framework if 'framework' in fields else None,
+        counts, analysis.size_class, analysis.limits)
+
+
+_worker = {}
+
+
+def _init_worker(name, fields, type_table, budget):
+    attach(name)
+    _worker.update(fields=fields, type_table=type_table, budget=budget)
+
+
+def analyse_chunk(chunk):
+    """Pool worker entry point: analyse (index, filepath, offset, length)
+    descriptors of section bodies in the shared block. Returns the records
+    and this chunk's classifier scan counts."""
+    before = {name: Counter(table.scan_stats) for name, table in RULES.items()}
+    records = []
+    for i, filepath, offset, length in chunk:
+        body = io.StringIO(shared_text(offset, length)).readlines()
+        records.append(analyse_section(i, Section(filepath, [], body), _worker['fields'],
+                                       _worker['type_table'], _worker['budget']))
+    return records, {name: table.scan_stats - before[name] for name, table in RULES.items()}
+
+
+CHUNK_SIZE = 16
+
+
+def iter_section_records(sections, fields, type_table=None, budget=EXTRACTOR_BUDGET, jobs=1):
+    """SectionRecord for every section in order, in parallel when use_pool says so."""
+    if not use_pool(len(sections), jobs, CHUNK_SIZE):
+        for i, section in enumerate(sections):
+            yield analyse_section(i, section, fields, type_table, budget)
+        return
+
+    with SharedText(''.join(s.body) for s in sections) as shared:
+        tasks = [(i, s.filepath, offset, length)
+                 for i, (s, (offset, length)) in enumerate(zip(sections, shared.descriptors))]
+        chunks = [tasks[i:i + CHUNK_SIZE] for i in range(0, len(tasks), CHUNK_SIZE)]
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                 initargs=(shared.name, fields, type_table, budget)) as pool:
+            for records, scans in iter_ordered(pool, analyse_chunk, chunks):
+                for name, counts in scans.items():
+                    RULES[name].scan_stats.update(counts)
+                yield from records
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--input', default=INPUT, metavar='PATH',
+                        help='marked monolith to enhance (plain, .gz, .xz or .zst)')
+    parser.add_argument('--output', default=OUTPUT, metavar='PATH',
+                        help='where the enhanced monolith is written; .gz, .xz or .zst compresses it')
+    parser.add_argument('--fields', type=parse_fields, default=FIELDS,
+                        help=f"comma-separated metadata to compute (default: all of {','.join(FIELDS)})")
+    parser.add_argument('--time-budget', type=float, default=EXTRACTOR_BUDGET, metavar='SECONDS',
+                        help=f'per-extractor time limit per section before the linear fallback '
+                             f'(default: {EXTRACTOR_BUDGET}, 0 disables)')
+    parser.add_argument('--profile-memory', action='store_true',
+                        help='report peak memory and top allocation sites per stage and largest sections')
+    parser.add_argument('--jobs', '-j', type=int,
+                        help='worker processes for section analysis '
+                             '(default: CPU count, or 1 with --profile-memory; 1 = serial)')
+    parser.add_argument('--metrics', metavar='PATH',
+                        help='write stage durations, throughput and hit rates to PATH '
+                             '(Prometheus text format, or JSON for a .json path)')
+    args = parser.parse_args(argv)
+    if args.jobs is None:
+        args.jobs = default_jobs(args.profile_memory)
+    fields = args.fields
+    profile = MemoryProfile(args.profile_memory)
+    metrics = RunMetrics('enhance_metadata', args.metrics)
+
     print("Reading input file...")
-    with open(INPUT, 'r', encoding='utf-8', errors='replace') as f:
-        all_lines = f.readlines()
+    with metrics.stage('read'), profile.stage('read'):
+        with open_text(args.input, errors='replace') as f:
+            all_lines = f.readlines()
 
     print(f"Input: {len(all_lines)} lines")
 
     print("Parsing file sections...")
-    sections = parse_sections(all_lines)
+    with metrics.stage('parse'), profile.stage('parse'):
+        sections = parse_sections(all_lines)
     print(f"Found {len(sections)} file sections")
 
+    type_table = None
+    if 'state' in fields or 'types' in fields:
+        print("Building project type table...")
+        with metrics.stage('type table'), profile.stage('type table'):
+            type_table = build_type_table((s.filepath, ''.join(s.body)) for s in sections)
+        print(f"Found {len(type_table)} declared types")
+
     print("Processing sections...")
     output = []
 
@@ -654,56 +1291,104 @@ def main():
         'total_props': 0,
         'total_apis': 0,
         'total_contexts': 0,
+        'total_types': 0,
+        'total_calls': 0,
     }
-
-    for i, section in enumerate(sections):
-        filepath = section['filepath']
-        code = ''.join(section['body'])
-
-        file_type = classify_file_type(filepath, code)
-        flow = classify_flow(filepath, code)
-        framework = classify_framework(filepath, code)
-        states = extract_state_variables(code)
-        props = extract_props(code)
-        apis = extract_api_endpoints(code)
-        contexts = extract_contexts(code)
-
-        stats['types'][file_type] = stats['types'].get(file_type, 0) + 1
-        stats['flows'][flow] = stats['flows'].get(flow, 0) + 1
-        stats['frameworks'][framework] = stats['frameworks'].get(framework, 0) + 1
-        stats['total_states'] += len(states)
-        stats['total_props'] += len(props)
-        stats['total_apis'] += len(apis)
-        stats['total_contexts'] += len(contexts)
-
-        processed = process_section(section)
-        output.extend(processed)
-
-        if (i + 1) % 20 == 0:
-            print(f"  Processed {i + 1}/{len(sections)} sections...")
-
-    print(f"\nWriting output to {OUTPUT}...")
-    with open(OUTPUT, 'w', encoding='utf-8') as f:
-        f.writelines(output)
+    sizes = Counter()
+    limited = []
+
+    progress = Progress(len(sections))
+    parallel = use_pool(len(sections), args.jobs, CHUNK_SIZE)
+    with metrics.stage('process'), profile.stage('process'):
+        records = iter_section_records(sections, fields, type_table, args.time_budget, args.jobs)
+        for section, record in zip(sections, records):
+            output.extend(record.metadata)
+            output.extend(apply_annotations(section.body, record.annotations))
+            sizes[record.size_class] += 1
+            if record.limits:
+                limited.append((section.filepath, record.size_class, record.limits))
+
+            # Stats only read fields that were computed for the output
+            if 'type' in fields:
+                stats['types'][record.file_type] = stats['types'].get(record.file_type, 0) + 1
+            if 'flow' in fields:
+                stats['flows'][record.flow] = stats['flows'].get(record.flow, 0) + 1
+            if 'framework' in fields:
+                stats['frameworks'][record.framework] = stats['frameworks'].get(record.framework, 0) + 1
+            states, props, apis, contexts, types, calls = record.counts
+            stats['total_states'] += states
+            stats['total_props'] += props
+            stats['total_apis'] += apis
+            stats['total_contexts'] += contexts
+            stats['total_types'] += types
+            stats['total_calls'] += calls
+
+            progress.advance(len(section.body), sum(len(line.encode('utf-8')) for line in section.body))
+            if not parallel:
+                profile.section(section.filepath)
+
+    print(f"\nWriting output to {args.output}...")
+    with metrics.stage('write'), profile.stage('write'):
+        with open_text(args.output, 'w') as f:
+            f.writelines(output)
 
     print(f"\n{'='*60}")
     print(f"ENHANCEMENT COMPLETE")
     print(f"{'='*60}")
     print(f"Sections processed: {len(sections)}")
     print(f"Output lines: {len(output)}")
-    print(f"\nFile Types:")
-    for t, c in sorted(stats['types'].items(), key=lambda x: -x[1]):
-        print(f"  {t}: {c}")
-    print(f"\nFlow Distribution:")
-    for f, c in sorted(stats['flows'].items(), key=lambda x: -x[1]):
-        print(f"  {f}: {c}")
-    print(f"\nFrameworks:")
-    for fw, c in sorted(stats['frameworks'].items(), key=lambda x: -x[1]):
-        print(f"  {fw}: {c}")
-    print(f"\nTotal state variables found: {stats['total_states']}")
-    print(f"Total props extracted: {stats['total_props']}")
-    print(f"Total API endpoints found: {stats['total_apis']}")
-    print(f"Total context providers found: {stats['total_contexts']}")
+    if fields != FIELDS:
+        print(f"Fields: {', '.join(fields)}")
+    if 'type' in fields:
+        print(f"\nFile Types:")
+        for t, c in sorted(stats['types'].items(), key=lambda x: -x[1]):
+            print(f"  {t}: {c}")
+    if 'flow' in fields:
+        print(f"\nFlow Distribution:")
+        for f, c in sorted(stats['flows'].items(), key=lambda x: -x[1]):
+            print(f"  {f}: {c}")
+    if 'framework' in fields:
+        print(f"\nFrameworks:")
+        for fw, c in sorted(stats['frameworks'].items(), key=lambda x: -x[1]):
+            print(f"  {fw}: {c}")
+    print()
+    if 'state' in fields:
+        print(f"Total state variables found: {stats['total_states']}")
+    if 'props' in fields:
+        print(f"Total props extracted: {stats['total_props']}")
+    if 'apis' in fields:
+        print(f"Total API endpoints found: {stats['total_apis']}")
+    if 'calls' in fields:
+        print(f"Total handler call maps: {stats['total_calls']}")
+    if 'context' in fields:
+        print(f"Total context providers found: {stats['total_contexts']}")
+    if 'types' in fields:
+        print(f"Total type expansions: {stats['total_types']}")
+
+    scans = sum((table.scan_stats for table in RULES.values()), Counter())
+    if scans:
+        total = scans['prefix'] + scans['widened']
+        print(f"Classifier code scans: {scans['prefix']} decided in first {SCAN_WINDOWS[0]} chars, "
+              f"{scans['widened']} widened ({scans['prefix'] / total * 100:.1f}% fast path)")
+
+    if len(sizes) > 1 or limited:
+        print(f"Section sizes: {', '.join(f'{n} {c}' for c, n in sizes.most_common())}")
+    if limited:
+        print(f"\n{len(limited)} section(s) used fallback extractors (see META Limits):")
+        for filepath, size, names in limited:
+            print(f"  {filepath} [{size}] {', '.join(names)}")
+    note = None
+    if parallel and peak_rss(children=True) is not None:
+        note = (f"Section analysis ran in {args.jobs} worker processes (not traced); "
+                f"largest worker peak RSS {format_bytes(peak_rss(children=True))}")
+    profile.print_report(note)
+
+    metrics.set(sections=len(sections), input_lines=len(all_lines), output_lines=len(output),
+                input_bytes=progress.bytes, fallback_sections=len(limited), jobs=args.jobs if parallel else 1,
+                **progress.rates())
+    if scans:
+        metrics.cache('classifier_prefix_scan', scans['prefix'], scans['widened'])
+    metrics.write()
 
 
 if __name__ == '__main__':
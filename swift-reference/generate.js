@@ -21,73 +21,36 @@ function findFiles(dir, results = []) {
 }
 
 // Classify flow
-function classifyFlow(relpath) {
-  if (/^app\/\(main\)\/dashboard\//.test(relpath)) return 'Vendor Flow';
-  if (/^app\/\(main\)\/faq\/dashboard\//.test(relpath)) return 'Vendor Flow';
-  if (/^app\/\(noheader\)\/take-payment\//.test(relpath)) return 'Vendor Flow';
-  if (/^app\/\(noheader\)\/customer-signup\//.test(relpath)) return 'Vendor Flow';
-  if (/^app\/\(noheader\)\/signup-customer\//.test(relpath)) return 'Vendor Flow';
-  if (/^app\/\(noheader\)\/receipts\//.test(relpath)) return 'Vendor Flow';
-  if (/^app\/\(noheader\)\/display\//.test(relpath)) return 'Vendor Flow';
-  if (/^app\/staff\//.test(relpath)) return 'Vendor Flow';
-  if (/^app\/staffpos\//.test(relpath)) return 'Vendor Flow';
-  if (/^app\/analytics\//.test(relpath)) return 'Vendor Flow';
-  if (/^app\/pos-/.test(relpath)) return 'Vendor Flow';
-  if (/^app\/pay\//.test(relpath)) return 'Vendor Flow';
-  if (/^app\/checkout\//.test(relpath)) return 'Vendor Flow';
-  if (/^app\/affiliate-dashboard\//.test(relpath)) return 'Affiliate Flow';
-  if (/^app\/earn\//.test(relpath)) return 'Affiliate Flow';
-  if (/^app\/\(main\)\/commission-dashboard\//.test(relpath)) return 'Affiliate Flow';
-  if (/^app\/\(main\)\/discover-vendors\//.test(relpath)) return 'Affiliate Flow';
-  if (/^app\/\(main\)\/affiliate-terms\//.test(relpath)) return 'Affiliate Flow';
-
-  // Components
-  if (/^components\/DashboardHeader/.test(relpath)) return 'Vendor Flow';
-  if (/^components\/Sidebar/.test(relpath)) return 'Vendor Flow';
-  if (/^components\/StoreActivity/.test(relpath)) return 'Vendor Flow';
-  if (/^components\/WalletFunding/.test(relpath)) return 'Vendor Flow';
-  if (/^components\/WalletSettings/.test(relpath)) return 'Vendor Flow';
-  if (/^components\/TopUpRLUSD/.test(relpath)) return 'Vendor Flow';
-  if (/^components\/WithdrawRLUSD/.test(relpath)) return 'Vendor Flow';
-  if (/^components\/PendingPayments/.test(relpath)) return 'Vendor Flow';
-  if (/^components\/PendingCustomers/.test(relpath)) return 'Vendor Flow';
-  if (/^components\/PaymentOptions/.test(relpath)) return 'Vendor Flow';
-  if (/^components\/PaymentSuccess/.test(relpath)) return 'Vendor Flow';
-  if (/^components\/ProductsManager/.test(relpath)) return 'Vendor Flow';
-  if (/^components\/BarcodeScanner/.test(relpath)) return 'Vendor Flow';
-  if (/^components\/CSVImportModal/.test(relpath)) return 'Vendor Flow';
-  if (/^components\/DeleteConfirmModal/.test(relpath)) return 'Vendor Flow';
-  if (/^components\/EmailReceiptModal/.test(relpath)) return 'Vendor Flow';
-  if (/^components\/ReceiptActions/.test(relpath)) return 'Vendor Flow';
-  if (/^components\/InventoryHistoryModal/.test(relpath)) return 'Vendor Flow';
-  if (/^components\/LinkNFCCard/.test(relpath)) return 'Vendor Flow';
-  if (/^components\/NFCPayment/.test(relpath)) return 'Vendor Flow';
-  if (/^components\/NFCTapPay/.test(relpath)) return 'Vendor Flow';
-  if (/^components\/TapToPaySettings/.test(relpath)) return 'Vendor Flow';
-  if (/^components\/SplitBillModal/.test(relpath)) return 'Vendor Flow';
-  if (/^components\/StaffSelector/.test(relpath)) return 'Vendor Flow';
-  if (/^components\/SendPaymentLink/.test(relpath)) return 'Vendor Flow';
-  if (/^components\/TakePaymentHeader/.test(relpath)) return 'Vendor Flow';
-  if (/^components\/TakePaymentTour/.test(relpath)) return 'Vendor Flow';
-  if (/^components\/TipSelector/.test(relpath)) return 'Vendor Flow';
-  if (/^components\/InstantPay/.test(relpath)) return 'Vendor Flow';
-  if (/^components\/SignUpCustomerCard/.test(relpath)) return 'Vendor Flow';
-  if (/^components\/OnboardingSetup/.test(relpath)) return 'Vendor Flow';
-  if (/^components\/MilestoneChecklist/.test(relpath)) return 'Vendor Flow';
-  if (/^components\/VendorDashboardTour/.test(relpath)) return 'Vendor Flow';
-  if (/^components\/AutoSignModal/.test(relpath)) return 'Vendor Flow';
-  if (/^components\/MyPendingStatus/.test(relpath)) return 'Vendor Flow';
-
-  if (/^components\/AffiliateDashboardTour/.test(relpath)) return 'Affiliate Flow';
-  if (/^components\/EarnInterest/.test(relpath)) return 'Affiliate Flow';
-  if (/^components\/PayoutsTable/.test(relpath)) return 'Affiliate Flow';
-
-  if (/^app\/layout\.tsx$/.test(relpath)) return 'Config';
-  if (/^app\/sitemap\.ts$/.test(relpath)) return 'Config';
-  if (/^next\.config/.test(relpath)) return 'Config';
-  if (/^next-env/.test(relpath)) return 'Config';
+// Rules come from classification_rules.json ("generate_flow"): exact paths, then
+// the longest matching path prefix from a trie built once at startup.
+const RULES = JSON.parse(fs.readFileSync(path.join(__dirname, 'classification_rules.json'), 'utf8'));
+const FLOW_RULES = RULES.generate_flow;
+
+function buildPrefixTrie(prefixes) {
+  const root = {};
+  for (const [prefix, flow] of Object.entries(prefixes)) {
+    let node = root;
+    for (const ch of prefix) {
+      node = node[ch] = node[ch] || {};
+    }
+    node.$flow = flow;
+  }
+  return root;
+}
+
+const FLOW_TRIE = buildPrefixTrie(FLOW_RULES.prefixes);
 
-  return 'Shared';
+function classifyFlow(relpath) {
+  if (Object.prototype.hasOwnProperty.call(FLOW_RULES.exact, relpath)) return FLOW_RULES.exact[relpath];
+
+  let node = FLOW_TRIE;
+  let flow = FLOW_RULES.default;
+  for (const ch of relpath) {
+    node = node[ch];
+    if (!node) break;
+    if (node.$flow) flow = node.$flow;
+  }
+  return flow;
 }
 
 // Classify type
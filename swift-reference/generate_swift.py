@@ -0,0 +1,501 @@
+#!/usr/bin/env python3
+"""Generate Swift skeletons from the metadata in monolithic_enhanced.txt.
+
+Each section becomes one .swift file holding:
+  - a Codable struct (or String enum) per declaration in META Types
+  - an ObservableObject view model with a @Published var per META State entry
+    and an async method stub per META Calls handler, noting what it wires up
+  - a View struct whose stored properties are the section's props
+  - an API client with one async method per META APIs endpoint
+with the dependency tree and contexts as header comments.
+
+Sections are generated in parallel and cached by a hash of their enhanced
+text, so a rerun only regenerates sections whose code or metadata changed.
+"""
+import argparse
+import hashlib
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from run_metrics import RunMetrics
+from stamp_cache import read_json, write_json
+from type_table import split_top_level
+from validate_enhanced import parse_dependency_tree, parse_sections, split_meta_list
+
+INPUT = "/Users/markflynn/Local Sites/yesallofus/swift-reference/monolithic_enhanced.txt"
+OUTPUT_DIR = "/Users/markflynn/Local Sites/yesallofus/swift-reference/swift"
+CACHE = "/Users/markflynn/Local Sites/yesallofus/swift-reference/swift_cache.json"
+
+# Bump when the generated code changes shape, so cached sections are redone
+GENERATOR_VERSION = 4
+CHUNK_SIZE = 16
+
+SWIFT_SCALARS = {
+    'string': 'String', 'number': 'Double', 'boolean': 'Bool', 'Date': 'Date',
+    'any': 'JSONValue', 'unknown': 'JSONValue', 'object': 'JSONValue', 'Object': 'JSONValue',
+    'nullable': 'JSONValue?', 'Array': '[JSONValue]', 'void': 'Void',
+    'ReactNode': 'AnyView', 'React.ReactNode': 'AnyView', 'JSX.Element': 'AnyView',
+}
+SWIFT_KEYWORDS = {'default', 'case', 'class', 'struct', 'enum', 'protocol', 'func', 'var', 'let',
+                  'in', 'is', 'as', 'self', 'Self', 'static', 'return', 'where', 'operator',
+                  'import', 'init', 'extension', 'internal', 'private', 'public', 'repeat', 'switch'}
+TYPE_ENTRY_RE = re.compile(r'^(\w+)(\(enum\))?\{(.*)\}$', re.DOTALL)
+ALIAS_ENTRY_RE = re.compile(r'^(\w+)=(.+)$', re.DOTALL)
+FIELD_RE = re.compile(r'^(\w+)(\?)?:(.+)$', re.DOTALL)
+STRING_UNION_RE = re.compile(r"^'[^']*'(?:\s*\|\s*'[^']*')*$")
+CALL_ENTRY_RE = re.compile(r'^([\w$]+)\((.*)\)$', re.DOTALL)
+
+
+# ── Type mapping ─────────────────────────────────────────────────────────────
+
+def swift_type(ts):
+    """Best-effort Swift spelling of a TypeScript type."""
+    ts = ' '.join(ts.split())
+    parts = split_top_level(ts, '|')
+    optional = any(p in ('null', 'undefined') for p in parts)
+    parts = [p for p in parts if p not in ('null', 'undefined')]
+    if not parts:
+        return 'JSONValue?'
+    if len(parts) > 1:
+        if all(STRING_UNION_RE.match(p) for p in parts):
+            base = 'String'
+        else:
+            base = 'JSONValue'
+    else:
+        base = _single_type(parts[0])
+    return optional_of(base) if optional else base
+
+
+def optional_of(swift):
+    if swift.endswith('?'):
+        return swift
+    return f'({swift})?' if '->' in swift else swift + '?'
+
+
+def _single_type(ts):
+    if ts.startswith('(') and ts.endswith(')'):
+        return swift_type(ts[1:-1])
+    if '=>' in ts:
+        return '() -> Void'
+    if ts.endswith('[]'):
+        return f'[{swift_type(ts[:-2])}]'
+    m = re.match(r'^(Array|Promise|Record|Map)<(.+)>$', ts)
+    if m:
+        args = split_top_level(m.group(2))
+        if m.group(1) in ('Array', 'Promise'):
+            inner = swift_type(args[0])
+            return f'[{inner}]' if m.group(1) == 'Array' else inner
+        if len(args) == 2:
+            return f'[{swift_type(args[0])}: {swift_type(args[1])}]'
+    if STRING_UNION_RE.match(ts):
+        return 'String'
+    if ts.startswith('{'):
+        return 'JSONValue'
+    if ts in SWIFT_SCALARS:
+        return SWIFT_SCALARS[ts]
+    if re.match(r'^[A-Z]\w*$', ts):
+        return ts
+    return 'JSONValue'
+
+
+def swift_default(swift):
+    if swift.endswith('?'):
+        return 'nil'
+    return {'String': '""', 'Double': '0', 'Bool': 'false', 'Date': 'Date()'}.get(
+        swift, '[]' if swift.startswith('[') and ':' not in swift else
+        '[:]' if swift.startswith('[') else None)
+
+
+def swift_name(name):
+    return f'`{name}`' if name in SWIFT_KEYWORDS else name
+
+
+def camel(words):
+    words = [w for w in words if w]
+    if not words:
+        return 'call'
+    head = words[0][:1].lower() + words[0][1:]
+    return head + ''.join(w[:1].upper() + w[1:] for w in words[1:])
+
+
+def case_names(values):
+    """Distinct Swift case names for enum members or string literals."""
+    names = []
+    for value in values:
+        words = [w for w in re.split(r'[^A-Za-z0-9]+', value) if w]
+        name = camel(words) if words else 'empty'
+        if name[0].isdigit():
+            name = '_' + name
+        while name in names:
+            name += '_'
+        names.append(name)
+    return [swift_name(n) for n in names]
+
+
+def type_prefix(filepath):
+    """Swift type name for a section: components/NFCPayment.jsx -> NFCPayment,
+    app/(main)/dashboard/page.tsx -> DashboardPage."""
+    parts = [p for p in filepath.split('/') if p and not p.startswith('(')]
+    stem = os.path.splitext(parts[-1])[0] if parts else 'Section'
+    if stem in ('page', 'layout', 'route', 'index', 'loading', 'error', 'not-found') and len(parts) > 1:
+        owner = re.sub(r'[\[\]]', '', parts[-2])
+        stem = owner + '-' + stem
+    words = re.split(r'[^A-Za-z0-9]+', stem)
+    name = ''.join(w[:1].upper() + w[1:] for w in words if w)
+    return name if name and not name[0].isdigit() else 'S' + name
+
+
+# ── Emitters ─────────────────────────────────────────────────────────────────
+
+def parse_types(entries):
+    """META Types entries into [(name, kind, fields|alias)]."""
+    decls = []
+    for entry in entries:
+        m = TYPE_ENTRY_RE.match(entry)
+        if m:
+            fields = []
+            for item in split_top_level(m.group(3), ';'):
+                if m.group(2):
+                    fields.append((item, '', False))
+                    continue
+                f = FIELD_RE.match(item)
+                if f:
+                    fields.append((f.group(1), f.group(3).strip(), bool(f.group(2))))
+            decls.append((m.group(1), 'enum' if m.group(2) else 'struct', fields))
+            continue
+        m = ALIAS_ENTRY_RE.match(entry)
+        if m:
+            decls.append((m.group(1), 'alias', m.group(2).strip()))
+    return decls
+
+
+def emit_types(decls, out):
+    for name, kind, body in decls:
+        if name.endswith('Props'):
+            continue  # props become View properties
+        if kind == 'alias':
+            if STRING_UNION_RE.match(body):
+                out.append(f'enum {name}: String, Codable {{')
+                values = [lit.strip("'") for lit in split_top_level(body, '|')]
+                for case, value in zip(case_names(values), values):
+                    out.append(f'    case {case} = "{value}"')
+                out.append('}')
+            else:
+                out.append(f'typealias {name} = {swift_type(body)}')
+        elif kind == 'enum':
+            out.append(f'enum {name}: String, Codable {{')
+            for case in case_names([member for member, _, _ in body]):
+                out.append(f'    case {case}')
+            out.append('}')
+        else:
+            out.append(f'struct {name}: Codable {{')
+            for field, ts, optional in body:
+                typ = optional_of(swift_type(ts)) if optional else swift_type(ts)
+                out.append(f'    let {swift_name(field)}: {typ}')
+            out.append('}')
+        out.append('')
+
+
+def parse_calls(entries):
+    """META Calls entries into [(handler, helpers, apis, setters)]."""
+    calls = []
+    for entry in entries:
+        m = CALL_ENTRY_RE.match(entry)
+        if not m:
+            continue
+        parts = {}
+        for part in m.group(2).split(';'):
+            key, sep, value = part.partition(':')
+            if sep:
+                parts[key.strip()] = value.split()
+        calls.append((m.group(1), parts.get('helpers', []), parts.get('apis', []), parts.get('sets', [])))
+    return calls
+
+
+def emit_view_model(prefix, states, calls, api_names, out):
+    if not states and not calls:
+        return
+    out.append(f'final class {prefix}ViewModel: ObservableObject {{')
+    names = set()
+    for entry in states:
+        name, _, ts = entry.partition(':')
+        names.add(name.strip())
+        typ = swift_type(ts or 'unknown')
+        default = swift_default(typ)
+        if default is None:
+            out.append(f'    @Published var {swift_name(name.strip())}: {optional_of(typ)}')
+        else:
+            out.append(f'    @Published var {swift_name(name.strip())}: {typ} = {default}')
+    for handler, helpers, apis, setters in calls:
+        out.append('')
+        out.append(f'    func {swift_name(handler)}() async {{')
+        if helpers:
+            out.append(f'        // helpers: {", ".join(helpers)}')
+        for ep in apis:
+            method = api_names.get(ep)
+            out.append(f'        // api.{method}() for {ep}' if method else f'        // api: {ep}')
+        # setFoo updates the published var foo
+        updates = [camel([s[3:]]) if s.startswith('set') and camel([s[3:]]) in names else s for s in setters]
+        if updates:
+            out.append(f'        // updates: {", ".join(updates)}')
+        out.append('    }')
+    out.append('}')
+    out.append('')
+
+
+def emit_view(prefix, props, prop_types, contexts, has_model, out):
+    out.append(f'struct {prefix}View: View {{')
+    for prop in props:
+        ts, optional = prop_types.get(prop, ('unknown', False))
+        typ = optional_of(swift_type(ts)) if optional else swift_type(ts)
+        out.append(f'    let {swift_name(prop)}: {typ}')
+    for ctx in contexts:
+        if ctx == 'NextRouter':
+            out.append('    // Navigation: NextRouter -> NavigationStack path')
+        else:
+            out.append(f'    @EnvironmentObject var {camel([ctx])}: {ctx}')
+    if has_model:
+        out.append(f'    @StateObject private var model = {prefix}ViewModel()')
+    out.append('')
+    out.append('    var body: some View {')
+    out.append('        EmptyView()')
+    out.append('    }')
+    out.append('}')
+    out.append('')
+
+
+def api_method_names(apis):
+    """{endpoint: APIClient method name} for the callable META APIs entries."""
+    names = {}
+    used = set()
+    for ep in apis:
+        if ep.startswith('HANDLER:'):
+            continue
+        path = ep[len('EXTERNAL:'):] if ep.startswith('EXTERNAL:') else ep
+        route = path.partition('?')[0]
+        words = [w for seg in route.split('/')
+                 if seg and seg != '{param}' and seg not in ('api', 'v1')
+                 for w in re.split(r'[^A-Za-z0-9]+', seg)]
+        name = camel(words)
+        while name in used:
+            name += '_'
+        used.add(name)
+        names[ep] = name
+    return names
+
+
+def emit_api_client(prefix, apis, api_names, out):
+    handlers = [ep.split(':', 1)[1] for ep in apis if ep.startswith('HANDLER:')]
+    if handlers:
+        out.append(f'// Route handlers: {", ".join(handlers)}')
+        out.append('')
+    if not api_names:
+        return
+    out.append(f'struct {prefix}APIClient {{')
+    out.append('    var baseURL: URL')
+    out.append('    var session: URLSession = .shared')
+    out.append('')
+    methods = []
+    for ep, name in api_names.items():
+        external = ep.startswith('EXTERNAL:')
+        path = ep[len('EXTERNAL:'):] if external else ep
+
+        # Each {param} becomes a String argument interpolated into the URL
+        pieces = path.split('{param}')
+        params = [f'p{i}' for i in range(1, len(pieces))]
+        url = pieces[0] + ''.join(f'\\({p}){rest}' for p, rest in zip(params, pieces[1:]))
+        signature = ', '.join(f'{p}: String' for p in params)
+
+        lines = [f'    func {name}({signature}) async throws -> Data {{']
+        if external:
+            lines.append(f'        let url = URL(string: "https://{url}")!')
+        else:
+            lines.append(f'        let url = URL(string: "{url}", relativeTo: baseURL)!')
+        lines.append('        let (data, _) = try await session.data(from: url)')
+        lines.append('        return data')
+        lines.append('    }')
+        methods.append('\n'.join(lines))
+    out.append('\n\n'.join(methods))
+    out.append('}')
+    out.append('')
+
+
+def generate_section(filepath, meta, tree_items):
+    """Swift source for one section from its META dict and tree items."""
+    prefix = type_prefix(filepath)
+    types = parse_types(split_meta_list(meta.get('Types')))
+    states = split_meta_list(meta.get('State'))
+    props = split_meta_list(meta.get('Props'))
+    contexts = split_meta_list(meta.get('Context'))
+    apis = split_meta_list(meta.get('APIs'))
+    calls = parse_calls(split_meta_list(meta.get('Calls')))
+    api_names = api_method_names(apis)
+
+    prop_types = {}
+    for name, kind, body in types:
+        if kind == 'struct' and name.endswith('Props'):
+            for field, ts, optional in body:
+                prop_types.setdefault(field, (ts, optional))
+
+    out = [f'// Generated from {filepath}',
+           f'// Type: {meta.get("Type", "?")} | Flow: {meta.get("Flow", "?")} | Framework: {meta.get("Framework", "?")}']
+    for item in tree_items:
+        out.append(f'// Depends on: {item}')
+    out.append('')
+    out.append('import Foundation')
+    if props or states or calls or meta.get('Type', '').endswith('Component'):
+        out.append('import SwiftUI')
+    out.append('')
+
+    emit_types(types, out)
+    emit_view_model(prefix, states, calls, api_names, out)
+    if props or states or calls or meta.get('Type', '').endswith('Component'):
+        emit_view(prefix, props, prop_types, contexts, bool(states or calls), out)
+    emit_api_client(prefix, apis, api_names, out)
+    return '\n'.join(out).rstrip('\n') + '\n'
+
+
+# ── Cached parallel run ──────────────────────────────────────────────────────
+
+def section_meta(section):
+    """First value of each META field, as the enhancer wrote it."""
+    meta = {}
+    for line in section.meta_lines:
+        s = line.strip()
+        if s.startswith('// META:'):
+            field, sep, value = s[len('// META:'):].partition(':')
+            if sep:
+                meta.setdefault(field.strip(), value.strip())
+    return meta
+
+
+def section_key(section):
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f'{GENERATOR_VERSION}\0{section.filepath}\0'.encode('utf-8'))
+    h.update(section.body.encode('utf-8', 'replace'))
+    return h.hexdigest()
+
+
+def generate_chunk(chunk):
+    """Worker entry point: [(filepath, meta, tree_items)] -> [swift source]."""
+    return [generate_section(fp, meta, tree) for fp, meta, tree in chunk]
+
+
+def output_path(filepath):
+    return os.path.join(OUTPUT_DIR, os.path.dirname(filepath), type_prefix(filepath) + '.swift')
+
+
+def load_cache(path):
+    return (read_json(path, GENERATOR_VERSION) or {}).get('sections', {})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1,
+                        help='worker processes (default: CPU count, 1 = serial)')
+    parser.add_argument('--force', action='store_true', help='ignore the cache and regenerate everything')
+    parser.add_argument('--metrics', metavar='PATH',
+                        help='write stage durations and the cache hit rate to PATH '
+                             '(Prometheus text format, or JSON for a .json path)')
+    args = parser.parse_args(argv)
+    metrics = RunMetrics('generate_swift', args.metrics)
+
+    print("Parsing enhanced file...")
+    with metrics.stage('parse'):
+        sections = parse_sections(INPUT)
+    print(f"Found {len(sections)} sections")
+
+    cache = {} if args.force else load_cache(CACHE)
+    fresh = {}
+    todo = []
+    for section in sections:
+        key = section_key(section)
+        entry = cache.get(section.filepath)
+        if entry and entry['key'] == key and os.path.exists(output_path(section.filepath)):
+            fresh[section.filepath] = entry
+        else:
+            tree_items, _ = parse_dependency_tree(section.body)
+            todo.append((section.filepath, key, section_meta(section), tree_items))
+    print(f"{len(sections) - len(todo)} cached, {len(todo)} to generate")
+
+    work = [(fp, meta, tree) for fp, _, meta, tree in todo]
+    chunks = [work[i:i + CHUNK_SIZE] for i in range(0, len(work), CHUNK_SIZE)]
+    with metrics.stage('generate'):
+        if args.jobs <= 1 or len(chunks) <= 1:
+            results = [src for chunk in chunks for src in generate_chunk(chunk)]
+        else:
+            with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+                results = [src for srcs in pool.map(generate_chunk, chunks) for src in srcs]
+
+    written = 0
+    with metrics.stage('write'):
+        for (filepath, key, _, _), source in zip(todo, results):
+            path = output_path(filepath)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(source)
+            fresh[filepath] = {'key': key, 'output': os.path.relpath(path, OUTPUT_DIR)}
+            written += 1
+
+    support = os.path.join(OUTPUT_DIR, 'JSONValue.swift')
+    if not os.path.exists(support):
+        os.makedirs(OUTPUT_DIR, exist_ok=True)
+        with open(support, 'w', encoding='utf-8') as f:
+            f.write(JSON_VALUE_SWIFT)
+
+    # Drop skeletons for sections that no longer exist
+    for filepath, entry in cache.items():
+        if filepath not in fresh:
+            stale = os.path.join(OUTPUT_DIR, entry['output'])
+            if os.path.exists(stale):
+                os.remove(stale)
+
+    write_json(CACHE, {'sections': fresh}, GENERATOR_VERSION)
+
+    print(f"Wrote {written} Swift file(s) to {OUTPUT_DIR}")
+    metrics.set(sections=len(sections), written=written, jobs=args.jobs)
+    metrics.cache('generated_sections', len(sections) - len(todo), len(todo))
+    metrics.write()
+    return 0
+
+
+JSON_VALUE_SWIFT = '''// Placeholder for TypeScript any/unknown/inline object values.
+import Foundation
+
+enum JSONValue: Codable {
+    case string(String)
+    case number(Double)
+    case bool(Bool)
+    case array([JSONValue])
+    case object([String: JSONValue])
+    case null
+
+    init(from decoder: Decoder) throws {
+        let c = try decoder.singleValueContainer()
+        if c.decodeNil() { self = .null }
+        else if let v = try? c.decode(Bool.self) { self = .bool(v) }
+        else if let v = try? c.decode(Double.self) { self = .number(v) }
+        else if let v = try? c.decode(String.self) { self = .string(v) }
+        else if let v = try? c.decode([JSONValue].self) { self = .array(v) }
+        else { self = .object(try c.decode([String: JSONValue].self)) }
+    }
+
+    func encode(to encoder: Encoder) throws {
+        var c = encoder.singleValueContainer()
+        switch self {
+        case .string(let v): try c.encode(v)
+        case .number(let v): try c.encode(v)
+        case .bool(let v): try c.encode(v)
+        case .array(let v): try c.encode(v)
+        case .object(let v): try c.encode(v)
+        case .null: try c.encodeNil()
+        }
+    }
+}
+'''
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Aho-Corasick multi-keyword matcher shared by the enhancer and validator."""
+from collections import Counter
+
+
+def is_word_char(ch):
+    return ch.isalnum() or ch == '_'
+
+
+def is_whole_word(text, start, end, limit=None):
+    """True if text[start:end] has a regex-style \\b on both sides.
+
+    limit acts as the end of the text, so a match inside text[:limit] is
+    judged exactly as if the text had been sliced there.
+    """
+    if limit is None or limit > len(text):
+        limit = len(text)
+    if start > 0 and is_word_char(text[start - 1]):
+        return False
+    if end < limit and is_word_char(text[end]):
+        return False
+    return True
+
+
+class KeywordMatcher:
+    """Finds every occurrence of a fixed set of keywords in one linear scan.
+
+    The automaton is built once; scanning cost depends on the text length,
+    not on how many keywords are configured.
+    """
+    __slots__ = ('keywords', '_goto', '_fail', '_out')
+
+    def __init__(self, keywords):
+        self.keywords = tuple(dict.fromkeys(k for k in keywords if k))
+        goto = [{}]
+        out = [()]
+        for kw in self.keywords:
+            state = 0
+            for ch in kw:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    out.append(())
+                state = nxt
+            out[state] = out[state] + (kw,)
+
+        # Breadth-first failure links; outputs are merged along them
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        for state in queue:
+            for ch, nxt in goto[state].items():
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                out[nxt] = out[nxt] + out[fail[nxt]]
+                queue.append(nxt)
+
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+
+    def iter_matches(self, text):
+        """Yield (start, keyword) for every occurrence, overlaps included."""
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                for kw in out[state]:
+                    yield i + 1 - len(kw), kw
+
+    def counts(self, text, whole_words=False):
+        """Hit count per keyword."""
+        hits = Counter()
+        for start, kw in self.iter_matches(text):
+            if not whole_words or is_whole_word(text, start, start + len(kw)):
+                hits[kw] += 1
+        return hits
+
+    def found(self, text, whole_words=False):
+        """Set of keywords present at least once."""
+        return set(self.counts(text, whole_words))
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""Opt-in memory profiling for the pipeline scripts (--profile-memory).
+
+Each stage of a run is wrapped in profile.stage(name); the report gives the
+stage's tracemalloc peak, what it left allocated, the process's peak RSS so
+far and the source lines that allocated most during the stage. Loops over
+sections call profile.section(path) after each one to record the largest
+per-section transient peaks.
+
+Disabled profiles do nothing, so the calls stay in place on normal runs.
+"""
+import heapq
+import sys
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+TOP_SITES = 5
+TOP_SECTIONS = 5
+TRACE_FRAMES = 1
+IGNORED_FILES = (__file__, tracemalloc.__file__, '<frozen importlib._bootstrap>',
+                 '<frozen importlib._bootstrap_external>', '<unknown>')
+
+
+def format_bytes(n):
+    sign = '-' if n < 0 else ''
+    n = abs(n)
+    for unit in ('B', 'KB', 'MB'):
+        if n < 1024:
+            return f"{sign}{n:.0f} {unit}" if unit == 'B' else f"{sign}{n:.1f} {unit}"
+        n /= 1024
+    return f"{sign}{n:.1f} GB"
+
+
+def peak_rss(children=False):
+    """High-water resident set size in bytes, or None where unsupported."""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF)
+    # ru_maxrss is kilobytes on Linux, bytes on macOS
+    return usage.ru_maxrss if sys.platform == 'darwin' else usage.ru_maxrss * 1024
+
+
+class StageMemory:
+    __slots__ = ('name', 'peak', 'retained', 'rss', 'sites')
+
+    def __init__(self, name, peak, retained, rss, sites):
+        self.name = name
+        self.peak = peak            # traced bytes at the stage's high point
+        self.retained = retained    # traced bytes still held at its end, relative to its start
+        self.rss = rss
+        self.sites = sites          # [(size_diff, count_diff, 'file.py:line')]
+
+
+class MemoryProfile:
+    """Per-stage and per-section memory figures for one run."""
+
+    def __init__(self, enabled=False, top=TOP_SITES):
+        self.enabled = enabled
+        self.top = top
+        self.stages = []
+        self._sections = []   # min-heap of (transient peak, path)
+        self._mark = 0
+        self._stage_peak = 0
+        if enabled and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACE_FRAMES)
+
+    @contextmanager
+    def stage(self, name):
+        if not self.enabled:
+            yield
+            return
+        before = tracemalloc.take_snapshot()
+        start, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        self._mark = start
+        self._stage_peak = 0
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot()
+            self.stages.append(StageMemory(
+                name, max(peak, self._stage_peak), current - start, peak_rss(),
+                self._top_sites(before, after)))
+
+    def section(self, path):
+        """Record the transient peak since the previous section and reset it."""
+        if not self.enabled:
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        self._stage_peak = max(self._stage_peak, peak)
+        entry = (peak - self._mark, path or '(before first FILE)')
+        if len(self._sections) < TOP_SECTIONS:
+            heapq.heappush(self._sections, entry)
+        elif entry > self._sections[0]:
+            heapq.heapreplace(self._sections, entry)
+        tracemalloc.reset_peak()
+        self._mark = current
+
+    def _top_sites(self, before, after):
+        filters = [tracemalloc.Filter(False, f) for f in IGNORED_FILES]
+        diff = after.filter_traces(filters).compare_to(before.filter_traces(filters), 'lineno')
+        sites = []
+        for stat in diff:
+            if stat.size_diff <= 0:
+                continue
+            frame = stat.traceback[0]
+            sites.append((stat.size_diff, stat.count_diff, f"{frame.filename.rsplit('/', 1)[-1]}:{frame.lineno}"))
+            if len(sites) == self.top:
+                break
+        return sites
+
+    def report_lines(self, note=None):
+        """The memory section printed after a script's own summary."""
+        if not self.enabled:
+            return []
+        lines = ["", "MEMORY PROFILE (tracemalloc peak / retained, process peak RSS)", "-" * 40]
+        for s in self.stages:
+            rss = format_bytes(s.rss) if s.rss is not None else 'n/a'
+            lines.append(f"  {s.name:<12} peak {format_bytes(s.peak):>10}  "
+                         f"retained {format_bytes(s.retained):>10}  RSS {rss:>10}")
+            for size, count, where in s.sites:
+                lines.append(f"      +{format_bytes(size):>10}  {count:>+7} blocks  {where}")
+        if self._sections:
+            lines.append("  Largest sections (transient peak):")
+            for size, path in sorted(self._sections, reverse=True):
+                lines.append(f"    {format_bytes(size):>10}  {path}")
+        if note:
+            lines.append(f"  {note}")
+        return lines
+
+    def print_report(self, note=None):
+        for line in self.report_lines(note):
+            print(line)
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""Query monolithic_enhanced.txt through inverted indexes by API, context, hook and state type.
+
+The indexes are built from the enhancer's META and DEPENDENCY TREE lines in one
+pass and saved to disk; later queries load the saved index instead of
+reparsing the monolith, and it is rebuilt only when the enhanced file changes.
+The index also records where each section starts, so `show` prints one section
+of a plain or compressed monolith without decoding what comes before it.
+
+    python3 query_metadata.py api '/api/payments/{param}'
+    python3 query_metadata.py context WalletContext
+    python3 query_metadata.py hook useRouter
+    python3 query_metadata.py state-type boolean
+    python3 query_metadata.py keys context
+    python3 query_metadata.py show app/components/Sidebar.tsx
+"""
+import argparse
+import os
+import re
+import sys
+
+from compressed_io import iter_lines, open_at
+from stamp_cache import load_derived
+from validate_enhanced import split_meta_list
+
+INPUT = "/Users/markflynn/Local Sites/yesallofus/swift-reference/monolithic_enhanced.txt"
+INDEX = "/Users/markflynn/Local Sites/yesallofus/swift-reference/metadata_index.json"
+
+INDEX_VERSION = 2
+INDEX_NAMES = ('api', 'context', 'hook', 'state-type')
+TREE_LABEL_RE = re.compile(r'(?:├──|└──)\s*(\w+):\s*(.+)')
+
+
+# ── Build ───────────────────────────────────────────────────────────────────
+
+def build_index(path):
+    """Scan the enhanced file once and return the index dict."""
+    sections = []
+    locations = []     # (frame, offset) of each section's FILE line
+    indexes = {name: {} for name in INDEX_NAMES}
+    seen_meta = set()
+    meta_done = False
+    in_tree = False
+
+    def add(name, key, section_id):
+        ids = indexes[name].setdefault(key, [])
+        if not ids or ids[-1] != section_id:
+            ids.append(section_id)
+
+    for frame, offset, line in iter_lines(path):
+        s = line.strip()
+        if s.startswith('// FILE:'):
+            sections.append(s.replace('// FILE:', '').strip())
+            locations.append((frame, offset))
+            seen_meta = set()
+            meta_done = False
+            in_tree = False
+            continue
+        if not sections:
+            continue
+        sid = len(sections) - 1
+
+        if not s:
+            # The enhancer's META block ends at the first blank line after it;
+            # the generator's own META lines further down are not indexed
+            meta_done = meta_done or bool(seen_meta)
+            in_tree = False
+        elif s.startswith('// META:'):
+            field, sep, value = s[len('// META:'):].partition(':')
+            field = field.strip()
+            if meta_done or not sep or field in seen_meta:
+                continue
+            seen_meta.add(field)
+            if field == 'APIs':
+                for ep in split_meta_list(value.strip()):
+                    add('api', ep, sid)
+            elif field == 'Context':
+                for ctx in split_meta_list(value.strip()):
+                    add('context', ctx, sid)
+            elif field == 'State':
+                for entry in split_meta_list(value.strip()):
+                    _, _, typ = entry.partition(':')
+                    if typ:
+                        add('state-type', typ, sid)
+        elif s == '// DEPENDENCY TREE:':
+            in_tree = True
+        elif in_tree:
+            if not s.startswith('//'):
+                in_tree = False
+                continue
+            m = TREE_LABEL_RE.search(s)
+            if m and m.group(1) == 'hooks':
+                for hook in m.group(2).split(','):
+                    if hook.strip():
+                        add('hook', hook.strip(), sid)
+
+    return {
+        'source': os.path.abspath(path),
+        'sections': sections,
+        'locations': locations,
+        'indexes': indexes,
+    }
+
+
+def load_index(path, index_path, rebuild=False):
+    """Load the saved index, rebuilding it when missing, stale or corrupt."""
+    return load_derived(path, index_path, INDEX_VERSION, build_index, rebuild)
+
+
+# ── Query ───────────────────────────────────────────────────────────────────
+
+def lookup(index, name, key):
+    """Section paths indexed under key."""
+    return [index['sections'][i] for i in index['indexes'][name].get(key, [])]
+
+
+def read_section(path, index, section):
+    """Lines of one section, from its FILE line up to the next one."""
+    frame, offset = index['locations'][index['sections'].index(section)]
+    lines = []
+    with open_at(path, frame, offset) as f:
+        for line in f:
+            if lines and line.lstrip().startswith('// FILE:'):
+                break
+            lines.append(line)
+    # The next section's leading separator belongs to it, not to this one
+    while lines and lines[-1].strip().startswith('// ===='):
+        lines.pop()
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('index', choices=INDEX_NAMES + ('keys', 'show'),
+                        help='index to query, "keys" to list the keys of an index, or "show" to print a section')
+    parser.add_argument('term', help='endpoint, context, hook or state type '
+                                     '(index name for "keys", section path for "show")')
+    parser.add_argument('--input', default=INPUT, help='enhanced monolith to index')
+    parser.add_argument('--index-file', default=INDEX, help='where the index is saved')
+    parser.add_argument('--rebuild', action='store_true', help='rebuild the index even if it is current')
+    args = parser.parse_args(argv)
+
+    index = load_index(args.input, args.index_file, args.rebuild)
+
+    if args.index == 'keys':
+        if args.term not in INDEX_NAMES:
+            parser.error(f"keys takes one of: {', '.join(INDEX_NAMES)}")
+        for key, ids in sorted(index['indexes'][args.term].items(), key=lambda x: (-len(x[1]), x[0])):
+            print(f"{len(ids):5d}  {key}")
+        return 0
+
+    if args.index == 'show':
+        if args.term not in index['sections']:
+            print(f"No section '{args.term}'")
+            return 1
+        sys.stdout.writelines(read_section(args.input, index, args.term))
+        return 0
+
+    paths = lookup(index, args.index, args.term)
+    if not paths:
+        similar = [k for k in index['indexes'][args.index] if args.term.lower() in k.lower()]
+        print(f"No sections for {args.index} '{args.term}'")
+        if similar:
+            print(f"Similar keys: {', '.join(sorted(similar)[:10])}")
+        return 1
+    for p in paths:
+        print(p)
+    print(f"\n{len(paths)} section(s)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""Progress lines and run metrics for the pipeline scripts (--metrics PATH).
+
+Progress replaces the bare "Processed N/M sections" lines with throughput
+(sections, lines and bytes per second) and an ETA. RunMetrics times each
+stage of a run and collects counts and cache hit rates; write() saves them
+when the run ends, as Prometheus text exposition format (for the
+node_exporter textfile collector) or as JSON for a .json path, so scheduled
+runs can be graphed and compared.
+
+A RunMetrics without a path still times stages, and write() does nothing.
+"""
+import json
+import os
+import re
+import time
+from contextlib import contextmanager
+
+from memory_profile import format_bytes
+
+PROGRESS_EVERY = 20
+METRIC_PREFIX = 'swiftref'
+
+
+def format_duration(seconds):
+    if seconds < 60:
+        return f"{seconds:.1f}s"
+    minutes, seconds = divmod(int(seconds + 0.5), 60)
+    return f"{minutes}m{seconds:02d}s"
+
+
+class Progress:
+    """Counts finished sections and prints a throughput line every `every`."""
+
+    def __init__(self, total, every=PROGRESS_EVERY):
+        self.total = total
+        self.every = every
+        self.done = 0
+        self.lines = 0
+        self.bytes = 0
+        self.start = time.perf_counter()
+
+    def advance(self, lines, nbytes):
+        self.done += 1
+        self.lines += lines
+        self.bytes += nbytes
+        if self.done % self.every == 0:
+            print(self.status())
+
+    def elapsed(self):
+        return max(time.perf_counter() - self.start, 1e-9)
+
+    def rates(self):
+        """Throughput so far, as metric values."""
+        elapsed = self.elapsed()
+        return {
+            'sections_per_second': self.done / elapsed,
+            'lines_per_second': self.lines / elapsed,
+            'bytes_per_second': self.bytes / elapsed,
+        }
+
+    def status(self):
+        rates = self.rates()
+        per_section = 1 / rates['sections_per_second'] if self.done else 0
+        eta = (self.total - self.done) * per_section
+        return (f"  Processed {self.done}/{self.total} sections "
+                f"({rates['sections_per_second']:.1f}/s, {rates['lines_per_second']:,.0f} lines/s, "
+                f"{format_bytes(rates['bytes_per_second'])}/s, ETA {format_duration(eta)})")
+
+
+class RunMetrics:
+    """Stage durations, values and cache hit rates for one run of a script."""
+
+    def __init__(self, script, path=None):
+        self.script = script
+        self.path = path
+        self.started = time.time()
+        self._t0 = time.perf_counter()
+        self.stages = []    # [(name, seconds)]
+        self.values = {}
+        self.caches = {}    # name -> (hits, misses)
+
+    @contextmanager
+    def stage(self, name):
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.append((name, time.perf_counter() - t))
+
+    def set(self, **values):
+        self.values.update(values)
+
+    def cache(self, name, hits, misses):
+        self.caches[name] = (hits, misses)
+
+    def as_dict(self):
+        return {
+            'script': self.script,
+            'started': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started)),
+            'duration_seconds': round(time.perf_counter() - self._t0, 3),
+            'stages': {name: round(seconds, 3) for name, seconds in self.stages},
+            'values': self.values,
+            'caches': {name: {'hits': h, 'misses': m, 'hit_ratio': h / (h + m) if h + m else None}
+                       for name, (h, m) in self.caches.items()},
+        }
+
+    def prometheus_lines(self):
+        label = f'script="{self.script}"'
+        lines = []
+
+        def gauge(name, help_text, samples):
+            lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name} gauge")
+            for labels, value in samples:
+                lines.append(f"{METRIC_PREFIX}_{name}{{{label}{labels}}} {value}")
+
+        gauge('run_start_timestamp_seconds', 'Unix time the run started.', [('', self.started)])
+        gauge('run_duration_seconds', 'Wall time of the whole run.', [('', time.perf_counter() - self._t0)])
+        gauge('stage_duration_seconds', 'Wall time of each stage.',
+              [(f',stage="{name}"', seconds) for name, seconds in self.stages])
+        for name, value in self.values.items():
+            gauge(re.sub(r'\W', '_', name), f'{name} of the run.', [('', value)])
+        if self.caches:
+            gauge('cache_hits', 'Lookups answered from a cache.',
+                  [(f',cache="{name}"', h) for name, (h, _) in self.caches.items()])
+            gauge('cache_misses', 'Lookups that had to be computed.',
+                  [(f',cache="{name}"', m) for name, (_, m) in self.caches.items()])
+            gauge('cache_hit_ratio', 'Hits over lookups.',
+                  [(f',cache="{name}"', h / (h + m)) for name, (h, m) in self.caches.items() if h + m])
+        return lines
+
+    def write(self):
+        """Save to path, replacing any previous run's file in one step."""
+        if not self.path:
+            return
+        if self.path.lower().endswith('.json'):
+            text = json.dumps(self.as_dict(), indent=1) + '\n'
+        else:
+            text = '\n'.join(self.prometheus_lines()) + '\n'
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp, self.path)
+        print(f"Metrics written to {self.path}")
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""Cached (path, content hash) index of the sections in a monolith.
+
+The hash covers a section's code only: separator lines, blank lines and
+everything the enhancer adds (FLOW, META, TYPE and the DEPENDENCY TREE block)
+are left out, so a section hashes the same in monolithic_with_marks.txt and
+monolithic_enhanced.txt unless its code was changed.
+
+Indexes are saved in one JSON cache keyed by file path and reused while the
+file's mtime and size are unchanged, so reconciling against the original
+monolith does not reread it on every run.
+"""
+import hashlib
+import os
+from collections import Counter
+
+from compressed_io import open_text
+from stamp_cache import file_stamp, has_stamp, read_json, write_json
+
+INDEX_VERSION = 1
+ADDED_PREFIXES = ('// ====', '// FLOW:', '// META:', '// TYPE:')
+
+# Lookups load_section_index answered from the cache ('hits') or by rescanning ('misses')
+cache_stats = Counter()
+
+
+# ── Hashing ─────────────────────────────────────────────────────────────────
+
+class SectionHasher:
+    """Feeds one section's lines into a hash, skipping non-code lines."""
+    __slots__ = ('_hash', '_in_tree', '_wrapped')
+
+    def __init__(self):
+        self._hash = hashlib.blake2b(digest_size=16)
+        self._in_tree = False
+        # Added lines whose value contains a newline (a multi-line state type)
+        # carry on over plain lines: a META list until the line closing it, a
+        # TYPE annotation until the declaration it annotates
+        self._wrapped = None
+
+    def update(self, line):
+        s = line.strip()
+        if self._wrapped == 'meta':
+            if s.endswith(']'):
+                self._wrapped = None
+            return
+        if self._wrapped == 'type':
+            if 'useState' not in s and 'useReducer' not in s:
+                return
+            self._wrapped = None
+        if not s:
+            self._in_tree = False
+            return
+        if s == '// DEPENDENCY TREE:':
+            self._in_tree = True
+            return
+        if self._in_tree and s.startswith('//'):
+            return
+        self._in_tree = False
+        if s.startswith(ADDED_PREFIXES):
+            if s.startswith('// TYPE:'):
+                self._wrapped = 'type'
+            elif s.startswith('// META:') and not s.endswith(']'):
+                value = s.split(':', 2)[-1].strip()
+                self._wrapped = 'meta' if value.startswith('[') else None
+            return
+        self._hash.update(s.encode('utf-8', 'replace'))
+        self._hash.update(b'\n')
+
+    def hexdigest(self):
+        return self._hash.hexdigest()
+
+
+def section_hash(lines):
+    hasher = SectionHasher()
+    for line in lines:
+        hasher.update(line)
+    return hasher.hexdigest()
+
+
+def scan_file(path):
+    """Stream a plain or compressed monolith once and return
+    [(path, hash), ...] in file order."""
+    entries = []
+    current = None
+    hasher = None
+    with open_text(path, errors='replace') as f:
+        for line in f:
+            s = line.strip()
+            if s.startswith('// FILE:'):
+                if current is not None:
+                    entries.append((current, hasher.hexdigest()))
+                current = s.replace('// FILE:', '').strip()
+                hasher = SectionHasher()
+            elif current is not None:
+                hasher.update(line)
+    if current is not None:
+        entries.append((current, hasher.hexdigest()))
+    return entries
+
+
+# ── Cache ───────────────────────────────────────────────────────────────────
+
+def load_section_index(path, cache_path):
+    """Section entries for path, from the cache when it is current.
+
+    Returns None if path is unreadable.
+    """
+    try:
+        stamp = file_stamp(path)
+    except OSError:
+        return None
+    key = os.path.abspath(path)
+    cache = read_json(cache_path, INDEX_VERSION) or {}
+    cached = cache.get('files', {}).get(key)
+    if cached and has_stamp(cached, stamp):
+        cache_stats['hits'] += 1
+        return [tuple(e) for e in cached['sections']]
+    cache_stats['misses'] += 1
+    try:
+        entries = scan_file(path)
+    except OSError:
+        return None
+    cache.setdefault('files', {})[key] = dict(stamp, sections=entries)
+    try:
+        write_json(cache_path, cache, INDEX_VERSION)
+    except OSError:
+        pass  # the cache is only an optimisation
+    return entries
+
+
+# ── Reconciliation ──────────────────────────────────────────────────────────
+
+class Reconciliation:
+    """Differences between an enhanced monolith and its original."""
+    __slots__ = ('missing', 'extra', 'duplicated', 'drifted')
+
+    def __init__(self, missing, extra, duplicated, drifted):
+        self.missing = missing
+        self.extra = extra
+        self.duplicated = duplicated
+        self.drifted = drifted
+
+
+def reconcile(enhanced, original):
+    """Compare two entry lists in one pass over the enhanced entries.
+
+    missing and extra are sorted paths; duplicated maps each path seen more
+    than once in the enhanced file to its count, in first-seen order;
+    drifted lists paths whose n-th occurrence hashes differently from the
+    n-th occurrence in the original.
+    """
+    remaining = {}
+    for path, digest in original:
+        remaining.setdefault(path, []).append(digest)
+    orig_paths = set(remaining)
+
+    seen = Counter()
+    extra = set()
+    drifted = []
+    for path, digest in enhanced:
+        seen[path] += 1
+        hashes = remaining.get(path)
+        if hashes is None:
+            if path not in orig_paths:
+                extra.add(path)
+            continue
+        if hashes.pop(0) != digest:
+            drifted.append(path)
+        if not hashes:
+            del remaining[path]
+
+    return Reconciliation(
+        missing=sorted(orig_paths - set(seen)),
+        extra=sorted(extra),
+        duplicated={p: c for p, c in seen.items() if c > 1},
+        drifted=drifted,
+    )
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""Content-addressed store of monolith sections shared by every snapshot.
+
+Each section's exact text is stored once under its hash, so a snapshot is
+only a manifest of (path, hash) pairs plus the text before the first FILE
+marker. Enhanced output is stored under the section hash too, keyed with the
+fields, a digest of the classification rules and scan settings, and a digest
+of the snapshot's type table; type declarations are cached per section, so
+enhancing a snapshot analyses only sections the store has not enhanced in that
+context before. Output that fell back because a time budget ran out is not
+stored, so a slow run does not fix its fallbacks in place.
+
+    python3 section_store.py add monolithic_with_marks.txt --name 2026-10-19
+    python3 section_store.py enhance 2026-10-19 -o monolithic_enhanced.txt
+    python3 section_store.py checkout 2026-10-19 -o monolithic_with_marks.txt
+    python3 section_store.py diff 2026-10-12 2026-10-19
+    python3 section_store.py list
+    python3 section_store.py gc
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+
+from classification_rules import SCAN_WINDOWS
+from compressed_io import open_text
+from enhance_metadata import FIELDS, RULES_PATH, SectionAnalysis, parse_fields, parse_sections, process_section
+from type_table import TypeDecl, TypeTable, scan_declarations
+
+STORE = "/Users/markflynn/Local Sites/yesallofus/swift-reference/section_store"
+
+# Texts keep their line endings, and bytes that are not UTF-8 round-trip as
+# surrogates, so a checkout reproduces the monolith exactly
+RAW_TEXT = {'errors': 'surrogateescape', 'newline': ''}
+
+# Bump when enhancer output changes for unchanged input, to retire stored results
+ANALYSIS_VERSION = 3
+
+
+def content_hash(text):
+    return hashlib.blake2b(text.encode('utf-8', 'surrogateescape'), digest_size=16).hexdigest()
+
+
+def settings_digest():
+    """Digest of the classification rules and scan windows the enhancer runs with."""
+    with open(RULES_PATH, 'r', encoding='utf-8') as f:
+        return content_hash(f'{f.read()}:{SCAN_WINDOWS}')
+
+
+# ── Store ───────────────────────────────────────────────────────────────────
+
+class SectionStore:
+    """objects/ holds section texts, results/ enhanced output and declarations,
+    snapshots/ one manifest per snapshot."""
+
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, kind, key, ext):
+        return os.path.join(self.root, kind, key[:2], key + ext)
+
+    def _write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + '.tmp' + os.path.splitext(path)[1]
+        with open_text(tmp, 'w', **RAW_TEXT) as f:
+            f.write(text)
+        os.replace(tmp, path)
+
+    def _read(self, path):
+        with open_text(path, **RAW_TEXT) as f:
+            return f.read()
+
+    # Section texts
+
+    def has(self, digest):
+        return os.path.exists(self._path('objects', digest, '.gz'))
+
+    def put(self, text):
+        """Store text under its hash; returns (hash, newly stored)."""
+        digest = content_hash(text)
+        if self.has(digest):
+            return digest, False
+        self._write(self._path('objects', digest, '.gz'), text)
+        return digest, True
+
+    def get(self, digest):
+        return self._read(self._path('objects', digest, '.gz'))
+
+    # Derived data
+
+    def result(self, key):
+        path = self._path('results', key, '.gz')
+        return self._read(path) if os.path.exists(path) else None
+
+    def put_result(self, key, text):
+        self._write(self._path('results', key, '.gz'), text)
+
+    # Snapshots
+
+    def manifest_path(self, name):
+        return os.path.join(self.root, 'snapshots', name + '.json')
+
+    def save_manifest(self, manifest):
+        path = self.manifest_path(manifest['name'])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(path + '.tmp', path)
+
+    def manifest(self, name):
+        try:
+            with open(self.manifest_path(name), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise SystemExit(f"No snapshot named {name!r} in {self.root}")
+
+    def snapshots(self):
+        folder = os.path.join(self.root, 'snapshots')
+        if not os.path.isdir(folder):
+            return []
+        return sorted(n[:-len('.json')] for n in os.listdir(folder) if n.endswith('.json'))
+
+
+# ── Snapshots ───────────────────────────────────────────────────────────────
+
+def split_monolith(lines):
+    """(preamble, [(filepath, text)]) with every line in exactly one part.
+
+    Section boundaries are the enhancer's own (parse_sections), so each text
+    parses back to the same Section on its own.
+    """
+    sections = parse_sections(lines)
+    texts = [(s.filepath, ''.join(s.header) + ''.join(s.body)) for s in sections]
+    covered = sum(len(s.header) + len(s.body) for s in sections)
+    return ''.join(lines[:len(lines) - covered]), texts
+
+
+def add_snapshot(store, path, name):
+    """Store a monolith's sections and save its manifest; returns (manifest, new, new_bytes)."""
+    with open_text(path, **RAW_TEXT) as f:
+        lines = f.readlines()
+    preamble, texts = split_monolith(lines)
+    new = new_bytes = 0
+    entries = []
+    for filepath, text in texts:
+        digest, stored = store.put(text)
+        if stored:
+            new += 1
+            new_bytes += len(text)
+        entries.append([filepath, digest])
+    manifest = {
+        'name': name,
+        'source': os.path.abspath(path),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'preamble': store.put(preamble)[0],
+        'sections': entries,
+    }
+    store.save_manifest(manifest)
+    return manifest, new, new_bytes
+
+
+def load_section(store, digest):
+    # Split as add_snapshot's readlines() did, so the section parses the same
+    return parse_sections(io.StringIO(store.get(digest), newline='').readlines())[0]
+
+
+def _declarations(store, filepath, digest):
+    """Type declarations of one stored section, cached per (path, hash)."""
+    key = content_hash(f'decls:{ANALYSIS_VERSION}:{filepath}:{digest}')
+    cached = store.result(key)
+    if cached is None:
+        section = load_section(store, digest)
+        decls = [[d.name, d.kind, [list(f) for f in d.fields], list(d.extends), d.alias]
+                 for d in scan_declarations(''.join(section.body), filepath)]
+        cached = json.dumps(decls, separators=(',', ':'))
+        store.put_result(key, cached)
+    return json.loads(cached)
+
+
+def snapshot_type_table(store, manifest):
+    """(TypeTable, digest) for a snapshot, built from cached declarations."""
+    table = TypeTable()
+    digest = hashlib.blake2b(digest_size=16)
+    for filepath, section_digest in manifest['sections']:
+        for name, kind, fields, extends, alias in _declarations(store, filepath, section_digest):
+            table.add(TypeDecl(name, kind, filepath, tuple(tuple(f) for f in fields), tuple(extends), alias))
+            digest.update(json.dumps([filepath, name, kind, fields, extends, alias]).encode('utf-8'))
+    return table, digest.hexdigest()
+
+
+def enhance_snapshot(store, manifest, out_path, fields=FIELDS):
+    """Write the snapshot's enhanced monolith, analysing only uncached sections.
+
+    Returns (reused, analysed).
+    """
+    type_table, table_digest = None, ''
+    if 'state' in fields or 'types' in fields:
+        type_table, table_digest = snapshot_type_table(store, manifest)
+    context = f'enhanced:{ANALYSIS_VERSION}:{",".join(fields)}:{settings_digest()}:{table_digest}'
+    reused = analysed = 0
+    with open_text(out_path, 'w', **RAW_TEXT) as out:
+        for filepath, digest in manifest['sections']:
+            key = content_hash(f'{context}:{digest}')
+            text = store.result(key)
+            if text is None:
+                section = load_section(store, digest)
+                analysis = SectionAnalysis(section, type_table)
+                text = ''.join(process_section(section, fields, analysis))
+                if not analysis.overran:
+                    store.put_result(key, text)
+                analysed += 1
+            else:
+                reused += 1
+            out.write(text)
+    return reused, analysed
+
+
+def checkout(store, manifest, out_path):
+    """Rebuild the snapshot's monolith byte for byte."""
+    with open_text(out_path, 'w', **RAW_TEXT) as out:
+        out.write(store.get(manifest['preamble']))
+        for _, digest in manifest['sections']:
+            out.write(store.get(digest))
+
+
+def diff_manifests(old, new):
+    """(added, removed, changed) paths between two manifests, without reading sections."""
+    before = dict(map(tuple, old['sections']))
+    after = dict(map(tuple, new['sections']))
+    added = sorted(set(after) - set(before))
+    removed = sorted(set(before) - set(after))
+    changed = sorted(p for p in set(before) & set(after) if before[p] != after[p])
+    return added, removed, changed
+
+
+def collect_garbage(store):
+    """Delete section texts no manifest references; returns how many were removed.
+
+    Derived results are keyed by context rather than by object and are only
+    removed with the store itself.
+    """
+    live = set()
+    for name in store.snapshots():
+        m = store.manifest(name)
+        live.add(m['preamble'])
+        live.update(d for _, d in m['sections'])
+    removed = 0
+    objects = os.path.join(store.root, 'objects')
+    for folder, _, files in os.walk(objects):
+        for fname in files:
+            if fname.endswith('.gz') and fname[:-len('.gz')] not in live:
+                os.remove(os.path.join(folder, fname))
+                removed += 1
+    return removed
+
+
+# ── CLI ─────────────────────────────────────────────────────────────────────
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--store', default=STORE, help='store directory')
+    sub = parser.add_subparsers(dest='command', required=True)
+    p = sub.add_parser('add', help='store a monolith as a snapshot')
+    p.add_argument('monolith')
+    p.add_argument('--name', help='snapshot name (default: today\'s date)')
+    p = sub.add_parser('enhance', help='write a snapshot\'s enhanced monolith')
+    p.add_argument('snapshot')
+    p.add_argument('-o', '--output', required=True)
+    p.add_argument('--fields', type=parse_fields, default=FIELDS)
+    p = sub.add_parser('checkout', help='rebuild a snapshot\'s monolith')
+    p.add_argument('snapshot')
+    p.add_argument('-o', '--output', required=True)
+    p = sub.add_parser('diff', help='sections added, removed and changed between two snapshots')
+    p.add_argument('old')
+    p.add_argument('new')
+    sub.add_parser('list', help='snapshots and what they share')
+    sub.add_parser('gc', help='delete sections no snapshot references')
+    args = parser.parse_args(argv)
+    store = SectionStore(args.store)
+
+    if args.command == 'add':
+        name = args.name or time.strftime('%Y-%m-%d')
+        manifest, new, new_bytes = add_snapshot(store, args.monolith, name)
+        print(f"Snapshot {name}: {len(manifest['sections'])} sections, "
+              f"{new} new ({new_bytes / 1024:.1f} KB of text stored)")
+    elif args.command == 'enhance':
+        reused, analysed = enhance_snapshot(store, store.manifest(args.snapshot), args.output, args.fields)
+        print(f"Wrote {args.output}: {analysed} section(s) analysed, {reused} reused from the store")
+    elif args.command == 'checkout':
+        checkout(store, store.manifest(args.snapshot), args.output)
+        print(f"Wrote {args.output}")
+    elif args.command == 'diff':
+        added, removed, changed = diff_manifests(store.manifest(args.old), store.manifest(args.new))
+        for label, paths in (('+', added), ('-', removed), ('~', changed)):
+            for p in paths:
+                print(f"{label} {p}")
+        print(f"\n{len(added)} added, {len(removed)} removed, {len(changed)} changed")
+        return 1 if added or removed or changed else 0
+    elif args.command == 'list':
+        unique = set()
+        for name in store.snapshots():
+            m = store.manifest(name)
+            digests = {d for _, d in m['sections']}
+            print(f"{name}  {len(m['sections'])} sections  {len(digests - unique)} not in earlier snapshots  ({m['created']})")
+            unique |= digests
+        print(f"\n{len(unique)} unique section(s)")
+    else:
+        print(f"Removed {collect_garbage(store)} unreferenced section(s)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Section text shared with pool workers through one shared-memory block.
+
+Pickling every section's text into each task copies the largest page
+components several times over. Instead the parent packs all texts into a
+single SharedMemory block once, workers map it in their pool initializer,
+and tasks carry only (offset, length) descriptors that a worker decodes on
+its side.
+"""
+import os
+from multiprocessing import shared_memory
+
+_attached = None
+
+
+class SharedText:
+    """Owner of the block: texts packed back to back, one descriptor each."""
+
+    def __init__(self, texts):
+        encoded = [t.encode('utf-8') for t in texts]
+        self.shm = shared_memory.SharedMemory(create=True, size=max(1, sum(map(len, encoded))))
+        self.descriptors = []
+        pos = 0
+        for data in encoded:
+            self.shm.buf[pos:pos + len(data)] = data
+            self.descriptors.append((pos, len(data)))
+            pos += len(data)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def attach(name):
+    """Pool initializer: map the parent's block into this worker."""
+    global _attached
+    _attached = shared_memory.SharedMemory(name=name)
+
+
+def shared_text(offset, length):
+    """Text for one descriptor, in a worker that has attached."""
+    return bytes(_attached.buf[offset:offset + length]).decode('utf-8')
+
+
+def use_pool(count, jobs, chunk_size):
+    """Whether count sections go to a pool of jobs workers; one chunk or
+    less is cheaper to do in the parent."""
+    return jobs > 1 and count > chunk_size
+
+
+def default_jobs(profile_memory):
+    """--jobs when not given: the CPU count, but serial under --profile-memory,
+    whose per-section figures only trace the parent process."""
+    return 1 if profile_memory else os.cpu_count() or 1
+
+
+def iter_ordered(pool, func, chunks):
+    """Submit func(chunk) for every chunk; yield each chunk's results in chunk order.
+
+    Completion order varies between runs and the output must not, so
+    finished chunks wait until every earlier chunk has been yielded.
+    """
+    futures = [pool.submit(func, chunk) for chunk in chunks]
+    for future in futures:
+        yield future.result()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""JSON caches of data derived from a file, reused while the file is unchanged.
+
+A cache records the version of the code that wrote it and the source file's
+mtime and size. It is written to a temporary file and renamed into place, so
+an interrupted run leaves the previous cache rather than a truncated one,
+and a cache that is unreadable anyway is treated as missing.
+"""
+import json
+import os
+
+
+def file_stamp(path):
+    st = os.stat(path)
+    return {'mtime': st.st_mtime, 'size': st.st_size}
+
+
+def has_stamp(entry, stamp):
+    return entry.get('mtime') == stamp['mtime'] and entry.get('size') == stamp['size']
+
+
+def read_json(path, version):
+    """The cache at path, or None if it is missing, corrupt or another version's."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) and data.get('version') == version else None
+
+
+def write_json(path, data, version):
+    data['version'] = version
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, separators=(',', ':'))
+    os.replace(tmp, path)
+
+
+def load_derived(source, cache_path, version, build, rebuild=False):
+    """build(source), from the cache while source's stamp is unchanged.
+
+    If source is gone, a saved result is returned as it is.
+    """
+    if not rebuild:
+        data = read_json(cache_path, version)
+        if data is not None:
+            try:
+                current = has_stamp(data, file_stamp(source))
+            except OSError:
+                current = True  # source gone; the saved data is all we have
+            if current:
+                return data
+    stamp = file_stamp(source)   # taken first, so edits during the build force a rebuild
+    data = build(source)
+    data.update(stamp)
+    write_json(cache_path, data, version)
+    return data
@@ -0,0 +1,30 @@
+from enhance_metadata import build_call_map
+
+SECTION = '''export default function Checkout() {
+  const [busy, setBusy] = useState(false);
+
+  const loadRates = async () => {
+    const res = await fetch(`${API_URL}/rates`);
+    return res.json();
+  };
+
+  const handlePay = async () => {
+    setBusy(true);
+    const submit = async () => {
+      await fetch(
+        '/api/payments', { method: 'POST' });
+    };
+    await loadRates();
+    await submit();
+  };
+
+  return <button onClick={handlePay} />;
+}
+'''
+
+
+def test_handler_reaches_nested_and_called_helpers():
+    calls = build_call_map(SECTION.split('\n'), ['setBusy'])
+    assert [str(c) for c in calls] == [
+        'handlePay(helpers: loadRates submit; apis: /api/payments /rates; sets: setBusy)',
+    ]
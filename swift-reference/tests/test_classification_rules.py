@@ -0,0 +1,24 @@
+from classification_rules import SCAN_WINDOWS, RuleTable
+
+EDGE = SCAN_WINDOWS[0]
+
+
+def table(pattern, lower=False):
+    return RuleTable([{'result': 'Hit', 'when': [{'code_regex': pattern, 'lower': lower}]}])
+
+
+def test_prefix_window_edge_is_not_end_of_text():
+    # The first window ends right after 'foo', inside 'foobar'
+    code = ' ' * (EDGE - 3) + 'foobar'
+    for pattern in (r'\bfoo\b', r'foo$', r'foo(?!bar)'):
+        assert table(pattern).lookup('app/page.tsx', code) is None
+        assert table(pattern, lower=True).lookup('app/page.tsx', code.upper()) is None
+
+
+def test_prefix_hits_still_decide_early():
+    rules = table(r'\bfoo\b')
+    code = 'foo ' + 'x' * (EDGE * 4)
+    assert rules.lookup('app/page.tsx', code) == 'Hit'
+    assert rules.scan_stats['prefix'] == 1
+    # A candidate cut off at the edge is confirmed against the whole file
+    assert table(r'foo\w*bar').lookup('app/page.tsx', ' ' * (EDGE - 3) + 'foobar') == 'Hit'
@@ -0,0 +1,57 @@
+import lzma
+
+import pytest
+
+from compressed_io import FramedWriter, iter_frames, iter_lines, open_at, open_text
+
+LINES = [f'// line {i:03d} ' + 'x' * (i % 17) + '\n' for i in range(200)]
+
+
+def write_framed(path, codec, frame_size=256):
+    with FramedWriter(open(path, 'wb'), codec, frame_size) as w:
+        w.write(''.join(LINES).encode('utf-8'))
+
+
+def check_offsets(path):
+    located = list(iter_lines(path))
+    assert [line for _, _, line in located] == LINES
+    for frame, offset, line in located:
+        with open_at(path, frame, offset) as f:
+            assert f.readline() == line
+    return located
+
+
+@pytest.mark.parametrize('codec, ext', [('gzip', '.gz'), ('xz', '.xz')])
+def test_framed_round_trip(tmp_path, codec, ext):
+    path = str(tmp_path / ('out.txt' + ext))
+    write_framed(path, codec)
+
+    with open_text(path) as f:
+        assert f.read() == ''.join(LINES)
+    frames = sorted({start for start, _ in iter_frames(path)})
+    assert len(frames) > 1
+    located = check_offsets(path)
+    # Every frame starts on a line, at offset 0
+    assert {frame for frame, offset, _ in located if offset == 0} == set(frames)
+
+
+def test_xz_stream_padding(tmp_path):
+    half = len(LINES) // 2
+    path = str(tmp_path / 'padded.txt.xz')
+    with open(path, 'wb') as f:
+        f.write(lzma.compress(''.join(LINES[:half]).encode('utf-8')))
+        f.write(b'\x00' * 4)
+        f.write(lzma.compress(''.join(LINES[half:]).encode('utf-8')))
+        f.write(b'\x00' * 8)
+
+    with open_text(path) as f:
+        assert f.read() == ''.join(LINES)
+    located = check_offsets(path)
+    assert len({frame for frame, _, _ in located}) == 2
+
+
+def test_plain_file_offsets(tmp_path):
+    path = str(tmp_path / 'plain.txt')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.writelines(LINES)
+    assert {frame for frame, _, _ in check_offsets(path)} == {0}
@@ -0,0 +1,17 @@
+from endpoint_catalog import RouteTrie, route_for_file
+
+
+def test_required_catch_all_needs_a_segment():
+    trie = RouteTrie([route_for_file('app/api/docs/[...slug]/route.ts'),
+                      route_for_file('app/api/shop/[[...slug]]/route.ts')])
+    assert trie.match('/api/docs') is None
+    assert trie.match('/api/docs/intro/setup') == '/api/docs/{*}'
+    assert trie.match('/api/shop') == '/api/shop/{*?}'
+    assert trie.match('/api/shop/hats') == '/api/shop/{*?}'
+
+
+def test_literal_and_param_routes_win_over_catch_alls():
+    trie = RouteTrie(['/api/docs', '/api/docs/{param}', '/api/docs/{*}'])
+    assert trie.match('/api/docs') == '/api/docs'
+    assert trie.match('/api/docs/intro') == '/api/docs/{param}'
+    assert trie.match('/api/docs/intro/setup') == '/api/docs/{*}'
@@ -0,0 +1,33 @@
+from generate_swift import emit_types, parse_types
+from validate_enhanced import split_meta_list
+
+
+def test_types_with_arrow_fields_stay_whole():
+    value = ("[SidebarProps{isOpen:boolean; onClose:() => void; onSelect:(id: string) => void}, "
+             "NavItem{label:string; href:string}, Mode='light' | 'dark']")
+    assert parse_types(split_meta_list(value)) == [
+        ('SidebarProps', 'struct', [('isOpen', 'boolean', False), ('onClose', '() => void', False),
+                                    ('onSelect', '(id: string) => void', False)]),
+        ('NavItem', 'struct', [('label', 'string', False), ('href', 'string', False)]),
+        ('Mode', 'alias', "'light' | 'dark'"),
+    ]
+
+
+def test_meta_list_brackets_and_strings():
+    assert split_meta_list('[none]') == []
+    assert split_meta_list('[ids:string[], label:\'a, b\']') == ['ids:string[]', "label:'a, b'"]
+    # A value cut off mid-type keeps the items before it
+    assert split_meta_list('[a:number, b:{') == ['a:number', 'b:{']
+
+
+def test_string_union_cases_are_valid_and_distinct():
+    out = []
+    emit_types([('Range', 'alias', "'1d' | '7d' | 'in-progress' | 'in_progress' | '' | 'default'")], out)
+    assert out[1:7] == [
+        '    case _1d = "1d"',
+        '    case _7d = "7d"',
+        '    case inProgress = "in-progress"',
+        '    case inProgress_ = "in_progress"',
+        '    case empty = ""',
+        '    case `default` = "default"',
+    ]
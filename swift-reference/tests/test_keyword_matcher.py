@@ -0,0 +1,30 @@
+from keyword_matcher import KeywordMatcher, is_whole_word
+
+
+def test_overlapping_and_nested_keywords_all_reported():
+    matcher = KeywordMatcher(['he', 'she', 'his', 'hers'])
+    assert sorted(matcher.iter_matches('ushers')) == [(1, 'she'), (2, 'he'), (2, 'hers')]
+
+
+def test_keyword_inside_another_found_through_failure_links():
+    matcher = KeywordMatcher(['affiliate-dashboard', 'dash'])
+    assert set(matcher.iter_matches('affiliate-dashboard')) == {(0, 'affiliate-dashboard'), (10, 'dash')}
+
+
+def test_repeated_and_duplicate_keywords():
+    matcher = KeywordMatcher(['pos', 'pos', ''])
+    assert matcher.keywords == ('pos',)
+    assert matcher.counts('pos pos xpos') == {'pos': 3}
+
+
+def test_whole_words_match_regex_word_boundaries():
+    matcher = KeywordMatcher(['pos', 'vendor'])
+    text = 'pos_terminal vendor, repost pos.\nvendors'
+    assert matcher.counts(text, whole_words=True) == {'pos': 1, 'vendor': 1}
+    assert matcher.found('apos', whole_words=True) == set()
+
+
+def test_is_whole_word_limit_acts_as_end_of_text():
+    text = 'vendorship'
+    assert not is_whole_word(text, 0, 6)
+    assert is_whole_word(text, 0, 6, limit=6)
@@ -0,0 +1,35 @@
+from add_marks import bracket_delta, build_outline
+
+SECTION = '''function Tips({ items }) {
+  const escape = (s) => s.replace(/"/g, '&quot;').replace(/'/g, '&#39;');
+  return (
+    <ul>
+      {items.map((i) => (<li>Don't {i}</li>))}
+    </ul>
+  );
+}
+
+export default function Receipts() {
+  const handleSend = async () => {
+    await send();
+  };
+  return <Tips items={[]} />;
+}
+'''
+
+
+def test_quotes_in_regex_and_jsx_text_keep_nesting():
+    items = build_outline(SECTION.split('\n'))
+    assert [(i.kind, i.name, i.start, i.end, i.depth) for i in items] == [
+        ('component', 'Tips', 0, 7, 0),
+        ('function', 'escape', 1, 1, 1),
+        ('component', 'Receipts', 9, 14, 0),
+        ('handler', 'handleSend', 10, 12, 1),
+    ]
+
+
+def test_bracket_delta_skips_strings_comments_and_regexes():
+    assert bracket_delta("if (/[/(]/.test(s)) { // (", None) == (1, None)
+    assert bracket_delta('x = a / b / (c', None) == (1, None)
+    assert bracket_delta('const t = `${a}(', None) == (0, '`')
+    assert bracket_delta("<p>It's {n}</p>", None) == (0, None)
@@ -0,0 +1,62 @@
+import section_store
+from section_store import SectionStore, add_snapshot, checkout, enhance_snapshot
+
+MONOLITH = '''// ============================================================
+// FILE: app/components/Button.tsx
+// ============================================================
+export default function Button() {
+  return <button />;
+}
+
+// ============================================================
+// FILE: app/lib/format.ts
+// ============================================================
+export const formatAmount = (n: number) => n.toFixed(2);
+'''
+
+
+def make_store(tmp_path):
+    source = tmp_path / 'monolith.txt'
+    source.write_text(MONOLITH)
+    store = SectionStore(str(tmp_path / 'store'))
+    manifest, _, _ = add_snapshot(store, str(source), 'snap')
+    return store, manifest, str(tmp_path / 'enhanced.txt')
+
+
+def test_changed_rules_retire_stored_results(tmp_path, monkeypatch):
+    store, manifest, out = make_store(tmp_path)
+    assert enhance_snapshot(store, manifest, out) == (0, 2)
+    assert enhance_snapshot(store, manifest, out) == (2, 0)
+
+    rules = tmp_path / 'rules.json'
+    rules.write_text(open(section_store.RULES_PATH, encoding='utf-8').read() + '\n')
+    monkeypatch.setattr(section_store, 'RULES_PATH', str(rules))
+    assert enhance_snapshot(store, manifest, out) == (0, 2)
+    monkeypatch.setattr(section_store, 'SCAN_WINDOWS', (1024, 32768))
+    assert enhance_snapshot(store, manifest, out) == (0, 2)
+
+
+def test_budget_overruns_are_not_stored(tmp_path, monkeypatch):
+    store, manifest, out = make_store(tmp_path)
+
+    class Overrun(section_store.SectionAnalysis):
+        def __init__(self, *args):
+            super().__init__(*args)
+            self.overran = True
+
+    monkeypatch.setattr(section_store, 'SectionAnalysis', Overrun)
+    assert enhance_snapshot(store, manifest, out) == (0, 2)
+    assert enhance_snapshot(store, manifest, out) == (0, 2)
+
+
+def test_checkout_is_byte_for_byte(tmp_path):
+    raw = MONOLITH.replace('\n', '\r\n').encode('utf-8') + b'// caf\xe9 \xff\r\nlast line'
+    source = tmp_path / 'monolith.txt'
+    source.write_bytes(raw)
+    store = SectionStore(str(tmp_path / 'store'))
+    manifest, _, _ = add_snapshot(store, str(source), 'snap')
+    assert [p for p, _ in manifest['sections']] == ['app/components/Button.tsx', 'app/lib/format.ts']
+    out = tmp_path / 'checkout.txt'
+    checkout(store, manifest, str(out))
+    assert out.read_bytes() == raw
+    enhance_snapshot(store, manifest, str(tmp_path / 'enhanced.txt'))
@@ -0,0 +1,12 @@
+from shared_sections import default_jobs, use_pool
+
+
+def test_small_runs_stay_serial_whatever_the_job_count():
+    assert not use_pool(16, 8, 16)
+    assert not use_pool(100, 1, 16)
+    assert use_pool(17, 2, 16)
+
+
+def test_memory_profiling_defaults_to_serial():
+    assert default_jobs(True) == 1
+    assert default_jobs(False) >= 1
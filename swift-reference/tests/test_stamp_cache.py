@@ -0,0 +1,30 @@
+import os
+
+from stamp_cache import load_derived
+
+
+def test_truncated_cache_is_rebuilt(tmp_path):
+    source = tmp_path / 'monolith.txt'
+    source.write_text('// FILE: a.tsx\n')
+    cache = tmp_path / 'index.json'
+    cache.write_text('{"trunc')
+    builds = []
+
+    def build(path):
+        builds.append(path)
+        return {'sections': ['a.tsx']}
+
+    assert load_derived(str(source), str(cache), 1, build)['sections'] == ['a.tsx']
+    assert load_derived(str(source), str(cache), 1, build)['sections'] == ['a.tsx']
+    assert len(builds) == 1
+    assert not os.path.exists(str(cache) + '.tmp')
+
+
+def test_changed_source_or_version_rebuilds(tmp_path):
+    source = tmp_path / 'monolith.txt'
+    source.write_text('one\n')
+    cache = str(tmp_path / 'index.json')
+    load_derived(str(source), cache, 1, lambda p: {'n': 1})
+    source.write_text('one\ntwo\n')
+    assert load_derived(str(source), cache, 1, lambda p: {'n': 2})['n'] == 2
+    assert load_derived(str(source), cache, 2, lambda p: {'n': 3})['n'] == 3
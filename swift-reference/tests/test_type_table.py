@@ -0,0 +1,29 @@
+from type_table import format_decl, scan_declarations
+
+CODE = '''
+enum Status { // waiting
+  Pending = 'pending',
+  /** done */
+  Paid = 'paid', // settled
+  /* gone */ Void,
+}
+
+interface Order {
+  id: string; // don't reuse
+  /* legacy */ name?: string;
+  /**
+   * Amount in cents
+   */
+  total: number;
+  note: '/* not a comment */';
+}
+'''
+
+
+def test_comments_do_not_hide_or_leak_into_members():
+    status, order = scan_declarations(CODE, 'app/orders.ts')
+    assert [m[0] for m in status.fields] == ['Pending', 'Paid', 'Void']
+    assert format_decl(status, status.fields) == 'Status(enum){Pending; Paid; Void}'
+    assert order.fields == (('id', 'string', False), ('name', 'string', True),
+                            ('total', 'number', False), ('note', "'/* not a comment */'", False))
+    assert '\n' not in format_decl(order, order.fields)
@@ -0,0 +1,11 @@
+import pytest
+
+from validate_enhanced import main
+
+
+@pytest.mark.parametrize('args', [['--confidence', '1'], ['--confidence', '0'], ['--sample', '0']])
+def test_out_of_range_sampling_options_are_rejected(args, capsys):
+    with pytest.raises(SystemExit) as exc:
+        main(['--sample', '0.5'] + args)
+    assert exc.value.code == 2
+    assert 'must be in' in capsys.readouterr().err
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""Project-wide table of interface, type and enum declarations.
+
+Built in one pass over every section so a type referenced in one file
+(useState<Vendor[]>, a Props field typed Store) can be expanded to the fields
+declared in another without rescanning the monolith per reference.
+"""
+import re
+import sys
+
+DECL_RE = re.compile(
+    r'^[ \t]*(?:export\s+)?(?:declare\s+)?'
+    r'(?:interface\s+(?P<iface>\w+)(?:<[^>{]*>)?(?:\s+extends\s+(?P<extends>[^{]+))?\s*\{'
+    r'|type\s+(?P<alias>\w+)(?:<[^>=]*>)?\s*=\s*(?P<alias_open>\{)?'
+    r'|(?:const\s+)?enum\s+(?P<enum>\w+)\s*\{)',
+    re.MULTILINE,
+)
+TYPE_FIELD_RE = re.compile(r'^(?:readonly\s+)?[\'"]?(\w+)[\'"]?(\?)?\s*:\s*(.+?)[,;]?$', re.DOTALL)
+TYPE_NAME_RE = re.compile(r'\b[A-Z]\w*')
+
+# Names a type expression can mention without referring to a declaration
+BUILTIN_TYPES = frozenset((
+    'Array', 'Record', 'Partial', 'Required', 'Readonly', 'Pick', 'Omit', 'Promise',
+    'Map', 'Set', 'Date', 'Error', 'Event', 'File', 'Blob', 'Function', 'Object',
+    'React', 'ReactNode', 'HTMLElement', 'HTMLDivElement', 'HTMLInputElement',
+    'AbortController', 'NodeJS',
+))
+
+
+# ── Parsing helpers ──────────────────────────────────────────────────────────
+
+def split_top_level(text, seps=','):
+    """Split on separator characters that are not nested in brackets or strings."""
+    items = []
+    depth = 0
+    quote = None
+    start = 0
+    for i, ch in enumerate(text):
+        if quote:
+            if ch == quote and text[i - 1] != '\\':
+                quote = None
+        elif ch in '\'"`':
+            quote = ch
+        elif ch in '([{<':
+            depth += 1
+        elif ch in ')]}' or (ch == '>' and text[i - 1] != '='):
+            depth -= 1
+        elif ch in seps and depth == 0:
+            items.append(text[start:i])
+            start = i + 1
+    items.append(text[start:])
+    return [item.strip() for item in items if item.strip()]
+
+
+def strip_comments(text):
+    """text without // and /* */ comments; line comments keep their newline."""
+    out = []
+    quote = None
+    start = i = 0
+    n = len(text)
+    while i < n:
+        ch = text[i]
+        if quote:
+            if ch == quote and text[i - 1] != '\\':
+                quote = None
+        elif ch in '\'"`':
+            quote = ch
+        elif ch == '/' and text.startswith(('//', '/*'), i):
+            out.append(text[start:i])
+            if text[i + 1] == '/':
+                i = text.find('\n', i)
+                i = n if i == -1 else i
+            else:
+                i = text.find('*/', i + 2)
+                i = n if i == -1 else i + 2
+                out.append(' ')
+            start = i
+            continue
+        i += 1
+    out.append(text[start:])
+    return ''.join(out)
+
+
+def balanced_span(code, open_idx, limit=4000):
+    """Text between the bracket at open_idx and its partner, or None.
+
+    Brackets and quotes inside comments are skipped; the span keeps its comments.
+    """
+    pairs = {'(': ')', '{': '}', '[': ']'}
+    opener = code[open_idx]
+    closer = pairs[opener]
+    depth = 0
+    quote = None
+    end = min(len(code), open_idx + limit)
+    i = open_idx
+    while i < end:
+        ch = code[i]
+        if quote:
+            if ch == quote and code[i - 1] != '\\':
+                quote = None
+        elif ch in '\'"`':
+            quote = ch
+        elif ch == '/' and code.startswith('//', i):
+            i = code.find('\n', i, end)
+            if i == -1:
+                return None
+        elif ch == '/' and code.startswith('/*', i):
+            i = code.find('*/', i + 2, end)
+            if i == -1:
+                return None
+            i += 1
+        elif ch == opener:
+            depth += 1
+        elif ch == closer:
+            depth -= 1
+            if depth == 0:
+                return code[open_idx + 1:i]
+        i += 1
+    return None
+
+
+def parse_type_fields(body):
+    """Fields of an interface/object type body as {name: (type, optional)}."""
+    fields = {}
+    for item in split_top_level(strip_comments(body), ';\n'):
+        m = TYPE_FIELD_RE.match(item)
+        if m:
+            fields[m.group(1)] = (' '.join(m.group(3).split()), bool(m.group(2)))
+    return fields
+
+
+def type_names(expr):
+    """Declared-type candidates mentioned in a type expression, in order."""
+    names = []
+    for m in TYPE_NAME_RE.finditer(expr):
+        name = m.group(0)
+        if name not in BUILTIN_TYPES and name not in names:
+            names.append(name)
+    return names
+
+
+# ── Table ────────────────────────────────────────────────────────────────────
+
+class TypeDecl:
+    """One interface, object type, type alias or enum."""
+    __slots__ = ('name', 'kind', 'filepath', 'fields', 'extends', 'alias')
+
+    def __init__(self, name, kind, filepath, fields=(), extends=(), alias=None):
+        self.name = sys.intern(name)
+        self.kind = kind
+        self.filepath = filepath
+        self.fields = fields    # ((name, type, optional), ...); enum members have type ''
+        self.extends = extends
+        self.alias = alias      # right-hand side of a non-object type alias
+
+
+class TypeTable:
+    """Declarations by name; several files may declare the same name."""
+    __slots__ = ('_decls', '_flat')
+
+    def __init__(self):
+        self._decls = {}
+        self._flat = {}
+
+    def __len__(self):
+        return len(self._decls)
+
+    def __contains__(self, name):
+        return name in self._decls
+
+    def add(self, decl):
+        self._decls.setdefault(decl.name, []).append(decl)
+
+    def names(self):
+        return self._decls.keys()
+
+    def get(self, name, filepath=None):
+        """The declaration of name, preferring one from filepath."""
+        decls = self._decls.get(name)
+        if not decls:
+            return None
+        if filepath is not None:
+            for d in decls:
+                if d.filepath == filepath:
+                    return d
+        return decls[0]
+
+    def fields(self, name, filepath=None):
+        """Fields of name with extended interfaces flattened in, memoised."""
+        decl = self.get(name, filepath)
+        if decl is None:
+            return ()
+        key = (decl.name, decl.filepath)
+        if key not in self._flat:
+            self._flat[key] = ()  # guards against extends cycles
+            fields = {}
+            for base in decl.extends:
+                for f in self.fields(base, decl.filepath):
+                    fields.setdefault(f[0], f)
+            for f in decl.fields:
+                fields[f[0]] = f
+            self._flat[key] = tuple(fields.values())
+        return self._flat[key]
+
+    def expand(self, expr, filepath=None):
+        """Declarations a type expression refers to, with their fields: [(decl, fields)]."""
+        return [(self.get(n, filepath), self.fields(n, filepath))
+                for n in type_names(expr) if n in self._decls]
+
+
+def _alias_text(code, start):
+    """Right-hand side of a type alias: up to ';' or the end of its line,
+    carrying on over following lines that continue a union with '|'."""
+    end = start
+    while True:
+        nl = code.find('\n', end)
+        if nl == -1:
+            nl = len(code)
+        semi = code.find(';', end, nl)
+        if semi != -1:
+            end = semi
+            break
+        end = nl
+        if not code[nl + 1:nl + 200].lstrip(' \t').startswith('|'):
+            break
+        end = nl + 1
+    return ' '.join(code[start:end].split())
+
+
+def scan_declarations(code, filepath):
+    """Every top-level-looking type declaration in one section's code."""
+    decls = []
+    for m in DECL_RE.finditer(code):
+        if m.group('iface'):
+            body = balanced_span(code, m.end() - 1)
+            if body is None:
+                continue
+            extends = tuple(split_top_level(m.group('extends') or ''))
+            fields = tuple((n, t, o) for n, (t, o) in parse_type_fields(body).items())
+            decls.append(TypeDecl(m.group('iface'), 'interface', filepath, fields, extends))
+        elif m.group('alias'):
+            if m.group('alias_open'):
+                body = balanced_span(code, m.end() - 1)
+                if body is None:
+                    continue
+                fields = tuple((n, t, o) for n, (t, o) in parse_type_fields(body).items())
+                decls.append(TypeDecl(m.group('alias'), 'type', filepath, fields))
+            else:
+                alias = _alias_text(code, m.end())
+                decls.append(TypeDecl(m.group('alias'), 'alias', filepath, alias=alias))
+        else:
+            body = balanced_span(code, m.end() - 1)
+            if body is None:
+                continue
+            members = tuple((' '.join(item.split('=')[0].split()), '', False)
+                            for item in split_top_level(strip_comments(body)))
+            decls.append(TypeDecl(m.group('enum'), 'enum', filepath, members))
+    return decls
+
+
+def build_type_table(sections):
+    """One pass over (filepath, code) pairs into a TypeTable."""
+    table = TypeTable()
+    for filepath, code in sections:
+        for decl in scan_declarations(code, filepath):
+            table.add(decl)
+    return table
+
+
+def format_decl(decl, fields):
+    """Compact one-line form used in META: Name{a:string; b?:number}."""
+    if decl.kind == 'alias':
+        return f'{decl.name}={decl.alias}'
+    if decl.kind == 'enum':
+        return decl.name + '(enum){' + '; '.join(f[0] for f in fields) + '}'
+    parts = [f"{n}{'?' if optional else ''}:{t}" for n, t, optional in fields]
+    return decl.name + '{' + '; '.join(parts) + '}'
@@ -1,472 +1,961 @@
 #!/usr/bin/env python3
-"""Validate monolithic_enhanced.txt for accuracy and consistency."""
+"""Validate monolithic_enhanced.txt for accuracy and consistency.
+
+With --sample FRACTION only a stratified sample of sections (by META Type
+and Flow) gets the per-section checks, and the accuracy score is reported
+as an estimate with a confidence interval; --min-accuracy makes the run
+fail when the interval's lower bound drops below a threshold, as the cue
+for a full pass.
+"""
+import argparse
+import json
+import math
+import random
 import re
 import os
+import shutil
+import statistics
+import sys
+import io
+import tempfile
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from compressed_io import open_text, open_writer
+from keyword_matcher import KeywordMatcher
+from memory_profile import MemoryProfile, format_bytes, peak_rss
+from run_metrics import Progress, RunMetrics
+from section_index import cache_stats, load_section_index, reconcile, section_hash
+from shared_sections import SharedText, attach, default_jobs, iter_ordered, shared_text, use_pool
+from type_table import split_top_level
 
 INPUT = "/Users/markflynn/Local Sites/yesallofus/swift-reference/monolithic_enhanced.txt"
 ORIGINAL = "/Users/markflynn/Local Sites/yesallofus/swift-reference/monolithic_with_marks.txt"
 REPORT = "/Users/markflynn/Local Sites/yesallofus/swift-reference/validation_report.txt"
+SECTION_INDEX = "/Users/markflynn/Local Sites/yesallofus/swift-reference/section_index.json"
+
+# ── Records ─────────────────────────────────────────────────────────────────
+
+class Section:
+    """A parsed section of the enhanced file.
+
+    Only the joined body is kept; body_lines is split on demand.
+    """
+    __slots__ = ('filepath', 'body', 'meta_lines')
+
+    def __init__(self, filepath, body, meta_lines):
+        self.filepath = filepath
+        self.body = body
+        self.meta_lines = meta_lines
+
+    @property
+    def body_lines(self):
+        return io.StringIO(self.body).readlines()
+
+
+class Finding:
+    """A single error or warning raised by a check."""
+    __slots__ = ('severity', 'category', 'path', 'message')
+
+    def __init__(self, severity, category, path, message):
+        self.severity = sys.intern(severity)
+        self.category = sys.intern(category)
+        self.path = path
+        self.message = message
+
+    @property
+    def file(self):
+        return os.path.basename(self.path)
+
+    def as_dict(self):
+        return {'severity': self.severity, 'category': self.category,
+                'path': self.path, 'message': self.message}
+
+    def __reduce__(self):
+        # Pickled as a bare tuple when results come back from pool workers
+        return (Finding, (self.severity, self.category, self.path, self.message))
+
 
 # ── Parse sections ──────────────────────────────────────────────────────────
 
-def parse_sections(filepath):
-    """Parse file into sections based on // FILE: markers."""
-    with open(filepath, 'r', encoding='utf-8', errors='replace') as f:
-        all_lines = f.readlines()
+META_LINE_PREFIXES = ('// META:', '// FLOW:', '// DEPENDENCY TREE:')
 
+
+def parse_sections(filepath):
+    """Parse a plain or compressed file into sections based on // FILE: markers."""
     sections = []
     current = None
     current_body_lines = []
     current_meta_lines = []
 
+    with open_text(filepath, errors='replace') as f:
+        all_lines = f.readlines()
+
     for line in all_lines:
         stripped = line.strip()
         if stripped.startswith('// FILE:'):
             if current is not None:
-                current['body'] = ''.join(current_body_lines)
-                current['body_lines'] = current_body_lines
-                current['meta_lines'] = current_meta_lines
-                sections.append(current)
+                sections.append(Section(current, ''.join(current_body_lines), current_meta_lines))
 
-            filepath_val = stripped.replace('// FILE:', '').strip()
-            current = {'filepath': filepath_val}
+            current = stripped.replace('// FILE:', '').strip()
             current_body_lines = []
             current_meta_lines = []
         elif current is not None:
-            if stripped.startswith('// META:') or stripped.startswith('// FLOW:') or stripped.startswith('// DEPENDENCY TREE:'):
+            if stripped.startswith(META_LINE_PREFIXES):
                 current_meta_lines.append(line)
             current_body_lines.append(line)
 
     if current is not None:
-        current['body'] = ''.join(current_body_lines)
-        current['body_lines'] = current_body_lines
-        current['meta_lines'] = current_meta_lines
-        sections.append(current)
+        sections.append(Section(current, ''.join(current_body_lines), current_meta_lines))
 
     return sections
 
 
-def extract_meta_field(meta_lines, field):
-    """Extract a specific META field value."""
-    for line in meta_lines:
-        s = line.strip()
-        prefix = f'// META: {field}:'
-        if s.startswith(prefix):
-            return s[len(prefix):].strip()
-    return None
-
-
 def extract_flow_label(meta_lines):
     """Extract FLOW label."""
     for line in meta_lines:
         s = line.strip()
         if s.startswith('// FLOW:'):
-            return s.replace('// FLOW:', '').strip()
+            return sys.intern(s.replace('// FLOW:', '').strip())
     return None
 
 
+def split_meta_list(value):
+    """Split a META list value like [a:Array, b:Record<K, V>] on top-level commas.
+
+    Brackets, strings and arrows are split_top_level's, so a type such as
+    (id: string) => void stays one item.
+    """
+    if value is None or value == '[none]' or not value.strip('[] '):
+        return []
+    value = value.strip()
+    # One bracket each side; a value cut off mid-line has no closing one
+    value = value[1:] if value.startswith('[') else value
+    value = value[:-1] if value.endswith(']') else value
+    return split_top_level(value)
+
+
+# ── Section view ────────────────────────────────────────────────────────────
+
+KNOWN_CONTEXT_HOOKS = {
+    'useAuth': 'AuthContext', 'useWallet': 'WalletContext',
+    'useRouter': 'NextRouter', 'usePathname': 'NextRouter',
+    'useSearchParams': 'NextRouter', 'useParams': 'NextRouter',
+}
+
+# One alternation over the body collects every code fact the checks compare against.
+FACT_RE = re.compile(
+    r'(?P<state>const\s+\[\w+,\s*\w+\]\s*=\s*use(?:State|Reducer))'
+    r'|(?P<fetch>fetch\s*\(\s*(?P<tpl>`\$\{)?)(?(tpl)|[`\'"])'
+    r'|useContext\s*\(\s*(?P<ctx>\w+)\s*\)'
+    r'|\b(?P<hook>' + '|'.join(KNOWN_CONTEXT_HOOKS) + r')\s*\('
+)
+PROPS_DESTRUCTURE_RE = re.compile(r'(?:export\s+(?:default\s+)?)?function\s+\w+\s*\(\s*\{[^}]+\}')
+PROPS_TYPE_RE = re.compile(r'(?:interface|type)\s+\w*Props\w*\s*(?:=\s*)?\{')
+TYPE_ANNOTATION_RE = re.compile(r'^[ \t]*// TYPE:(.*)\n?(?=(.*))', re.MULTILINE)
+TREE_ITEM_RE = re.compile(r'(?:├──|└──)\s*\w+:\s*(.+)')
+IDENT_RE = re.compile(r'\w+')
+
+
+def parse_dependency_tree(body):
+    """Return (tree items, offset where code after the tree starts)."""
+    pos = body.find('// DEPENDENCY TREE:')
+    if pos == -1:
+        return [], 0
+    items = []
+    pos = body.find('\n', pos) + 1
+    while 0 < pos < len(body):
+        end = body.find('\n', pos)
+        if end == -1:
+            end = len(body)
+        s = body[pos:end].strip()
+        if not s.startswith('//'):
+            break
+        if '├──' in s or '└──' in s:
+            m = TREE_ITEM_RE.search(s)
+            if m:
+                items.extend(x.strip() for x in m.group(1).split(','))
+        pos = end + 1
+    return items, pos
+
+
+class SectionView:
+    """Everything the checks need from one section, extracted once.
+
+    META fields are parsed into a dict and list values pre-split; code facts
+    (state declarations, fetch calls, context usage, props) come from a single
+    pass over the body, so each check is a comparison rather than a rescan.
+    """
+    __slots__ = ('flow', 'meta', 'meta_lists', 'state_count', 'fetch_count',
+                 'contexts', 'has_props', 'type_annotations', 'tree_items',
+                 'code_start', 'identifiers')
+
+    def __init__(self, section):
+        self.flow = extract_flow_label(section.meta_lines)
+        self.meta = {}
+        for line in section.meta_lines:
+            s = line.strip()
+            if s.startswith('// META:'):
+                field, sep, value = s[len('// META:'):].partition(':')
+                if sep:
+                    self.meta.setdefault(field.strip(), sys.intern(value.strip()))
+        self.meta_lists = {}
+
+        body = section.body
+        state_count = 0
+        fetch_count = 0
+        contexts = []
+        for m in FACT_RE.finditer(body):
+            if m.group('state'):
+                state_count += 1
+            elif m.group('fetch'):
+                # A template fetch(`${...}`) counts as both a URL and a template fetch
+                fetch_count += 2 if m.group('tpl') else 1
+            else:
+                ctx = m.group('ctx') or KNOWN_CONTEXT_HOOKS[m.group('hook')]
+                if ctx not in contexts:
+                    contexts.append(ctx)
+        self.state_count = state_count
+        self.fetch_count = fetch_count
+        self.contexts = contexts
+        self.has_props = bool(PROPS_DESTRUCTURE_RE.search(body) or PROPS_TYPE_RE.search(body))
+        self.type_annotations = [(m.group(1).strip(), m.group(2).strip())
+                                 for m in TYPE_ANNOTATION_RE.finditer(body)]
+        # Identifiers are hashed once from the code after the tree, so the tree
+        # comment itself never counts as a use of its own items.
+        self.tree_items, self.code_start = parse_dependency_tree(body)
+        self.identifiers = set(IDENT_RE.findall(body, self.code_start)) if self.tree_items else set()
+
+    def field(self, name):
+        return self.meta.get(name)
+
+    def field_list(self, name):
+        """META list field split into entries; [] for [none] or missing."""
+        items = self.meta_lists.get(name)
+        if items is None:
+            items = self.meta_lists[name] = split_meta_list(self.meta.get(name))
+        return items
+
+
 # ── Validation ──────────────────────────────────────────────────────────────
 
-errors = []
-warnings = []
-info_items = []
+# Checks are pure: each returns its findings and never touches shared state,
+# so sections can be validated in any process and merged afterwards.
+
+def error(category, filepath, message):
+    return Finding('error', category, filepath, message)
 
-def add_error(category, filepath, message):
-    errors.append({'category': category, 'file': os.path.basename(filepath), 'path': filepath, 'message': message})
+def warning(category, filepath, message):
+    return Finding('warning', category, filepath, message)
 
-def add_warning(category, filepath, message):
-    warnings.append({'category': category, 'file': os.path.basename(filepath), 'path': filepath, 'message': message})
 
-def add_info(message):
-    info_items.append(message)
+AFFILIATE_KEYWORDS = ['affiliate', 'referral', 'commission', 'referral-link', 'refer-earn',
+                      'affiliate-dashboard', 'affiliatecount', 'affiliate_count', 'referral_code']
+VENDOR_KEYWORDS = ['vendor dashboard', 'pos terminal', 'point-of-sale', 'inventory manage',
+                   'barcode scan', 'staff-management']
+FLOW_KEYWORD_MATCHER = KeywordMatcher(AFFILIATE_KEYWORDS + VENDOR_KEYWORDS)
 
 
-def check_flow_accuracy(section):
-    fp = section['filepath']
-    body = section['body'].lower()
-    flow = extract_flow_label(section['meta_lines'])
+def check_flow_accuracy(section, view):
+    fp = section.filepath
+    flow = view.flow
     if not flow:
-        add_error('FLOW', fp, 'Missing FLOW label')
-        return
+        return [error('FLOW', fp, 'Missing FLOW label')]
+    findings = []
     fp_lower = fp.lower()
 
-    affiliate_kw = ['affiliate', 'referral', 'commission', 'referral-link', 'refer-earn',
-                    'affiliate-dashboard', 'affiliatecount', 'affiliate_count', 'referral_code']
-    vendor_kw = ['vendor dashboard', 'pos terminal', 'point-of-sale', 'inventory manage',
-                 'barcode scan', 'staff-management']
+    if flow in ('AFFILIATE ONLY', 'VENDOR ONLY'):
+        # Distinct keywords present, both vocabularies counted in one scan
+        found = FLOW_KEYWORD_MATCHER.found(section.body.lower())
+        aff_hits = sum(1 for kw in AFFILIATE_KEYWORDS if kw in found)
+        vendor_hits = sum(1 for kw in VENDOR_KEYWORDS if kw in found)
 
     if flow == 'AFFILIATE ONLY':
-        vendor_hits = sum(1 for kw in vendor_kw if kw in body)
-        aff_hits = sum(1 for kw in affiliate_kw if kw in body)
         if vendor_hits > 2 and aff_hits == 0:
-            add_warning('FLOW', fp, f'Marked AFFILIATE ONLY but has {vendor_hits} vendor keywords, 0 affiliate keywords')
+            findings.append(warning('FLOW', fp, f'Marked AFFILIATE ONLY but has {vendor_hits} vendor keywords, 0 affiliate keywords'))
 
     elif flow == 'VENDOR ONLY':
-        aff_hits = sum(1 for kw in affiliate_kw if kw in body)
-        vendor_hits = sum(1 for kw in vendor_kw if kw in body)
         if aff_hits > 2 and vendor_hits == 0:
-            add_warning('FLOW', fp, f'Marked VENDOR ONLY but has {aff_hits} affiliate keywords, 0 vendor keywords')
+            findings.append(warning('FLOW', fp, f'Marked VENDOR ONLY but has {aff_hits} affiliate keywords, 0 vendor keywords'))
 
     elif flow == 'SHARED':
         if '/affiliate-dashboard' in fp_lower or '/affiliate/' in fp_lower:
             if '/vendor' not in fp_lower:
-                add_warning('FLOW', fp, 'Path contains affiliate-specific route but marked SHARED')
-
-
-def check_meta_completeness(section):
-    fp = section['filepath']
-    required = ['Type', 'Flow', 'Framework', 'State', 'Props', 'Context', 'APIs', 'Dependencies']
-    for field in required:
-        val = extract_meta_field(section['meta_lines'], field)
-        if val is None:
-            add_error('META', fp, f'Missing META field: {field}')
-
-
-def check_state_accuracy(section):
-    fp = section['filepath']
-    body = section['body']
-    state_meta = extract_meta_field(section['meta_lines'], 'State')
-
-    actual_useState = re.findall(r'const\s+\[(\w+),\s*\w+\]\s*=\s*useState', body)
-    actual_useReducer = re.findall(r'const\s+\[(\w+),\s*\w+\]\s*=\s*useReducer', body)
-    actual_total = len(actual_useState) + len(actual_useReducer)
-
-    if state_meta == '[none]' or state_meta is None:
-        meta_count = 0
-    else:
-        # Count top-level comma-separated entries
-        depth = 0
-        count = 1 if state_meta.strip('[] ') else 0
-        for ch in state_meta.strip('[]'):
-            if ch in '([{<':
-                depth += 1
-            elif ch in ')]}>':
-                depth -= 1
-            elif ch == ',' and depth == 0:
-                count += 1
-        meta_count = count
-
-    if actual_total > 0 and meta_count == 0:
-        add_error('STATE', fp, f'META: State says [none] but code has {actual_total} state variables')
-    elif meta_count > 0 and actual_total == 0:
-        add_error('STATE', fp, f'META: State lists {meta_count} vars but code has no useState/useReducer')
-    elif abs(actual_total - meta_count) > 2:
-        add_warning('STATE', fp, f'State count mismatch: META={meta_count}, code={actual_total} (diff={abs(actual_total - meta_count)})')
+                findings.append(warning('FLOW', fp, 'Path contains affiliate-specific route but marked SHARED'))
+    return findings
 
 
-def check_api_accuracy(section):
-    fp = section['filepath']
-    body = section['body']
-    api_meta = extract_meta_field(section['meta_lines'], 'APIs')
-    apis_none = (api_meta == '[none]' or api_meta is None)
+REQUIRED_META = ['Type', 'Flow', 'Framework', 'State', 'Props', 'Context', 'APIs', 'Dependencies']
 
-    # Detect fetch calls with actual URLs
-    url_fetches = len(re.findall(r'fetch\s*\(\s*[`\'"]', body))
-    template_fetches = len(re.findall(r'fetch\s*\(\s*`\$\{', body))
-    total_fetches = url_fetches + template_fetches
 
-    if total_fetches > 0 and apis_none:
-        add_error('API', fp, f'META: APIs says [none] but code has {total_fetches} fetch calls with URLs')
+def check_meta_completeness(section, view):
+    fp = section.filepath
+    return [error('META', fp, f'Missing META field: {field}')
+            for field in REQUIRED_META if view.field(field) is None]
 
 
-def check_context_accuracy(section):
-    fp = section['filepath']
-    body = section['body']
-    ctx_meta = extract_meta_field(section['meta_lines'], 'Context')
+def check_state_accuracy(section, view):
+    fp = section.filepath
+    actual_total = view.state_count
+    meta_count = len(view.field_list('State'))
 
-    contexts_found = []
-    for m in re.finditer(r'useContext\s*\(\s*(\w+)\s*\)', body):
-        contexts_found.append(m.group(1))
-    known_hooks = {'useAuth': 'AuthContext', 'useWallet': 'WalletContext',
-                   'useRouter': 'NextRouter', 'usePathname': 'NextRouter',
-                   'useSearchParams': 'NextRouter', 'useParams': 'NextRouter'}
-    for hook, ctx in known_hooks.items():
-        if re.search(rf'\b{hook}\s*\(', body):
-            if ctx not in contexts_found:
-                contexts_found.append(ctx)
-
-    ctx_none = (ctx_meta == '[none]' or ctx_meta is None)
-    if contexts_found and ctx_none:
-        add_error('CONTEXT', fp, f'META: Context says [none] but code uses: {", ".join(set(contexts_found))}')
+    if actual_total > 0 and meta_count == 0:
+        return [error('STATE', fp, f'META: State says [none] but code has {actual_total} state variables')]
+    elif meta_count > 0 and actual_total == 0:
+        return [error('STATE', fp, f'META: State lists {meta_count} vars but code has no useState/useReducer')]
+    elif abs(actual_total - meta_count) > 2:
+        return [warning('STATE', fp, f'State count mismatch: META={meta_count}, code={actual_total} (diff={abs(actual_total - meta_count)})')]
+    return []
+
+
+def check_api_accuracy(section, view):
+    fp = section.filepath
+    if view.fetch_count > 0 and not view.field_list('APIs'):
+        return [error('API', fp, f'META: APIs says [none] but code has {view.fetch_count} fetch calls with URLs')]
+    return []
+
+
+def check_context_accuracy(section, view):
+    fp = section.filepath
+    if view.contexts and not view.field_list('Context'):
+        return [error('CONTEXT', fp, f'META: Context says [none] but code uses: {", ".join(view.contexts)}')]
+    return []
+
+
+def check_props_accuracy(section, view):
+    fp = section.filepath
+    if view.has_props and not view.field_list('Props'):
+        return [warning('PROPS', fp, 'Code has props but META: Props says [none]')]
+    return []
+
+
+def check_type_annotations(section, view):
+    fp = section.filepath
+    findings = []
+    for type_val, next_line in view.type_annotations:
+        if type_val == 'unknown':
+            findings.append(warning('TYPE', fp, f'Vague type "unknown" — {next_line[:70]}'))
+        elif type_val == 'nullable':
+            findings.append(warning('TYPE', fp, f'Vague type "nullable" — {next_line[:70]}'))
+        elif type_val == 'Array':
+            findings.append(warning('TYPE', fp, f'Generic "Array" (no element type) — {next_line[:70]}'))
+        elif type_val == 'Object':
+            findings.append(warning('TYPE', fp, f'Generic "Object" (no structure) — {next_line[:70]}'))
+    return findings
+
+
+def check_dependency_tree(section, view):
+    """Warn when many tree items never appear in the code; returns (findings, phantom items)."""
+    fp = section.filepath
+    tree_items = view.tree_items
+    identifiers = view.identifiers
+    phantom = []
+    for item in tree_items:
+        if not item or item in identifiers:
+            continue
+        if IDENT_RE.fullmatch(item) or not re.compile(r'\b' + re.escape(item) + r'\b').search(section.body, view.code_start):
+            phantom.append(item)
+    if phantom and len(phantom) > len(tree_items) * 0.4:
+        return [warning('DEPS', fp, f'{len(phantom)}/{len(tree_items)} tree items not found in code: {", ".join(phantom[:5])}')], phantom
+    return [], phantom
+
+
+def reconcile_sections(sections, original_path):
+    """Missing/extra/duplicated/drifted sections against the original monolith.
+
+    The enhanced entries are hashed from the already-parsed sections; the
+    original goes through the cached section index and is only reread when
+    its cached index is stale. Returns (findings, info_items).
+    """
+    enhanced = [(s.filepath, section_hash(io.StringIO(s.body))) for s in sections]
+    original = load_section_index(original_path, SECTION_INDEX)
+    rec = reconcile(enhanced, original or [])
+
+    findings = [error('DUPLICATE', p, f'File appears {c} times') for p, c in rec.duplicated.items()]
+    info_items = []
+    if original is not None:
+        findings += [error('MISSING', m, 'In original but missing from enhanced') for m in rec.missing]
+        findings += [warning('EXTRA', e, 'In enhanced but not in original') for e in rec.extra]
+        findings += [error('DRIFT', d, 'Code differs from original (content hash mismatch)') for d in rec.drifted]
+        info_items.append(f"Original sections: {len(original)}")
+        info_items.append(f"Enhanced sections: {len(sections)}")
+        info_items.append(f"Missing: {len(rec.missing)}, Extra: {len(rec.extra)}, Drifted: {len(rec.drifted)}")
+    return findings, info_items
+
+
+# ── Per-section run ─────────────────────────────────────────────────────────
+
+class SectionResult:
+    """Findings and distribution labels for one section, tagged with its index."""
+    __slots__ = ('index', 'findings', 'type_issues', 'phantom', 'flow', 'file_type', 'framework')
+
+    def __init__(self, index, findings, type_issues, phantom, flow, file_type, framework):
+        self.index = index
+        self.findings = findings
+        self.type_issues = type_issues
+        self.phantom = phantom
+        self.flow = flow
+        self.file_type = file_type
+        self.framework = framework
+
+    def __reduce__(self):
+        return (SectionResult, (self.index, self.findings, self.type_issues, self.phantom,
+                                self.flow, self.file_type, self.framework))
+
+
+def validate_section(index, section):
+    view = SectionView(section)
+    findings = []
+    findings += check_flow_accuracy(section, view)
+    findings += check_meta_completeness(section, view)
+    findings += check_state_accuracy(section, view)
+    findings += check_api_accuracy(section, view)
+    findings += check_context_accuracy(section, view)
+    findings += check_props_accuracy(section, view)
+    type_findings = check_type_annotations(section, view)
+    findings += type_findings
+    dep_findings, phantom = check_dependency_tree(section, view)
+    findings += dep_findings
+    return SectionResult(index, findings, len(type_findings), phantom,
+                         view.flow, view.field('Type'), view.field('Framework'))
+
+
+def validate_chunk(chunk):
+    """Pool worker entry point: validate (index, filepath, offset, length)
+    descriptors of section bodies in the shared block."""
+    results = []
+    for i, filepath, offset, length in chunk:
+        body = shared_text(offset, length)
+        meta_lines = [line for line in io.StringIO(body) if line.strip().startswith(META_LINE_PREFIXES)]
+        results.append(validate_section(i, Section(filepath, body, meta_lines)))
+    return results
+
+
+CHUNK_SIZE = 16
+
+
+def iter_section_checks(sections, jobs=1):
+    """Validate every section, in parallel when use_pool says so; yields
+    results in section order."""
+    if not use_pool(len(sections), jobs, CHUNK_SIZE):
+        for i, section in enumerate(sections):
+            yield validate_section(i, section)
+        return
 
+    with SharedText(s.body for s in sections) as shared:
+        tasks = [(i, s.filepath, offset, length)
+                 for i, (s, (offset, length)) in enumerate(zip(sections, shared.descriptors))]
+        chunks = [tasks[i:i + CHUNK_SIZE] for i in range(0, len(tasks), CHUNK_SIZE)]
+        with ProcessPoolExecutor(max_workers=jobs, initializer=attach, initargs=(shared.name,)) as pool:
+            for results in iter_ordered(pool, validate_chunk, chunks):
+                yield from results
 
-def check_props_accuracy(section):
-    fp = section['filepath']
-    body = section['body']
-    props_meta = extract_meta_field(section['meta_lines'], 'Props')
-    props_none = (props_meta == '[none]' or props_meta is None)
 
-    has_props = bool(re.search(r'(?:export\s+(?:default\s+)?)?function\s+\w+\s*\(\s*\{[^}]+\}', body))
-    has_props_type = bool(re.search(r'(?:interface|type)\s+\w*Props\w*\s*(?:=\s*)?\{', body))
+# ── Sampling ────────────────────────────────────────────────────────────────
 
-    if (has_props or has_props_type) and props_none:
-        add_warning('PROPS', fp, 'Code has props but META: Props says [none]')
+CHECKS_PER_SECTION = 8
+# Smallest sample taken from a stratum, so its variance can be estimated
+MIN_PER_STRATUM = 2
 
 
-def check_type_annotations(section):
-    fp = section['filepath']
-    issues = 0
-    for i, line in enumerate(section['body_lines']):
-        s = line.strip()
-        if s.startswith('// TYPE:'):
-            type_val = s.replace('// TYPE:', '').strip()
-            next_line = section['body_lines'][i + 1].strip() if i + 1 < len(section['body_lines']) else ''
-
-            if type_val == 'unknown':
-                add_warning('TYPE', fp, f'Vague type "unknown" — {next_line[:70]}')
-                issues += 1
-            elif type_val == 'nullable':
-                add_warning('TYPE', fp, f'Vague type "nullable" — {next_line[:70]}')
-                issues += 1
-            elif type_val == 'Array':
-                add_warning('TYPE', fp, f'Generic "Array" (no element type) — {next_line[:70]}')
-                issues += 1
-            elif type_val == 'Object':
-                add_warning('TYPE', fp, f'Generic "Object" (no structure) — {next_line[:70]}')
-                issues += 1
-    return issues
-
-
-def check_dependency_tree(section):
-    fp = section['filepath']
-    body = section['body']
-    tree_items = []
-    in_tree = False
-    for line in section['meta_lines']:
+def section_stratum(section):
+    """A section's sampling stratum: its META Type and Flow."""
+    meta = {}
+    for line in section.meta_lines:
         s = line.strip()
-        if s == '// DEPENDENCY TREE:':
-            in_tree = True
-            continue
-        if in_tree and s.startswith('//') and ('├──' in s or '└──' in s):
-            m = re.search(r'(?:├──|└──)\s*\w+:\s*(.+)', s)
-            if m:
-                items = [x.strip() for x in m.group(1).split(',')]
-                tree_items.extend(items)
-        elif in_tree and not s.startswith('//'):
-            in_tree = False
-
-    phantom = [item for item in tree_items if item and not re.search(r'\b' + re.escape(item) + r'\b', body)]
-    if phantom and len(phantom) > len(tree_items) * 0.4:
-        add_warning('DEPS', fp, f'{len(phantom)}/{len(tree_items)} tree items not found in code: {", ".join(phantom[:5])}')
-
+        if s.startswith('// META:'):
+            field, sep, value = s[len('// META:'):].partition(':')
+            if sep:
+                meta.setdefault(field.strip(), value.strip())
+    return meta.get('Type', '?'), meta.get('Flow', '?')
 
-def check_duplicates(sections):
-    paths = [s['filepath'] for s in sections]
-    dupes = {p: c for p, c in Counter(paths).items() if c > 1}
-    for p, c in dupes.items():
-        add_error('DUPLICATE', p, f'File appears {c} times')
-    return len(dupes)
 
-
-def compare_with_original():
-    try:
-        with open(ORIGINAL, 'r', encoding='utf-8', errors='replace') as f:
-            return [l.strip().replace('// FILE:', '').strip()
-                    for l in f if l.strip().startswith('// FILE:')]
-    except Exception:
-        return None
+def stratified_sample(sections, fraction, rng):
+    """(sorted sampled indexes, {stratum: [indexes]}): fraction of each
+    stratum, rounded, but at least MIN_PER_STRATUM or the whole stratum."""
+    strata = {}
+    for i, section in enumerate(sections):
+        strata.setdefault(section_stratum(section), []).append(i)
+    chosen = []
+    for members in strata.values():
+        n = min(len(members), max(MIN_PER_STRATUM, round(fraction * len(members))))
+        chosen.extend(rng.sample(members, n))
+    return sorted(chosen), strata
+
+
+def section_deduction(findings):
+    """What a section's findings take off the accuracy score, in checks."""
+    return sum(1 if f.severity == 'error' else 0.5 for f in findings)
+
+
+def estimate_accuracy(deductions, strata, exact, confidence):
+    """(accuracy, low, high) in percent from a stratified sample.
+
+    deductions maps each sampled section index to section_deduction() of its
+    findings; exact is the deduction from whole-file checks, which are not
+    sampled. The interval is the normal approximation with a finite
+    population correction per stratum. Findings are rare, so a sample easily
+    draws only clean sections: a stratum whose sample shows no spread
+    borrows the variance of the whole sample, and every stratum's variance
+    is at least what one more sampled section with a single warning would
+    give it, so the interval never collapses to a point.
+    """
+    values = list(deductions.values())
+    pooled = statistics.variance(values) if len(values) > 1 else 0.0
+    total = exact
+    variance = 0.0
+    for members in strata.values():
+        ys = [deductions[i] for i in members if i in deductions]
+        n, size = len(ys), len(members)
+        total += size * statistics.fmean(ys)
+        if n < size:
+            s2 = statistics.variance(ys) if n > 1 else 0.0
+            floor = statistics.variance(ys + [0.5])
+            variance += size * size * (1 - n / size) * max(s2 or pooled, floor) / n
+    checks = sum(map(len, strata.values())) * CHECKS_PER_SECTION
+    z = statistics.NormalDist().inv_cdf((1 + confidence) / 2)
+    accuracy = max(0.0, (1 - total / checks) * 100)
+    half = z * math.sqrt(variance) / checks * 100
+    return accuracy, max(0.0, accuracy - half), min(100.0, accuracy + half)
+
+
+# ── Report ──────────────────────────────────────────────────────────────────
+
+class ReportWriter:
+    """Writes the report to disk as it goes instead of building it in memory.
+
+    Findings are formatted and spilled to one temporary file per
+    (severity, category) as they arrive, with only counts kept in memory.
+    Summary values that are not known yet are written as fixed-width
+    placeholders and filled in at the end. The report is assembled in a
+    temporary file, since placeholders need to seek, and copied to path on
+    close with the placeholder padding stripped, compressed if path ends
+    in .gz, .xz or .zst.
+    """
+    PLACEHOLDER_WIDTH = 12
+
+    def __init__(self, path):
+        self.path = path
+        self.f = tempfile.TemporaryFile('w+b')
+        self.first = True
+        self.placeholders = {}
+        self.padded = set()     # offsets of the lines holding placeholders
+        self.spills = {}
+        self.counts = Counter()
+
+    def line(self, text=''):
+        if not self.first:
+            self.f.write(b'\n')
+        self.first = False
+        self.f.write(text.encode('utf-8'))
+
+    def placeholder(self, key, label):
+        self.line(label)
+        self.placeholders[key] = self.f.tell()
+        self.padded.add(self.f.tell() - len(label.encode('utf-8')))
+        self.f.write(b' ' * self.PLACEHOLDER_WIDTH)
+
+    def fill(self, key, value):
+        data = str(value).encode('utf-8')[:self.PLACEHOLDER_WIDTH].ljust(self.PLACEHOLDER_WIDTH)
+        end = self.f.tell()
+        self.f.seek(self.placeholders[key])
+        self.f.write(data)
+        self.f.seek(end)
+
+    def add(self, finding):
+        key = (finding.severity, finding.category)
+        spill = self.spills.get(key)
+        if spill is None:
+            spill = self.spills[key] = tempfile.TemporaryFile('w+', encoding='utf-8')
+        spill.write(f"  File: {finding.file}\n")
+        if finding.severity == 'error':
+            spill.write(f"  Path: {finding.path}\n")
+        spill.write(f"  Issue: {finding.message}\n\n")
+        self.counts[key] += 1
+
+    def count(self, severity, category=None):
+        if category is not None:
+            return self.counts[(severity, category)]
+        return sum(c for (sev, _), c in self.counts.items() if sev == severity)
+
+    def write_findings(self, severity):
+        """Stream every category of one severity from its spill file."""
+        for key in sorted(k for k in self.spills if k[0] == severity):
+            self.line(f"[{key[1]}] ({self.counts[key]} {severity}s)")
+            self.line("-" * 40)
+            spill = self.spills.pop(key)
+            spill.seek(0)
+            for text in spill:
+                self.line(text[:-1])
+            spill.close()
+
+    def close(self):
+        for spill in self.spills.values():
+            spill.close()
+        self.f.seek(0)
+        pos = 0
+        with open_writer(self.path) as out:
+            for data in self.f:
+                if pos in self.padded:
+                    out.write(data.rstrip(b' \n') + data[len(data.rstrip(b'\n')):])
+                else:
+                    out.write(data)
+                pos += len(data)
+        self.f.close()
+
+
+# ── Machine-readable output ─────────────────────────────────────────────────
+
+SEVERITIES = ('error', 'warning')
+SARIF_SCHEMA = 'https://json.schemastore.org/sarif-2.1.0.json'
+
+
+class FindingFilter:
+    """Severity/category selection applied before a finding is serialised."""
+    __slots__ = ('severities', 'categories')
+
+    def __init__(self, severities=None, categories=None):
+        self.severities = set(severities) if severities else None
+        self.categories = {c.upper() for c in categories} if categories else None
+
+    def accepts(self, finding):
+        return ((self.severities is None or finding.severity in self.severities) and
+                (self.categories is None or finding.category in self.categories))
+
+
+class JsonlWriter:
+    """One JSON object per finding, written as it arrives."""
+
+    def __init__(self, path, selection):
+        self.f = open_text(path, 'w')
+        self.selection = selection
+
+    def add(self, finding):
+        if self.selection.accepts(finding):
+            self.f.write(json.dumps(finding.as_dict(), ensure_ascii=False))
+            self.f.write('\n')
+
+    def close(self):
+        self.f.close()
+
+
+class SarifWriter:
+    """A SARIF 2.1.0 log with one rule per finding category.
+
+    Results are streamed into the run's results array; the tool block, which
+    lists the rules seen, is written after it once every category is known.
+    """
+
+    def __init__(self, path, selection):
+        self.f = open_text(path, 'w')
+        self.selection = selection
+        self.rules = {}
+        self.results = 0
+        self.f.write('{"$schema": %s, "version": "2.1.0", "runs": [{"results": ['
+                     % json.dumps(SARIF_SCHEMA))
+
+    def add(self, finding):
+        if not self.selection.accepts(finding):
+            return
+        rule_index = self.rules.setdefault(finding.category, len(self.rules))
+        result = {
+            'ruleId': finding.category,
+            'ruleIndex': rule_index,
+            'level': finding.severity,
+            'message': {'text': finding.message},
+            'locations': [{'physicalLocation': {'artifactLocation': {'uri': finding.path}}}],
+        }
+        self.f.write(',\n' if self.results else '\n')
+        self.f.write(json.dumps(result, ensure_ascii=False))
+        self.results += 1
+
+    def close(self):
+        driver = {
+            'name': 'validate_enhanced',
+            'rules': [{'id': cat, 'shortDescription': {'text': f'{cat} check'}}
+                      for cat in self.rules],
+        }
+        self.f.write('\n], "tool": {"driver": %s}}]}\n' % json.dumps(driver, ensure_ascii=False))
+        self.f.close()
 
 
 # ── Main ────────────────────────────────────────────────────────────────────
 
-def main():
+def sample_fraction(value):
+    f = float(value)
+    if not 0 < f <= 1:
+        raise argparse.ArgumentTypeError(f"sample fraction must be in (0, 1], got {value}")
+    return f
+
+
+def confidence_level(value):
+    c = float(value)
+    if not 0 < c < 1:
+        raise argparse.ArgumentTypeError(f"confidence must be in (0, 1), got {value}")
+    return c
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--jobs', '-j', type=int,
+                        help='worker processes for the per-section checks '
+                             '(default: CPU count, or 1 with --profile-memory; 1 = serial)')
+    parser.add_argument('--input', default=INPUT, metavar='PATH',
+                        help='enhanced monolith to validate (plain, .gz, .xz or .zst)')
+    parser.add_argument('--original', default=ORIGINAL, metavar='PATH',
+                        help='marked monolith the enhanced one is reconciled against')
+    parser.add_argument('--report', default=REPORT, metavar='PATH',
+                        help='where the report is written; .gz, .xz or .zst compresses it')
+    parser.add_argument('--jsonl', metavar='PATH', help='also write findings as JSON lines')
+    parser.add_argument('--sarif', metavar='PATH', help='also write findings as a SARIF 2.1.0 log')
+    parser.add_argument('--severity', action='append', choices=SEVERITIES,
+                        help='only serialise findings of this severity (repeatable; text report is unfiltered)')
+    parser.add_argument('--category', action='append', metavar='NAME',
+                        help='only serialise findings of this category, e.g. STATE (repeatable)')
+    parser.add_argument('--profile-memory', action='store_true',
+                        help='report peak memory and top allocation sites per stage')
+    parser.add_argument('--metrics', metavar='PATH',
+                        help='write stage durations, throughput and hit rates to PATH '
+                             '(Prometheus text format, or JSON for a .json path)')
+    parser.add_argument('--sample', type=sample_fraction, metavar='FRACTION',
+                        help='check only this fraction of each Type/Flow stratum and estimate the accuracy')
+    parser.add_argument('--seed', type=int, help='random seed for --sample (default: random, printed)')
+    parser.add_argument('--confidence', type=confidence_level, default=0.95,
+                        help='confidence level of the sampled accuracy interval (default: 0.95)')
+    parser.add_argument('--min-accuracy', type=float, metavar='PERCENT',
+                        help='exit with status 1 if the accuracy (with --sample, the lower bound '
+                             'of its interval) is below PERCENT')
+    args = parser.parse_args(argv)
+    if args.jobs is None:
+        args.jobs = default_jobs(args.profile_memory)
+    profile = MemoryProfile(args.profile_memory)
+    metrics = RunMetrics('validate_enhanced', args.metrics)
+
+    selection = FindingFilter(args.severity, args.category)
+    outputs = []
+    if args.jsonl:
+        outputs.append(JsonlWriter(args.jsonl, selection))
+    if args.sarif:
+        outputs.append(SarifWriter(args.sarif, selection))
+
     print("Parsing enhanced file...")
-    sections = parse_sections(INPUT)
+    with metrics.stage('parse'), profile.stage('parse'):
+        sections = parse_sections(args.input)
     print(f"Found {len(sections)} sections")
-
-    print("Checking duplicates...")
-    dup_count = check_duplicates(sections)
-
-    print("Comparing with original...")
-    orig_files = compare_with_original()
-    if orig_files is not None:
-        enhanced_set = set(s['filepath'] for s in sections)
-        orig_set = set(orig_files)
-        missing = orig_set - enhanced_set
-        extra = enhanced_set - orig_set
-        for m in missing:
-            add_error('MISSING', m, 'In original but missing from enhanced')
-        for e in extra:
-            add_warning('EXTRA', e, 'In enhanced but not in original')
-        add_info(f"Original sections: {len(orig_files)}")
-        add_info(f"Enhanced sections: {len(sections)}")
-        add_info(f"Missing: {len(missing)}, Extra: {len(extra)}")
-
+    checked = sections
+    if args.sample:
+        seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+        sampled, strata = stratified_sample(sections, args.sample, random.Random(seed))
+        checked = [sections[i] for i in sampled]
+        print(f"Sampling {len(checked)} of {len(sections)} sections from {len(strata)} strata (seed {seed})")
+    total_checks = len(checked) * CHECKS_PER_SECTION
+
+    # ── Report header; counts are filled in once every finding is in ──
+    report = ReportWriter(args.report)
+    report.line("=" * 70)
+    report.line(f"VALIDATION REPORT: {os.path.basename(args.input)}")
+    report.line("=" * 70)
+    report.line("")
+    report.line("SUMMARY")
+    report.line("-" * 40)
+    report.line(f"Total file sections:     {len(sections)}")
+    if args.sample:
+        report.line(f"Sampled sections:        {len(checked)} from {len(strata)} Type/Flow strata (seed {seed})")
+    report.line(f"Total checks performed:  {total_checks}")
+    report.placeholder('errors', "Errors found:            ")
+    report.placeholder('warnings', "Warnings found:          ")
+    report.placeholder('type_issues', "Type annotation issues:  ")
+    report.placeholder('duplicates', "Duplicate sections:      ")
+    report.placeholder('accuracy', "Accuracy score:          ")
+    if args.sample:
+        label = f"{args.confidence:.0%} interval:"
+        report.placeholder('interval', f"{label:<25}")
+    report.line("")
+    sinks = [report] + outputs
+
+    def emit(finding):
+        for sink in sinks:
+            sink.add(finding)
+
+    print("Reconciling with original...")
+    with metrics.stage('reconcile'), profile.stage('reconcile'):
+        rec_findings, info_items = reconcile_sections(sections, args.original)
+        dup_count = sum(1 for f in rec_findings if f.category == 'DUPLICATE')
+        exact_deduction = section_deduction(rec_findings)
+        for f in rec_findings:
+            emit(f)
+
+    parallel = use_pool(len(checked), args.jobs, CHUNK_SIZE)
+    jobs = args.jobs if parallel else 1
+    print(f"Running per-section validation ({jobs} job{'s' if jobs != 1 else ''})...")
     type_issues = 0
-    print("Running per-section validation...")
-    for i, section in enumerate(sections):
-        if (i + 1) % 20 == 0:
-            print(f"  {i+1}/{len(sections)}...")
-        check_flow_accuracy(section)
-        check_meta_completeness(section)
-        check_state_accuracy(section)
-        check_api_accuracy(section)
-        check_context_accuracy(section)
-        check_props_accuracy(section)
-        type_issues += check_type_annotations(section)
-        check_dependency_tree(section)
-
-    total_checks = len(sections) * 8
-    deductions = len(errors) + (len(warnings) * 0.5)
-    accuracy = max(0, (1 - deductions / total_checks) * 100)
-
-    # ── Build report ──
-    R = []
-    R.append("=" * 70)
-    R.append("VALIDATION REPORT: monolithic_enhanced.txt")
-    R.append("=" * 70)
-    R.append("")
-    R.append("SUMMARY")
-    R.append("-" * 40)
-    R.append(f"Total file sections:     {len(sections)}")
-    R.append(f"Total checks performed:  {total_checks}")
-    R.append(f"Errors found:            {len(errors)}")
-    R.append(f"Warnings found:          {len(warnings)}")
-    R.append(f"Type annotation issues:  {type_issues}")
-    R.append(f"Duplicate sections:      {dup_count}")
-    R.append(f"Accuracy score:          {accuracy:.1f}%")
-    R.append("")
-    for i in info_items:
-        R.append(f"  {i}")
-    R.append("")
-
-    # Distributions
+    phantom_deps = Counter()
+    phantom_sections = 0
     flows = Counter()
     types = Counter()
     fws = Counter()
-    for s in sections:
-        fl = extract_flow_label(s['meta_lines'])
-        if fl: flows[fl] += 1
-        ft = extract_meta_field(s['meta_lines'], 'Type')
-        if ft: types[ft] += 1
-        fw = extract_meta_field(s['meta_lines'], 'Framework')
-        if fw: fws[fw] += 1
-
-    R.append("FLOW DISTRIBUTION")
-    R.append("-" * 40)
-    for f, c in flows.most_common(): R.append(f"  {f}: {c}")
-    R.append("")
-    R.append("FILE TYPE DISTRIBUTION")
-    R.append("-" * 40)
-    for t, c in types.most_common(): R.append(f"  {t}: {c}")
-    R.append("")
-    R.append("FRAMEWORK DISTRIBUTION")
-    R.append("-" * 40)
-    for fw, c in fws.most_common(): R.append(f"  {fw}: {c}")
-    R.append("")
-
-    # Errors
-    if errors:
-        R.append("=" * 70)
-        R.append("ERRORS (Must Fix)")
-        R.append("=" * 70)
-        R.append("")
-        ecats = {}
-        for e in errors:
-            ecats.setdefault(e['category'], []).append(e)
-        for cat in sorted(ecats):
-            R.append(f"[{cat}] ({len(ecats[cat])} errors)")
-            R.append("-" * 40)
-            for e in ecats[cat]:
-                R.append(f"  File: {e['file']}")
-                R.append(f"  Path: {e['path']}")
-                R.append(f"  Issue: {e['message']}")
-                R.append("")
-    else:
-        R.append("NO ERRORS FOUND")
-        R.append("")
-
-    # Warnings
-    if warnings:
-        R.append("=" * 70)
-        R.append("WARNINGS (Review Recommended)")
-        R.append("=" * 70)
-        R.append("")
-        wcats = {}
-        for w in warnings:
-            wcats.setdefault(w['category'], []).append(w)
-        for cat in sorted(wcats):
-            R.append(f"[{cat}] ({len(wcats[cat])} warnings)")
-            R.append("-" * 40)
-            for w in wcats[cat]:
-                R.append(f"  File: {w['file']}")
-                R.append(f"  Issue: {w['message']}")
-                R.append("")
-    else:
-        R.append("NO WARNINGS FOUND")
-        R.append("")
-
-    # Corrections
-    R.append("=" * 70)
-    R.append("SUGGESTED CORRECTIONS")
-    R.append("=" * 70)
-    R.append("")
-    state_errs = [e for e in errors if e['category'] == 'STATE']
-    api_errs = [e for e in errors if e['category'] == 'API']
-    ctx_errs = [e for e in errors if e['category'] == 'CONTEXT']
-    flow_warns = [w for w in warnings if w['category'] == 'FLOW']
-    type_warns = [w for w in warnings if w['category'] == 'TYPE']
-    state_warns = [w for w in warnings if w['category'] == 'STATE']
-    props_warns = [w for w in warnings if w['category'] == 'PROPS']
-
-    corr = 1
-    if state_errs:
-        R.append(f"{corr}. STATE METADATA: {len(state_errs)} sections have State mismatches.")
-        R.append("   Action: Re-run state extraction with improved regex.")
-        R.append(""); corr += 1
-    if api_errs:
-        R.append(f"{corr}. API METADATA: {len(api_errs)} sections have undetected API calls.")
-        R.append("   Action: Improve fetch detection for variable-based URLs.")
-        R.append(""); corr += 1
-    if ctx_errs:
-        R.append(f"{corr}. CONTEXT METADATA: {len(ctx_errs)} sections have undetected context usage.")
-        R.append("   Action: Expand context hook pattern matching.")
-        R.append(""); corr += 1
-    if flow_warns:
-        R.append(f"{corr}. FLOW LABELS: {len(flow_warns)} sections may be mislabeled.")
-        R.append("   Action: Review path-based flow assignment logic.")
-        R.append(""); corr += 1
-    if type_warns:
-        R.append(f"{corr}. TYPE ANNOTATIONS: {len(type_warns)} annotations lack specificity.")
-        R.append("   Action: Infer element types from usage context.")
-        R.append(""); corr += 1
-    if state_warns:
-        R.append(f"{corr}. STATE COUNTS: {len(state_warns)} sections have count discrepancies.")
-        R.append("   Action: Check for multi-line or conditional useState patterns.")
-        R.append(""); corr += 1
-    if props_warns:
-        R.append(f"{corr}. PROPS: {len(props_warns)} sections have undetected props.")
-        R.append("   Action: Improve destructured props regex.")
-        R.append(""); corr += 1
-    if corr == 1:
-        R.append("No corrections needed.")
-        R.append("")
-
-    # Verdict
-    R.append("=" * 70)
-    R.append("FINAL VERDICT")
-    R.append("=" * 70)
-    R.append("")
-    if accuracy >= 95:
-        R.append(f"ACCURACY: {accuracy:.1f}% — EXCELLENT")
-        R.append("Metadata is highly accurate and suitable for Swift conversion reference.")
-    elif accuracy >= 85:
-        R.append(f"ACCURACY: {accuracy:.1f}% — GOOD")
-        R.append("Metadata is mostly accurate. Address errors before using for Swift conversion.")
-    elif accuracy >= 70:
-        R.append(f"ACCURACY: {accuracy:.1f}% — FAIR")
-        R.append("Significant corrections needed before relying on this reference.")
-    else:
-        R.append(f"ACCURACY: {accuracy:.1f}% — NEEDS IMPROVEMENT")
-        R.append("Major corrections required.")
-    R.append("")
-
-    report = '\n'.join(R)
-    with open(REPORT, 'w', encoding='utf-8') as f:
-        f.write(report)
-    print(report)
-    print(f"\nReport saved to: {REPORT}")
+    deductions = {}
+    progress = Progress(len(checked))
+    with metrics.stage('checks'), profile.stage('checks'):
+        for i, res in enumerate(iter_section_checks(checked, args.jobs)):
+            body = checked[i].body
+            progress.advance(body.count('\n'), len(body.encode('utf-8')))
+            if args.sample:
+                deductions[sampled[i]] = section_deduction(res.findings)
+            for f in res.findings:
+                emit(f)
+            type_issues += res.type_issues
+            if res.phantom:
+                phantom_deps.update(res.phantom)
+                phantom_sections += 1
+            if res.flow: flows[res.flow] += 1
+            if res.file_type: types[res.file_type] += 1
+            if res.framework: fws[res.framework] += 1
+            if not parallel:
+                profile.section(checked[i].filepath)
+
+    if phantom_deps:
+        top = ', '.join(f'{name} ({c})' for name, c in phantom_deps.most_common(5))
+        info_items.append(f"Phantom dependencies: {sum(phantom_deps.values())} in {phantom_sections} sections (most common: {top})")
+
+    with metrics.stage('report'), profile.stage('report'):
+        error_count = report.count('error')
+        warning_count = report.count('warning')
+        if args.sample:
+            accuracy, low, high = estimate_accuracy(deductions, strata, exact_deduction, args.confidence)
+        else:
+            deduction = error_count + (warning_count * 0.5)
+            accuracy = max(0, (1 - deduction / total_checks) * 100) if total_checks else 0
+            low = high = accuracy
+
+        for i in info_items:
+            report.line(f"  {i}")
+        report.line("")
+
+        # Distributions
+        scope = " (sampled sections)" if args.sample else ""
+        report.line(f"FLOW DISTRIBUTION{scope}")
+        report.line("-" * 40)
+        for f, c in flows.most_common(): report.line(f"  {f}: {c}")
+        report.line("")
+        report.line(f"FILE TYPE DISTRIBUTION{scope}")
+        report.line("-" * 40)
+        for t, c in types.most_common(): report.line(f"  {t}: {c}")
+        report.line("")
+        report.line(f"FRAMEWORK DISTRIBUTION{scope}")
+        report.line("-" * 40)
+        for fw, c in fws.most_common(): report.line(f"  {fw}: {c}")
+        report.line("")
+
+        # Errors
+        if error_count:
+            report.line("=" * 70)
+            report.line("ERRORS (Must Fix)")
+            report.line("=" * 70)
+            report.line("")
+            report.write_findings('error')
+        else:
+            report.line("NO ERRORS FOUND")
+            report.line("")
+
+        # Warnings
+        if warning_count:
+            report.line("=" * 70)
+            report.line("WARNINGS (Review Recommended)")
+            report.line("=" * 70)
+            report.line("")
+            report.write_findings('warning')
+        else:
+            report.line("NO WARNINGS FOUND")
+            report.line("")
+
+        # Corrections
+        report.line("=" * 70)
+        report.line("SUGGESTED CORRECTIONS")
+        report.line("=" * 70)
+        report.line("")
+        corrections = [
+            (report.count('error', 'STATE'), "STATE METADATA: {} sections have State mismatches.",
+             "Re-run state extraction with improved regex."),
+            (report.count('error', 'API'), "API METADATA: {} sections have undetected API calls.",
+             "Improve fetch detection for variable-based URLs."),
+            (report.count('error', 'CONTEXT'), "CONTEXT METADATA: {} sections have undetected context usage.",
+             "Expand context hook pattern matching."),
+            (report.count('warning', 'FLOW'), "FLOW LABELS: {} sections may be mislabeled.",
+             "Review path-based flow assignment logic."),
+            (report.count('warning', 'TYPE'), "TYPE ANNOTATIONS: {} annotations lack specificity.",
+             "Infer element types from usage context."),
+            (report.count('warning', 'STATE'), "STATE COUNTS: {} sections have count discrepancies.",
+             "Check for multi-line or conditional useState patterns."),
+            (report.count('warning', 'PROPS'), "PROPS: {} sections have undetected props.",
+             "Improve destructured props regex."),
+        ]
+        corr = 1
+        for count, text, action in corrections:
+            if count:
+                report.line(f"{corr}. {text.format(count)}")
+                report.line(f"   Action: {action}")
+                report.line("")
+                corr += 1
+        if corr == 1:
+            report.line("No corrections needed.")
+            report.line("")
+
+        # Verdict
+        report.line("=" * 70)
+        report.line("FINAL VERDICT")
+        report.line("=" * 70)
+        report.line("")
+        if accuracy >= 95:
+            report.line(f"ACCURACY: {accuracy:.1f}% — EXCELLENT")
+            report.line("Metadata is highly accurate and suitable for Swift conversion reference.")
+        elif accuracy >= 85:
+            report.line(f"ACCURACY: {accuracy:.1f}% — GOOD")
+            report.line("Metadata is mostly accurate. Address errors before using for Swift conversion.")
+        elif accuracy >= 70:
+            report.line(f"ACCURACY: {accuracy:.1f}% — FAIR")
+            report.line("Significant corrections needed before relying on this reference.")
+        else:
+            report.line(f"ACCURACY: {accuracy:.1f}% — NEEDS IMPROVEMENT")
+            report.line("Major corrections required.")
+        if args.sample:
+            report.line(f"Estimated from {len(checked)} of {len(sections)} sections "
+                        f"({args.confidence:.0%} interval {low:.1f}%-{high:.1f}%); "
+                        f"findings above cover the sample only.")
+        report.line("")
+
+        report.fill('errors', error_count)
+        report.fill('warnings', warning_count)
+        report.fill('type_issues', type_issues)
+        report.fill('duplicates', dup_count)
+        report.fill('accuracy', f"{accuracy:.1f}%")
+        if args.sample:
+            report.fill('interval', f"{low:.1f}-{high:.1f}%")
+        report.close()
+        for out in outputs:
+            out.close()
+
+    with open_text(args.report) as f:
+        shutil.copyfileobj(f, sys.stdout)
+    print()
+    print(f"\nReport saved to: {args.report}")
+    note = None
+    if parallel and peak_rss(children=True) is not None:
+        note = (f"Per-section checks ran in {jobs} worker processes (not traced); "
+                f"largest worker peak RSS {format_bytes(peak_rss(children=True))}")
+    profile.print_report(note)
+
+    metrics.set(sections=len(sections), checked_sections=len(checked), errors=error_count,
+                warnings=warning_count, type_issues=type_issues, duplicates=dup_count,
+                accuracy_percent=accuracy, accuracy_low_percent=low, accuracy_high_percent=high,
+                jobs=jobs, **progress.rates())
+    metrics.cache('section_index', cache_stats['hits'], cache_stats['misses'])
+    metrics.write()
+
+    if args.min_accuracy is not None and low < args.min_accuracy:
+        print(f"Accuracy {'lower bound ' if args.sample else ''}{low:.1f}% is below {args.min_accuracy:g}%")
+        return 1
+    return 0
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())